@@ -1,8 +1,5 @@
 import os
-import json
 from pathlib import Path
-import firebase_admin
-from firebase_admin import credentials
 
 # 1. 경로 설정
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,15 +31,18 @@ INSTALLED_APPS = [
 
 # 4. 미들웨어 설정
 MIDDLEWARE = [
+    'sales.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'sales.middleware.AsyncWhiteNoiseMiddleware',  # WhiteNoise + ASGI 비동기 뷰 지원
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'sales.middleware.SQLInstrumentationMiddleware',
+    'sales.middleware.DataVersionMiddleware',  # 시그널의 데이터 버전 증가를 요청당 한 번으로 (SQL 계측 안쪽)
 ]
 
 ROOT_URLCONF = 'crm_system.urls'
@@ -73,6 +73,21 @@ DATABASES = {
     }
 }
 
+# 6. 캐시 (상담사별 미결 카운터 등) - 워커 간 공유하려면 REDIS_URL 설정
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # 7. 🌍 언어 및 시간 설정
 LANGUAGE_CODE = 'ko-kr'
 TIME_ZONE = 'Asia/Seoul'
@@ -88,6 +103,11 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# 미디어 전송 위임: None(직접 전송) | 'nginx'(X-Accel-Redirect) | 'sendfile'(X-Sendfile)
+# nginx 예) location /protected-media/ { internal; alias /app/media/; }
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL') or None
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
 AUTH_USER_MODEL = 'sales.User'
 
 # ==============================================================================
@@ -124,24 +144,66 @@ CORS_ALLOW_METHODS = [
     "POST",
     "PUT",
 ]
+
+# 프론트엔드에서 계측 헤더를 읽을 수 있도록 노출
+CORS_EXPOSE_HEADERS = ['Server-Timing', 'X-DB-Queries']
+
 # ==============================================================================
-# 🔥 Firebase Admin SDK 초기화
+# 🔍 요청별 SQL 예산 (URL 이름 기준, 초과 시 느린 쿼리 로그 출력)
 # ==============================================================================
-if not firebase_admin._apps:
-    try:
-        fb_config_str = os.environ.get('FIREBASE_CONFIG')
-        if fb_config_str:
-            fb_config = json.loads(fb_config_str)
-            cred = credentials.Certificate(fb_config)
-            firebase_admin.initialize_app(cred)
-            print("✅ Firebase: 환경 변수를 통해 초기화 완료")
-        else:
-            local_key_path = os.path.join(BASE_DIR, "firebase-admin-sdk.json")
-            if os.path.exists(local_key_path):
-                cred = credentials.Certificate(local_key_path)
-                firebase_admin.initialize_app(cred)
-                print("✅ Firebase: 로컬 파일을 통해 초기화 완료")
-            else:
-                print("⚠️ Firebase: 인증 정보가 없습니다.")
-    except Exception as e:
-        print(f"❌ Firebase 초기화 에러: {e}")
\ No newline at end of file
+SQL_BUDGETS = {
+    'default': {'queries': 50, 'sql_ms': 500},
+    'customer-list': {'queries': 20, 'sql_ms': 1000},
+    'advanced_stats': {'queries': 10, 'sql_ms': 1000},
+    'settlement_batch': {'queries': 1000, 'sql_ms': 10000},
+}
+SQL_LOG_SLOWEST = 5
+
+# ==============================================================================
+# 📈 메트릭 (/api/metrics) - 워커별 스냅샷 파일을 모아 합산
+# ==============================================================================
+METRICS_DIR = os.environ.get('METRICS_DIR')  # 미설정 시 시스템 임시폴더/crm_metrics
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# 토큰이 없을 때 /api/metrics 를 허용할 접속 IP (기본: 같은 서버에서만)
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
+# 🔑 웹훅 유입 고객 중복 방지 정책: 'phone'(번호당 1명) | 'phone_platform'(번호+플랫폼당 1명)
+LEAD_DEDUPE_POLICY = os.environ.get('LEAD_DEDUPE_POLICY', 'phone')
+
+# ==============================================================================
+# 🤖 신규 리드 자동 배정 (LeadCaptureView 에 agent_id 가 없을 때)
+# ==============================================================================
+# STRATEGY: 'least_open'(미결 최소) | 'round_robin' | 'platform_weighted' | '모듈.함수' | '' (배정 안 함)
+LEAD_ASSIGNMENT = {
+    'STRATEGY': os.environ.get('LEAD_ASSIGNMENT_STRATEGY', 'least_open'),
+    'PLATFORM_WEIGHTS': {},  # 예: {'당근': {3: 2, 5: 1}} - 상담사 id 별 숙련도 가중치
+    'AGENTS_TTL': 60,        # 배정 대상 상담사 목록을 캐시하는 시간(초)
+    'LOAD_SYNC_SECONDS': 300,  # 상담사별 미결 카운터(AgentLeadLoad)를 실제 건수로 다시 맞추는 주기(초)
+}
+# ==============================================================================
+# 🔥 Firebase Admin SDK - 실제 초기화는 sales.firebase.get_firebase_app() 첫 호출 시
+# ==============================================================================
+# 우선순위: 환경 변수 FIREBASE_CONFIG(JSON 문자열) > 로컬 키 파일
+FIREBASE_CREDENTIALS_PATH = os.path.join(BASE_DIR, "firebase-admin-sdk.json")
+
+# ==============================================================================
+# 🔔 푸시 발송 (FCM) - 오프라인/테스트 시 PUSH_CLIENT=sales.push.LocalPushClient
+# ==============================================================================
+PUSH_CLIENT = os.environ.get('PUSH_CLIENT', 'sales.push.FirebasePushClient')
+CALLBACK_REMINDER_LEAD_MINUTES = 10  # 재통화 몇 분 전에 알릴지 (manage.py run_callback_reminders)
+CALLBACK_REMINDER_MAX_ATTEMPTS = 3  # 발송 실패한 재통화 알림을 몇 번까지 시도할지 (다음 실행 때 재시도)
+PUSH_FANOUT_SYNC = False  # True 면 업무지시/공지 푸시를 백그라운드 스레드 대신 요청 스레드에서 발송
+SMS_GATEWAY_MAX_CONNECTIONS = 500  # 비동기 게이트웨이 클라이언트(httpx) 워커당 최대 동시 연결 수
+SMS_GATEWAY_POOL_SHARD_SIZE = 10   # 위 연결을 이 크기의 작은 풀로 나눔 - 있는 풀이 꽉 찼을 때만 하나씩 추가 (큰 풀 하나는 배정 비용이 커짐)
+INBOUND_SMS_AUTO_DRAIN = os.environ.get('INBOUND_SMS_AUTO_DRAIN', 'true').lower() == 'true'  # False 면 consume_inbound_sms 명령으로만 처리 (수신 문자 / 발송 결과 웹훅)
+WEBHOOK_QUEUE = {
+    'PROCESSING_TIMEOUT': 300,  # 처리중(PROCESSING)인 채로 이만큼(초) 지난 묶음은 consumer 가 죽은 것으로 보고 다시 대기
+    'MAX_ATTEMPTS': 5,          # 이벤트당 최대 처리 시도 횟수 (넘으면 FAILED 로 남김)
+    'RETRY_DELAY': 60,          # 실패한 이벤트를 다시 대기열에 넣기까지 기다리는 시간(초)
+}
+# 📊 통계/내보내기/코호트/피벗/퍼널은 운영 테이블(Customer, StatusTransition)만 읽습니다.
+# 보관은 마지막 변경 후 ARCHIVE_AFTER_DAYS 가 지난 종료 고객만 옮기므로, 최근 REPORTING_WINDOW_DAYS 일 안의 집계는 온전하고
+# 그보다 오래된 기간을 조회하면 보관된 실패/취소/정산완료 고객이 빠집니다. (ARCHIVE_AFTER_DAYS 는 반드시 더 커야 함)
+REPORTING_WINDOW_DAYS = 365  # 코호트 기본 조회 기간이기도 함
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '400'))  # 종료 상태 고객을 며칠 뒤 보관 테이블로 옮길지 (manage.py archive_customers)
@@ -1,9 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
-from sales import views  
+from sales import views, async_views  
+from sales.media import serve_media
 
 # ==============================================================================
 # 🔄 Router 설정
@@ -13,6 +13,7 @@ router = DefaultRouter()
 # 1. 상담사 및 고객 관리
 router.register(r'agents', views.UserViewSet)
 router.register(r'customers', views.CustomerViewSet, basename='customer')
+router.register(r'archive/customers', views.ArchivedCustomerViewSet, basename='archived-customer')  # 🧊 보관 고객 (읽기 전용)
 
 # 2. 설정 데이터 관리
 router.register(r'platforms', views.PlatformViewSet)
@@ -45,16 +46,29 @@ urlpatterns = [
 
         # 2. 통계 및 설정
         path('stats/advanced/', views.StatisticsView.as_view(), name='advanced_stats'),
+        path('stats/export/', views.StatisticsExportView.as_view(), name='stats_export'),
+        path('stats/funnel/', views.StatusFunnelView.as_view(), name='status_funnel'),
+        path('stats/cohorts/', views.CohortView.as_view(), name='cohorts'),
+        path('stats/pivot/', views.PivotView.as_view(), name='pivot'),
+        path('stats/stage-durations/', views.StageDurationView.as_view(), name='stage_durations'),
         path('dashboard/stats/', views.get_dashboard_stats, name='dashboard_stats'),
         path('system/config/', views.SystemConfigView.as_view(), name='system_config'),
+        path('settlements/batch/', views.SettlementBatchView.as_view(), name='settlement_batch'),
+        path('metrics', views.metrics_view, name='metrics'),
 
         # 3. SMS 및 외부 유입
         path('sms/receive/', views.SMSReceiveView.as_view(), name='sms_receive'),
+        path('sms/status/', views.SMSStatusView.as_view(), name='sms_status'),
         path('sms/test_connection/', views.test_sms_connection),
         path('sms/history/<int:customer_id>/', views.get_sms_history, name='sms_history'),
         path('sales/manual-sms/', views.send_manual_sms, name='send_manual_sms'),
         path('leads/capture/', views.LeadCaptureView.as_view(), name='lead_capture'),
 
+        # 3-1. 위 게이트웨이 호출 API 의 비동기 버전 (ASGI 서버에서 사용)
+        path('async/sms/test_connection/', async_views.test_sms_connection, name='sms_test_connection_async'),
+        path('async/sales/manual-sms/', async_views.send_manual_sms, name='send_manual_sms_async'),
+        path('async/leads/capture/', async_views.lead_capture, name='lead_capture_async'),
+
         # 4. 통화 관련
         path('call/popup/', views.CallPopupView.as_view(), name='call-popup'),
         path('call/record/', views.CallRecordSaveView.as_view(), name='call-record'),
@@ -64,6 +78,7 @@ urlpatterns = [
     ])),
 ]
 
-# 미디어 파일 서빙 설정
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# 미디어 파일 서빙 (서명 URL 또는 로그인 필요, Range/ETag 지원, 운영에서는 MEDIA_ACCEL 로 nginx 등에 위임)
+urlpatterns += [
+    re_path(rf"^{settings.MEDIA_URL.strip('/')}/(?P<path>.+)$", serve_media, name='media'),
+]
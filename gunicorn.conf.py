@@ -0,0 +1,10 @@
+# gunicorn 이 작업 디렉터리의 이 파일을 자동으로 읽습니다.
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm_system.settings')
+
+
+def child_exit(server, worker):
+    """📈 종료된 워커의 메트릭 스냅샷을 지워 /api/metrics 합산에서 빠지게 합니다."""
+    from sales.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,101 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from .db_utils import bulk_update_case
+from .models import CallRecord, ConsultationLog, Customer, SMSLog
+
+
+# ==============================================================================
+# 📊 고객 활동 요약 (목록에서 서브쿼리 없이 '최근 접촉 / 상담기록 수 / 안읽은 문자' 표시)
+# ==============================================================================
+# 기록을 저장하는 쪽에서 같은 트랜잭션 안에 F() UPDATE 로 바로 반영합니다. (읽고 쓰지 않아 동시 저장에도 안전)
+# 같은 증가량의 고객끼리 묶어 UPDATE 하므로 묶음 저장(bulk_create)도 쿼리 몇 번으로 끝납니다.
+ACTIVITY_FIELDS = ['log_count', 'sms_unread_count', 'last_sms_at', 'last_contact_at']
+
+
+def _grouped_by_count(customer_ids):
+    """[1, 1, 2] → {2: [1], 1: [2]} (증가량별 고객 ID)"""
+    groups = defaultdict(list)
+    for customer_id, count in Counter(customer_ids).items():
+        groups[count].append(customer_id)
+    return groups
+
+
+def record_logs(customer_ids, at=None):
+    """상담기록 저장 (고객 ID 를 기록 수만큼 넘김)"""
+    at = at or timezone.now()
+    for count, ids in _grouped_by_count(customer_ids).items():
+        Customer.objects.filter(id__in=ids).update(log_count=F('log_count') + count, last_contact_at=at)
+
+
+def record_sms(customer_ids, direction, at=None):
+    """문자 저장 - 수신(IN)은 안읽은 수 증가"""
+    at = at or timezone.now()
+    for count, ids in _grouped_by_count(customer_ids).items():
+        changes = {'last_sms_at': at, 'last_contact_at': at}
+        if direction == 'IN':
+            changes['sms_unread_count'] = F('sms_unread_count') + count
+        Customer.objects.filter(id__in=ids).update(**changes)
+
+
+def record_call(customer_id, at=None):
+    """통화 녹취 저장"""
+    Customer.objects.filter(id=customer_id).update(last_contact_at=at or timezone.now())
+
+
+def mark_sms_read(customer_id):
+    """담당자가 문자 내역을 열면 안읽은 수를 비움"""
+    Customer.objects.filter(id=customer_id).exclude(sms_unread_count=0, sms_read_at__isnull=False).update(
+        sms_unread_count=0, sms_read_at=timezone.now()
+    )
+
+
+def recount_activity(customer_ids, models=None):
+    """
+    고객 묶음의 활동 요약을 원본 테이블에서 다시 계산해, 값이 다른 고객만 UPDATE ... CASE 한 번으로 고칩니다.
+    models: (Customer, ConsultationLog, SMSLog, CallRecord) - 마이그레이션에서 과거 모델로 돌릴 때만 지정
+    반환: 고친 고객 수
+    """
+    customer_model, log_model, sms_model, call_model = models or (Customer, ConsultationLog, SMSLog, CallRecord)
+    customers = customer_model.objects.filter(id__in=customer_ids).only('id', 'sms_read_at', *ACTIVITY_FIELDS).in_bulk()
+    if not customers:
+        return 0
+    ids = list(customers)
+
+    logs = {
+        row['customer_id']: row for row in log_model.objects.filter(customer_id__in=ids)
+        .values('customer_id').annotate(count=Count('id'), last=Max('created_at'))
+    }
+    sms = {
+        row['customer_id']: row for row in sms_model.objects.filter(customer_id__in=ids)
+        .values('customer_id').annotate(last=Max('created_at'))
+    }
+    unread = dict(
+        sms_model.objects.filter(customer_id__in=ids, direction='IN')
+        .filter(Q(customer__sms_read_at__isnull=True) | Q(created_at__gt=F('customer__sms_read_at')))
+        .values('customer_id').annotate(count=Count('id')).values_list('customer_id', 'count')
+    )
+    calls = dict(
+        call_model.objects.filter(customer_id__in=ids)
+        .values('customer_id').annotate(last=Max('created_at')).values_list('customer_id', 'last')
+    )
+
+    changed = []
+    for customer_id, customer in customers.items():
+        log = logs.get(customer_id, {})
+        last_sms = sms.get(customer_id, {}).get('last')
+        contacts = [t for t in (log.get('last'), last_sms, calls.get(customer_id)) if t]
+        values = {
+            'log_count': log.get('count', 0),
+            'sms_unread_count': unread.get(customer_id, 0),
+            'last_sms_at': last_sms,
+            'last_contact_at': max(contacts) if contacts else None,
+        }
+        if any(getattr(customer, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(customer, field, value)
+            changed.append(customer)
+    bulk_update_case(customer_model, changed, ACTIVITY_FIELDS)
+    return len(changed)
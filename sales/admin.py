@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    User, Customer, ConsultationLog, SMSLog, 
+    User, Customer, ConsultationLog, SMSLog, CallRecord, ArchivedCustomer,
     Platform, FailureReason, CustomStatus, 
     SettlementStatus, SalesProduct,
     AdChannel, Bank  # ⭐️ [추가] 누락되었던 모델 추가
@@ -56,6 +56,25 @@ class LogAdmin(admin.ModelAdmin):
         return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
     content_preview.short_description = "내용"
 
+# 4-1. 통화 녹취 관리
+@admin.register(CallRecord)
+class CallRecordAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'agent', 'file_link', 'duration', 'created_at')
+    search_fields = ('customer__name', 'customer__phone')
+
+# 4-2. 보관 고객 (조회 전용 - manage.py archive_customers 로만 생성)
+@admin.register(ArchivedCustomer)
+class ArchivedCustomerAdmin(admin.ModelAdmin):
+    list_display = ('customer_id', 'name', 'phone', 'owner', 'platform', 'status', 'settlement_status', 'archived_at')
+    search_fields = ('name', 'phone')
+    list_filter = ('status', 'platform')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # 5. 설정 데이터 관리
 @admin.register(Platform)
 class PlatformAdmin(admin.ModelAdmin):
@@ -0,0 +1,238 @@
+import datetime
+import heapq
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import AgentLeadLoad, Customer, User
+from .status_history import update_status
+
+
+# ==============================================================================
+# 🧮 리드(DB) 분배 로직
+# ==============================================================================
+# 종결 상태: 상담사가 더 이상 붙잡고 있지 않은 건 (미결 건수 계산에서 제외)
+CLOSED_STATUSES = ['실패', '실패이관', '접수완료', '설치완료', '해지진행', '접수취소']
+
+# sqlite 변수 개수 제한을 넘지 않도록 IN (...) 을 나눠서 실행
+UPDATE_CHUNK_SIZE = 500
+
+
+def open_lead_counts(agent_ids=None):
+    """상담사별 미결(진행 중) 고객 수를 GROUP BY 한 번으로 가져옵니다."""
+    queryset = Customer.objects.filter(owner__isnull=False).exclude(status__in=CLOSED_STATUSES)
+    if agent_ids is not None:
+        queryset = queryset.filter(owner_id__in=agent_ids)
+    rows = queryset.values('owner_id').annotate(cnt=Count('id')).values_list('owner_id', 'cnt')
+    return dict(rows)
+
+
+def plan_distribution(customer_ids, agents, open_counts):
+    """
+    가중치 라운드로빈 분배 계획을 메모리에서 계산합니다.
+    - agents: [{'id': 3, 'weight': 2, 'cap': 100}, ...]  (weight 기본 1, cap = 이번에 받을 최대 건수)
+    - 매 건마다 (기존 미결 + 이번 배정 + 1) / weight 가 가장 작은 상담사에게 배정
+    반환: ({agent_id: [customer_id, ...]}, 배정되지 못한 customer_id 목록)
+    """
+    plan = {agent['id']: [] for agent in agents}
+    heap = []
+    for agent in agents:
+        weight = float(agent.get('weight') or 1)
+        cap = agent.get('cap')
+        if weight <= 0 or (cap is not None and cap <= 0):
+            continue
+        load = open_counts.get(agent['id'], 0)
+        heapq.heappush(heap, ((load + 1) / weight, agent['id'], load, weight, cap))
+
+    ids = list(customer_ids)
+    for index, customer_id in enumerate(ids):
+        if not heap:
+            return plan, ids[index:]
+        _, agent_id, load, weight, cap = heapq.heappop(heap)
+        plan[agent_id].append(customer_id)
+        load += 1
+        if cap is None or len(plan[agent_id]) < cap:
+            heapq.heappush(heap, ((load + 1) / weight, agent_id, load, weight, cap))
+    return plan, []
+
+
+def apply_distribution(plan, status='재통', actor_id=None):
+    """상담사별로 UPDATE ... WHERE id IN (...) 를 묶어서 한 트랜잭션으로 적용합니다. (상태 이력 포함)"""
+    with transaction.atomic():
+        for agent_id, customer_ids in plan.items():
+            for i in range(0, len(customer_ids), UPDATE_CHUNK_SIZE):
+                update_status(
+                    Customer.objects.filter(id__in=customer_ids[i:i + UPDATE_CHUNK_SIZE]), status, actor_id, owner_id=agent_id
+                )
+
+
+# ==============================================================================
+# 🤖 신규 유입 리드 자동 배정 엔진 (LeadCaptureView)
+# ==============================================================================
+# 상담사별 미결 건수 / 누적 자동 배정 수는 AgentLeadLoad 카운터 행에 둡니다. (워커 공용, 리드마다 GROUP BY 없음)
+# - 고를 때: 읽은 값 그대로일 때만 +1 하는 조건부 UPDATE 로 선점 → 동시에 같은 값을 보고 고른 배정은 다시 읽고 재시도
+# - 종결/재배정: update_status, 일괄 변경, 고객 save()/삭제 에서 F() 로 증감
+# - 원시 SQL 등 놓친 경로는 LOAD_SYNC_SECONDS 마다 GROUP BY 한 번으로 실제 건수에 다시 맞춤
+AGENTS_KEY = 'lead_agents'
+CLAIM_ATTEMPTS = 5
+
+
+def _assignment_settings():
+    return {'STRATEGY': None, 'PLATFORM_WEIGHTS': {}, 'AGENTS_TTL': 60, 'LOAD_SYNC_SECONDS': 300,
+            **getattr(settings, 'LEAD_ASSIGNMENT', {})}
+
+
+def get_assignable_agents():
+    """자동 배정 대상 상담사 id 목록 (활성 AGENT) - 캐시에 잠시 보관"""
+    agent_ids = cache.get(AGENTS_KEY)
+    if agent_ids is None:
+        agent_ids = list(User.objects.filter(role='AGENT', is_active=True).order_by('id').values_list('id', flat=True))
+        cache.set(AGENTS_KEY, agent_ids, _assignment_settings()['AGENTS_TTL'])
+    return agent_ids
+
+
+def _is_open(owner_id, status):
+    return owner_id is not None and status not in CLOSED_STATUSES
+
+
+def adjust_lead_loads(changes):
+    """[(이전 담당자, 이전 상태, 새 담당자, 새 상태), ...] 만큼 상담사별 미결 카운터를 F() 로 증감"""
+    deltas = {}
+    for old_owner, old_status, new_owner, new_status in changes:
+        if _is_open(old_owner, old_status):
+            deltas[old_owner] = deltas.get(old_owner, 0) - 1
+        if _is_open(new_owner, new_status):
+            deltas[new_owner] = deltas.get(new_owner, 0) + 1
+    by_delta = {}
+    for agent_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(agent_id)
+    for delta, agent_ids in by_delta.items():
+        AgentLeadLoad.objects.filter(user_id__in=agent_ids).update(open_leads=F('open_leads') + delta)
+
+
+def sync_lead_loads(agent_ids):
+    """
+    카운터 행을 실제 미결 건수(GROUP BY)로 다시 맞춥니다. 없는 행은 새로 만들되,
+    누적 배정 수는 현재 최솟값에서 시작해 새 상담사에게 라운드로빈 차례가 몰리지 않도록 합니다.
+    """
+    counts = open_lead_counts(agent_ids)
+    start = AgentLeadLoad.objects.filter(user_id__in=agent_ids).aggregate(low=Min('assigned_total'))['low'] or 0
+    now = timezone.now()
+    AgentLeadLoad.objects.bulk_create(
+        [AgentLeadLoad(user_id=a, open_leads=counts.get(a, 0), assigned_total=start, synced_at=now) for a in agent_ids],
+        update_conflicts=True, unique_fields=['user'], update_fields=['open_leads', 'synced_at'],
+    )
+
+
+def _lead_loads(agent_ids):
+    """{상담사 id: 카운터 행} - 행이 없거나 오래 맞추지 않았으면 먼저 동기화"""
+    def read():
+        return {row['user_id']: row for row in AgentLeadLoad.objects.filter(user_id__in=agent_ids).values(
+            'user_id', 'open_leads', 'assigned_total', 'synced_at')}
+
+    loads = read()
+    stale = timezone.now() - datetime.timedelta(seconds=_assignment_settings()['LOAD_SYNC_SECONDS'])
+    if len(loads) < len(agent_ids) or any(r['synced_at'] is None or r['synced_at'] < stale for r in loads.values()):
+        sync_lead_loads(agent_ids)
+        loads = read()
+    return loads
+
+
+def _claim_agent(agent_ids, score):
+    """score(카운터 행) 가 가장 작은 상담사를 골라 조건부 UPDATE 로 선점(+1)합니다. 그 사이 값이 바뀌었으면 다시 읽고 재시도."""
+    for _ in range(CLAIM_ATTEMPTS):
+        loads = _lead_loads(agent_ids)
+        agent_id = min(agent_ids, key=lambda a: (score(loads[a]), a))
+        row = loads[agent_id]
+        claimed = AgentLeadLoad.objects.filter(
+            user_id=agent_id, open_leads=row['open_leads'], assigned_total=row['assigned_total'],
+        ).update(open_leads=F('open_leads') + 1, assigned_total=F('assigned_total') + 1)
+        if claimed:
+            return agent_id
+    # 경합이 계속되면 마지막으로 고른 상담사에게 배정 (증가 자체는 원자적)
+    AgentLeadLoad.objects.filter(user_id=agent_id).update(open_leads=F('open_leads') + 1, assigned_total=F('assigned_total') + 1)
+    return agent_id
+
+
+def _pick_least_loaded(agent_ids, weights=None):
+    """(미결 + 1) / 가중치 가 가장 작은 상담사"""
+    weights = weights or {}
+    candidates = [a for a in agent_ids if weights.get(a, 1) > 0]
+    if not candidates:
+        return None
+    return _claim_agent(candidates, lambda row: (row['open_leads'] + 1) / weights.get(row['user_id'], 1))
+
+
+def round_robin_strategy(agent_ids, platform):
+    """누적 자동 배정 수가 가장 적은 상담사 = 다음 차례"""
+    return _claim_agent(agent_ids, lambda row: row['assigned_total'])
+
+
+def least_open_strategy(agent_ids, platform):
+    return _pick_least_loaded(agent_ids)
+
+
+def platform_weighted_strategy(agent_ids, platform):
+    """PLATFORM_WEIGHTS = {'당근': {상담사id: 가중치}} - 플랫폼 숙련도에 따라 배정 (없으면 최소 미결 기준)"""
+    table = _assignment_settings()['PLATFORM_WEIGHTS'].get(platform or '')
+    if not table:
+        return _pick_least_loaded(agent_ids)
+    weights = {int(k): float(v) for k, v in table.items()}
+    skilled = [a for a in agent_ids if weights.get(a, 0) > 0]
+    if not skilled:
+        return _pick_least_loaded(agent_ids)
+    return _pick_least_loaded(skilled, weights)
+
+
+ASSIGNMENT_STRATEGIES = {
+    'round_robin': round_robin_strategy,
+    'least_open': least_open_strategy,
+    'platform_weighted': platform_weighted_strategy,
+}
+
+
+def pick_agent_for_lead(platform=None):
+    """
+    settings.LEAD_ASSIGNMENT['STRATEGY'] 에 따라 신규 리드의 담당 상담사 id 를 고릅니다.
+    (전략 이름 또는 '모듈.함수' 경로, 함수 시그니처: (agent_ids, platform) -> agent_id)
+    """
+    strategy = _assignment_settings()['STRATEGY']
+    if not strategy:
+        return None
+    agent_ids = get_assignable_agents()
+    if not agent_ids:
+        return None
+    if strategy in ASSIGNMENT_STRATEGIES:
+        func = ASSIGNMENT_STRATEGIES[strategy]
+    else:
+        func = import_string(strategy)
+    return func(agent_ids, platform)
+
+
+# ==============================================================================
+# 🔄 고객 save()/삭제 시 미결 카운터 보정
+# ==============================================================================
+@receiver(post_save, sender=Customer)
+def track_lead_load_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """담당자/상태가 바뀐 저장이면 읽어 온 값과 비교해 카운터 증감 (읽은 값을 모르면 주기 동기화에 맡김)"""
+    if raw or (update_fields is not None and not {'owner', 'status'} & set(update_fields)):
+        return
+    before = (None, None) if created else getattr(instance, '_loaded_assignment', None)
+    after = (instance.owner_id, instance.status)
+    if before is not None and before != after:
+        adjust_lead_loads([(*before, *after)])
+    instance._loaded_assignment = after
+
+
+@receiver(post_delete, sender=Customer)
+def track_lead_load_on_delete(sender, instance, **kwargs):
+    before = getattr(instance, '_loaded_assignment', None)
+    if before is not None:
+        adjust_lead_loads([(*before, None, None)])
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sales'
+
+    def ready(self):
+        # 🔍 SQL 계측 래퍼를 모든 DB 연결에 걸기 위해 첫 연결이 열리기 전에 connection_created 수신기 등록
+        from . import middleware  # noqa: F401
+        # 🤖 고객 저장/삭제 시 자동 배정 미결 카운터를 보정하는 수신기 등록
+        from . import allocation  # noqa: F401
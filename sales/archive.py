@@ -0,0 +1,116 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import ArchivedCustomer, CallRecord, ConsultationLog, Customer, SMSLog, StatusTransition
+
+
+# ==============================================================================
+# 🧊 고객 보관 (핫/콜드 분리)
+# ==============================================================================
+# 종료 상태(실패 / 접수취소 / 정산완료)로 ARCHIVE_AFTER_DAYS 이상 변경이 없던 고객을
+# 상담기록·문자·녹취·상태이력과 함께 ArchivedCustomer 한 행(JSON)으로 옮기고 원본 행은 지웁니다.
+# - 묶음(batch_size 명)마다 트랜잭션 하나: 보관 행 생성 + 원본 삭제가 함께 커밋/롤백
+# - 문자 사진 참조(MediaBlob.refcount)는 보관 행이 그대로 넘겨받음 (보관 행을 지울 때 release)
+# 운영 테이블과 인덱스에는 실제로 일하는 고객만 남습니다.
+# 분석 API 는 보관 고객을 읽지 않으므로 보관 기준은 분석 보장 기간(REPORTING_WINDOW_DAYS)보다 길어야 합니다.
+TERMINAL_STATUSES = ['실패', '접수취소']
+SETTLED_STATUS = '정산완료'
+DEFAULT_BATCH_SIZE = 500
+
+LOG_FIELDS = ('customer_id', 'id', 'created_at', 'content', 'writer__username')
+SMS_FIELDS = ('customer_id', 'id', 'created_at', 'direction', 'status', 'content', 'image',
+              'agent__username', 'gateway_message_id', 'fail_reason')
+CALL_FIELDS = ('customer_id', 'id', 'created_at', 'file_link', 'duration', 'agent__username')
+HISTORY_FIELDS = ('customer_id', 'created_at', 'from_status__name', 'to_status__name', 'actor__username', 'duration')
+
+
+def archive_cutoff(days=None):
+    """보관 기준 시각 - 분석 보장 기간 안의 고객이 집계에서 빠지지 않도록 그보다 짧은 기준은 ValueError"""
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    if days <= settings.REPORTING_WINDOW_DAYS:
+        raise ValueError(
+            f"보관 기준({days}일)은 분석 보장 기간 REPORTING_WINDOW_DAYS({settings.REPORTING_WINDOW_DAYS}일)보다 길어야 합니다."
+        )
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+# updated_at(auto_now) 은 queryset.update / UPDATE ... CASE / 활동 카운터 F() 갱신으로는 바뀌지 않으므로
+# 활동·설치·정산 날짜와 마지막 상태 이력까지 모두 cutoff 이전인 고객만 보관합니다. (= 그 중 가장 늦은 값 < cutoff)
+ACTIVITY_DATETIME_FIELDS = ('updated_at', 'last_contact_at', 'last_sms_at', 'sms_read_at')
+ACTIVITY_DATE_FIELDS = ('upload_date', 'installed_date', 'settlement_complete_date')
+
+
+def archive_candidates(cutoff):
+    recent = Q()
+    for field in ACTIVITY_DATETIME_FIELDS:
+        recent |= Q(**{f'{field}__gte': cutoff})
+    for field in ACTIVITY_DATE_FIELDS:
+        recent |= Q(**{f'{field}__gte': cutoff.date()})
+    recent_transition = StatusTransition.objects.filter(customer=OuterRef('pk'), created_at__gte=cutoff)  # status_tr_customer_idx
+    return Customer.objects.filter(
+        Q(status__in=TERMINAL_STATUSES) | Q(settlement_status=SETTLED_STATUS),
+    ).exclude(recent).exclude(Exists(recent_transition))
+
+
+def _grouped(model, fields, ids):
+    """고객별 기록을 시간순 리스트로 (테이블당 쿼리 한 번)"""
+    grouped = defaultdict(list)
+    rows = model.objects.filter(customer_id__in=ids).order_by('created_at', 'id').values(*fields)
+    for row in rows:
+        grouped[row.pop('customer_id')].append(row)
+    return grouped
+
+
+def archive_batch(ids, cutoff):
+    """
+    후보 고객 ids 를 보관 테이블로 옮깁니다. (트랜잭션 하나)
+    그 사이 상태가 바뀐 고객은 잠금 후 다시 확인해 건너뜁니다.
+    반환: 보관한 고객 수
+    """
+    with transaction.atomic():
+        customers = list(archive_candidates(cutoff).filter(id__in=ids).select_for_update().values())
+        if not customers:
+            return 0
+        ids = [c['id'] for c in customers]
+        logs = _grouped(ConsultationLog, LOG_FIELDS, ids)
+        sms = _grouped(SMSLog, SMS_FIELDS, ids)
+        calls = _grouped(CallRecord, CALL_FIELDS, ids)
+        history = _grouped(StatusTransition, HISTORY_FIELDS, ids)
+
+        ArchivedCustomer.objects.bulk_create([
+            ArchivedCustomer(
+                customer_id=c['id'], phone=c['phone'], name=c['name'], owner_id=c['owner_id'],
+                platform=c['platform'], status=c['status'], settlement_status=c['settlement_status'] or '',
+                upload_date=c['upload_date'], last_updated_at=c['updated_at'],
+                data=c, logs=logs[c['id']], sms=sms[c['id']], calls=calls[c['id']], history=history[c['id']],
+            ) for c in customers
+        ])
+
+        # 사진 참조는 보관 행이 넘겨받으므로, 원본 문자 삭제 시그널이 파일을 지우지 않게 먼저 비움
+        SMSLog.objects.filter(customer_id__in=ids, image__isnull=False).exclude(image='').update(image=None)
+        Customer.objects.filter(id__in=ids).delete()  # 상담기록/문자/녹취/상태이력/재통화 알림은 CASCADE
+    return len(customers)
+
+
+def archive_customers(cutoff, batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """
+    후보를 id 순으로 끊어 묶음별로 보관합니다.
+    반환: 보관한 고객 수
+    """
+    candidates = archive_candidates(cutoff).order_by('id')
+    archived = 0
+    last_id = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        ids = list(candidates.filter(id__gt=last_id).values_list('id', flat=True)[:size])
+        if not ids:
+            break
+        archived += archive_batch(ids, cutoff)
+        last_id = ids[-1]
+        print(f"🧊 [보관] 누적 {archived}명 (마지막 고객 ID {last_id})")
+    return archived
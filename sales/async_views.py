@@ -0,0 +1,156 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.authtoken.models import Token
+
+from .activity import record_sms
+from .ingest import clean_phone, register_lead, get_idempotent_response, store_idempotent_response
+from .metrics import registry as metrics
+from .models import Customer, SMSLog
+from .sms_gateway import asend_traccar_cloud_sms, asend_gateway_sms, new_gateway_message_id
+
+
+# ==============================================================================
+# ⚡ 게이트웨이 호출 위주 엔드포인트의 비동기(ASGI) 버전
+# ==============================================================================
+# DRF 뷰는 동기 전용이라 순수 Django async 뷰로 작성합니다. (요청/응답 형식은 기존 API 와 동일)
+# uvicorn 등 ASGI 서버에서 실행하면 워커 하나가 게이트웨이 응답을 기다리는 수백 건을 동시에 처리합니다.
+#   예) uvicorn crm_system.asgi:application --workers 2
+# ORM 은 비동기 쿼리셋(aget/acreate/asave) 또는 sync_to_async 로 접근합니다.
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+async def get_token_user(request):
+    """DRF TokenAuthentication 과 같은 'Authorization: Token <key>' 헤더 인증"""
+    parts = request.headers.get('Authorization', '').split()
+    if len(parts) != 2 or parts[0].lower() != 'token':
+        return None
+    try:
+        token = await Token.objects.select_related('user').aget(key=parts[1])
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
+
+
+def request_data(request):
+    """JSON 본문 또는 multipart/form 데이터"""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
+
+
+def parse_gateway_config(raw):
+    # FormData(MultiPart)로 오면 문자열이므로 JSON 으로 파싱
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw) if raw else None
+        except ValueError:
+            return None
+    return raw
+
+
+@csrf_exempt
+@require_POST
+async def test_sms_connection(request):
+    if await get_token_user(request) is None:
+        return json_response({"detail": "자격 인증데이터(authentication credentials)가 제공되지 않았습니다."}, status=401)
+    data = request_data(request)
+    phone = data.get('phone')
+    gateway_config = parse_gateway_config(data.get('gateway_config'))
+
+    if not phone or not gateway_config:
+        return json_response({"message": "번호나 설정값이 없습니다."}, status=400)
+
+    test_msg = "[연동테스트] 서버와 휴대폰이 연결되었습니다."
+    if await asend_traccar_cloud_sms(clean_phone(phone), test_msg, gateway_config):
+        return json_response({"message": "테스트 문자 발송 성공!"})
+    return json_response({"message": "발송 실패! 설정값을 확인하세요."}, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def send_manual_sms(request):
+    agent = await get_token_user(request)
+    if agent is None:
+        return json_response({"detail": "자격 인증데이터(authentication credentials)가 제공되지 않았습니다."}, status=401)
+    data = request_data(request)
+    sms_text = (data.get('message') or '').strip()
+    image_file = request.FILES.get('image')
+    gateway_config = parse_gateway_config(data.get('gateway_config'))
+
+    try:
+        customer = await Customer.objects.only('id', 'phone').aget(id=data.get('customer_id'))
+    except (Customer.DoesNotExist, ValueError, TypeError):
+        return json_response({"detail": "찾을 수 없습니다."}, status=404)
+
+    if not sms_text and not image_file:
+        return json_response({"message": "내용 또는 이미지가 필요합니다."}, status=400)
+
+    if not gateway_config:
+        return json_response({"message": "문자 발송 기기 설정 정보가 없습니다."}, status=400)
+
+    if not sms_text and image_file:
+        sms_text = "(사진 첨부)"
+
+    # 이미지 저장(파일 해시 계산/쓰기)이 있어 생성은 스레드에서 실행
+    log = await sync_to_async(SMSLog.objects.create)(
+        customer=customer, agent=agent, content=sms_text, image=image_file, direction='OUT', status='PENDING',
+        gateway_message_id=new_gateway_message_id(),
+    )
+    await sync_to_async(record_sms)([customer.id], 'OUT')
+
+    success, message_id = await asend_gateway_sms(customer.phone, sms_text, gateway_config, log.gateway_message_id)
+    log.status = 'SUCCESS' if success else 'FAIL'
+    log.gateway_message_id = message_id or log.gateway_message_id
+    # 그 사이 발송 결과 웹훅이 SENT/DELIVERED 로 올려 두었으면 되돌리지 않음
+    await SMSLog.objects.filter(pk=log.pk, status='PENDING').aupdate(status=log.status, gateway_message_id=log.gateway_message_id)
+    if success:
+        return json_response({"message": "전송 성공", "log_id": log.id})
+    return json_response({"message": "발송 실패 (기기 연결 확인)", "log_id": log.id})
+
+
+@csrf_exempt
+@require_POST
+async def lead_capture(request):
+    metrics.inc('webhook_events_total', endpoint='lead_capture')
+    # 🧾 광고 플랫폼 재전송(같은 Idempotency-Key)이면 처음 응답을 그대로 반환
+    replay = await sync_to_async(get_idempotent_response)(request, 'lead_capture')
+    if replay:
+        return json_response(replay[1], status=replay[0])
+
+    data = request_data(request)
+    phone = clean_phone(data.get('phone', ''))
+    custom_message = data.get('message')
+    if not phone:
+        return json_response({"message": "연락처 필수"}, status=400)
+
+    customer_id, sender_id, created = await sync_to_async(register_lead)(
+        phone, name=data.get('name', '신규문의'), platform=data.get('platform', '기타'), agent_id=data.get('agent_id')
+    )
+
+    if custom_message and sender_id:
+        log = await SMSLog.objects.acreate(
+            customer_id=customer_id, agent_id=sender_id, content=custom_message, direction='OUT', status='PENDING',
+            gateway_message_id=new_gateway_message_id(),
+        )
+        await sync_to_async(record_sms)([customer_id], 'OUT')
+        success, message_id = await asend_gateway_sms(
+            phone, custom_message, parse_gateway_config(data.get('gateway_config')) or {}, log.gateway_message_id
+        )
+        log.status = 'SUCCESS' if success else 'FAIL'
+        log.gateway_message_id = message_id or log.gateway_message_id
+        # 그 사이 발송 결과 웹훅이 SENT/DELIVERED 로 올려 두었으면 되돌리지 않음
+        await SMSLog.objects.filter(pk=log.pk, status='PENDING').aupdate(status=log.status, gateway_message_id=log.gateway_message_id)
+
+    result = {"message": "고객 등록 완료", "customer_id": customer_id, "created": created}
+    await sync_to_async(store_idempotent_response)(request, 'lead_capture', 201, result)
+    return json_response(result, status=201)
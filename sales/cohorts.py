@@ -0,0 +1,132 @@
+import datetime
+
+from django.conf import settings
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from .models import Customer, User
+
+
+# ==============================================================================
+# 🧮 유입 코호트 분석 (업로드 주/월 × 플랫폼·상담사 → 경과 기간별 설치 전환율)
+# ==============================================================================
+# 필요한 컬럼만 values_list().iterator() 로 읽어 pandas/NumPy 배열로 만든 뒤,
+# 코호트별 집계와 '경과 기간 × 코호트' 누적 전환 행렬을 벡터 연산(groupby / bincount / cumsum)으로 계산합니다.
+# 날짜는 DB 에서 문자열로 받아 pandas 로 한 번에 파싱 (행마다 date 객체를 만들지 않음)
+# 결과는 고객 데이터 버전(data_version) 기준으로 캐시합니다.
+# 기본 기간은 보관(archive)으로 고객이 빠지지 않는 REPORTING_WINDOW_DAYS 입니다.
+COLUMNS = ['upload', 'platform', 'owner_id', 'status', 'installed', 'agent_policy', 'support_amt', 'ad_cost']
+ACCEPTED_STATUSES = ['접수완료', '설치완료', '해지진행']  # StatisticsView 와 같은 기준
+CANCELED_STATUS = '접수취소'
+PERIODS = ('week', 'month')
+GROUP_BY = ('platform', 'owner', 'none')
+DEFAULT_MAX_AGE = {'week': 26, 'month': 12}
+
+
+def _period_index(days, period):
+    """1970-01-01 기준 일수 → 주(월요일 시작) / 월 번호"""
+    import numpy as np
+    if period == 'week':
+        return (days + 3) // 7  # 1970-01-01 은 목요일
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _period_label(index, period):
+    import numpy as np
+    if period == 'week':
+        monday = np.datetime64(int(index) * 7 - 3, 'D')
+        return str(monday)
+    return str(np.datetime64(int(index), 'M'))
+
+
+def build_cohorts(period='month', group_by='platform', start_date=None, end_date=None, max_age=None):
+    import numpy as np
+    import pandas as pd  # 코호트 분석 시에만 로딩
+
+    max_age = DEFAULT_MAX_AGE[period] if max_age is None else max_age
+    end_date = end_date or datetime.date.today()
+    start_date = start_date or end_date - datetime.timedelta(days=settings.REPORTING_WINDOW_DAYS)
+
+    rows = Customer.objects.filter(upload_date__range=[start_date, end_date]).annotate(
+        upload=Cast('upload_date', CharField()), installed=Cast('installed_date', CharField()),
+    ).values_list(*COLUMNS)
+    df = pd.DataFrame.from_records(rows.iterator(chunk_size=10000), columns=COLUMNS)
+    result = {
+        'period': period, 'group_by': group_by, 'start_date': str(start_date), 'end_date': str(end_date),
+        'ages': list(range(max_age + 1)), 'cohorts': [],
+    }
+    if df.empty:
+        return result
+
+    # 1. 날짜 → 일수(int64) → 코호트 번호 / 경과 기간
+    epoch = np.datetime64('1970-01-01', 'D')
+    upload_days = (pd.to_datetime(df['upload'], format='%Y-%m-%d').to_numpy('datetime64[D]') - epoch).astype(np.int64)
+    installed = pd.to_datetime(df['installed'], format='%Y-%m-%d').to_numpy('datetime64[D]')
+    has_installed = ~np.isnat(installed)
+    installed_days = np.where(has_installed, (installed - epoch).astype(np.int64), 0)
+
+    cohort = _period_index(upload_days, period)
+    age = np.where(has_installed, _period_index(installed_days, period) - cohort, -1)
+    today_days = (np.datetime64(datetime.date.today(), 'D') - epoch).astype(np.int64)
+    today_index = int(_period_index(np.array([today_days]), period)[0])
+
+    # 2. 그룹 키
+    if group_by == 'platform':
+        group = df['platform'].fillna('기타').replace('', '기타')
+    elif group_by == 'owner':
+        group = df['owner_id'].fillna(0).astype(np.int64)
+    else:
+        group = pd.Series(0, index=df.index)
+
+    status = df['status']
+    accepted = status.isin(ACCEPTED_STATUSES).to_numpy()
+    revenue = (df['agent_policy'].fillna(0).to_numpy(np.int64) - df['support_amt'].fillna(0).to_numpy(np.int64)) * 10000
+    frame = pd.DataFrame({
+        'cohort': cohort, 'group': group.to_numpy(),
+        'accepted': accepted, 'installed': has_installed,
+        'canceled': (status == CANCELED_STATUS).to_numpy(),
+        'accepted_revenue': np.where(accepted, revenue, 0),
+        'installed_revenue': np.where(status.to_numpy() == '설치완료', revenue, 0),
+        'ad_cost': df['ad_cost'].fillna(0).to_numpy(np.int64),
+    })
+
+    # 3. 코호트 × 그룹 집계
+    grouped = frame.groupby(['cohort', 'group'], sort=True)
+    summary = grouped.agg(
+        leads=('accepted', 'size'), accepted=('accepted', 'sum'), installed=('installed', 'sum'),
+        canceled=('canceled', 'sum'), accepted_revenue=('accepted_revenue', 'sum'),
+        installed_revenue=('installed_revenue', 'sum'), ad_cost=('ad_cost', 'sum'),
+    )
+
+    # 4. 경과 기간별 설치 수 → 누적 전환율 행렬 (키 × 경과기간 bincount 한 번)
+    key = grouped.ngroup().to_numpy()
+    width = max_age + 1
+    in_window = (age >= 0) & (age <= max_age)
+    counts = np.bincount(key[in_window] * width + age[in_window], minlength=len(summary) * width)
+    cumulative = counts.reshape(len(summary), width).cumsum(axis=1)
+    leads = summary['leads'].to_numpy()
+    rates = np.round(cumulative / leads[:, None] * 100, 1)
+    cohort_index = summary.index.get_level_values('cohort').to_numpy()
+    observable = (today_index - cohort_index)[:, None] >= np.arange(width)[None, :]  # 아직 오지 않은 기간은 비움
+
+    owner_names = {}
+    if group_by == 'owner':
+        owner_names = dict(User.objects.filter(id__in=[g for g in summary.index.get_level_values('group') if g]).values_list('id', 'username'))
+
+    for i, ((cohort_value, group_value), row) in enumerate(summary.iterrows()):
+        if group_by == 'owner':
+            group_label = owner_names.get(int(group_value), '미배정' if not group_value else str(group_value))
+        elif group_by == 'platform':
+            group_label = group_value
+        else:
+            group_label = '전체'
+        result['cohorts'].append({
+            'cohort': _period_label(cohort_value, period),
+            'group': group_label,
+            'leads': int(row['leads']), 'accepted': int(row['accepted']), 'installed': int(row['installed']),
+            'canceled': int(row['canceled']),
+            'accepted_revenue': int(row['accepted_revenue']), 'installed_revenue': int(row['installed_revenue']),
+            'ad_cost': int(row['ad_cost']),
+            'installed_rate': [float(r) if ok else None for r, ok in zip(rates[i], observable[i])],
+        })
+    return result
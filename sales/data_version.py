@@ -0,0 +1,92 @@
+import contextvars
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+
+# ==============================================================================
+# 🔢 고객 데이터 버전 (분석 결과 캐시 무효화용)
+# ==============================================================================
+# 고객 행을 바꾸는 경로(save/delete 시그널, update_status, 일괄 변경, 정산 반영, 웹훅 upsert)가
+# 버전을 올리고 (시그널은 요청당 한 번 - DataVersionMiddleware), 코호트/피벗 같은 무거운 집계는 '버전 + 파라미터' 키로 캐시합니다.
+# 버전은 DataVersion 한 행(DB)에 두므로 다른 워커나 관리 명령(archive_customers 등)이 올린 것도 바로 보입니다.
+# (결과 캐시가 워커별 LocMem 이어도 버전이 바뀌면 키가 달라져 예전 결과는 쓰이지 않음)
+VERSION_NAME = 'customer'
+RESULT_TIMEOUT = 60 * 60
+
+
+def current_version():
+    from .models import DataVersion
+    return DataVersion.objects.filter(name=VERSION_NAME).values_list('version', flat=True).first() or 1
+
+
+def _bump():
+    from .models import DataVersion
+    if not DataVersion.objects.filter(name=VERSION_NAME).update(version=F('version') + 1):
+        DataVersion.objects.bulk_create([DataVersion(name=VERSION_NAME, version=1)], ignore_conflicts=True)
+        DataVersion.objects.filter(name=VERSION_NAME).update(version=F('version') + 1)
+
+
+def _bumped():
+    """on_commit 목록의 표시 - 이 트랜잭션에서 이미 버전을 올렸음 (롤백되면 표시도 함께 사라짐)"""
+
+
+def bump_version():
+    """
+    고객 데이터가 바뀌었음을 알립니다.
+    트랜잭션 안이면 같은 커밋에 한 번만 반영합니다. (행마다 시그널이 와도 UPDATE 1번, 추가 커밋 없음)
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        if any(_bumped in callback for callback in connection.run_on_commit):
+            return
+        transaction.on_commit(_bumped)
+    _bump()
+
+
+# 요청 동안 save()/delete() 시그널이 올린 '바뀜' 표시 - DataVersionMiddleware 가 응답 후 한 번만 반영
+# (ASGI 에서 ORM 이 도는 sync_to_async 스레드로도 컨텍스트가 복사되므로 같은 dict 를 봄)
+_deferred = contextvars.ContextVar('data_version_deferred', default=None)
+
+
+def defer_bumps():
+    """이후 bump_after_request() 를 모아 둡니다. 반환: finish_deferred_bumps() 에 넘길 토큰"""
+    return _deferred.set({'changed': False})
+
+
+def finish_deferred_bumps(token):
+    """모으기를 끝냅니다. 반환: 그 사이 바뀐 것이 있었는지 (있으면 호출한 쪽이 bump_version() 한 번)"""
+    state = _deferred.get()
+    _deferred.reset(token)
+    return state['changed']
+
+
+def bump_after_request():
+    """
+    행 단위 시그널용 bump_version() - 요청 중이면 표시만 하고 응답 후 한 번에 올립니다.
+    (고객 저장마다 전역 DataVersion 행을 UPDATE 하지 않도록) 요청 밖(관리 명령 등)이면 바로 bump_version().
+    """
+    state = _deferred.get()
+    if state is None:
+        bump_version()
+    else:
+        state['changed'] = True
+
+
+def cached_result(prefix, params, compute, timeout=RESULT_TIMEOUT):
+    """
+    현재 데이터 버전 + 파라미터로 캐시된 결과를 돌려주고, 없으면 compute() 로 만들어 저장합니다.
+    반환: (결과, 캐시 적중 여부)
+    """
+    version = current_version()
+    digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"{prefix}:{version}:{digest}"
+    result = cache.get(key)
+    if result is not None:
+        return result, True
+    result = compute()
+    cache.set(key, result, timeout)
+    return result, False
@@ -0,0 +1,47 @@
+from django.db import connection
+
+
+# ==============================================================================
+# ⚡ 대량 UPDATE 유틸리티
+# ==============================================================================
+def bulk_update_case(model, objs, fields, batch_size=None):
+    """
+    Model.objects.bulk_update 와 같은 결과를 내지만, When/Case 표현식 객체를 만들지 않고
+    `UPDATE ... SET col = CASE id WHEN %s THEN %s ... END WHERE id IN (...)` SQL 을 직접 조립합니다.
+    (수만 건 갱신 시 Django bulk_update 의 파이썬 쪽 비용이 SQL 실행보다 훨씬 커서 사용)
+    반환: 갱신된 행 수
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+    meta = model._meta
+    qn = connection.ops.quote_name
+    pk = meta.pk
+    concrete = [meta.get_field(name) for name in fields]
+    cast = connection.features.requires_casted_case_in_updates
+
+    max_params = connection.features.max_query_params or 10000
+    per_row = 2 * len(concrete) + 1
+    batch_size = min(batch_size or len(objs), max(1, max_params // per_row))
+
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            ids = [pk.get_db_prep_value(obj.pk, connection) for obj in batch]
+            set_clauses, params = [], []
+            for field in concrete:
+                placeholder = f"CAST(%s AS {field.cast_db_type(connection)})" if cast else "%s"
+                whens = []
+                for obj, obj_id in zip(batch, ids):
+                    whens.append(f"WHEN %s THEN {placeholder}")
+                    params.extend([obj_id, field.get_db_prep_save(getattr(obj, field.attname), connection)])
+                set_clauses.append(f"{qn(field.column)} = CASE {qn(pk.column)} {' '.join(whens)} ELSE {qn(field.column)} END")
+            params.extend(ids)
+            cursor.execute(
+                f"UPDATE {qn(meta.db_table)} SET {', '.join(set_clauses)} "
+                f"WHERE {qn(pk.column)} IN ({', '.join(['%s'] * len(ids))})",
+                params,
+            )
+            updated += cursor.rowcount
+    return updated
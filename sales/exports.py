@@ -0,0 +1,106 @@
+import csv
+import datetime
+import tempfile
+from urllib.parse import quote
+
+from django.http import FileResponse, StreamingHttpResponse
+
+
+# ==============================================================================
+# 📤 대용량 내보내기 (CSV 스트리밍 / XLSX write-only)
+# ==============================================================================
+CHUNK_SIZE = 2000
+
+# (헤더, values_list 경로)
+CUSTOMER_EXPORT_COLUMNS = [
+    ('ID', 'id'), ('고객명', 'name'), ('전화번호', 'phone'), ('플랫폼', 'platform'),
+    ('상태', 'status'), ('담당자', 'owner__username'), ('업로드일', 'upload_date'),
+    ('재통화예정', 'callback_schedule'), ('거래처', 'client'), ('상품정보', 'product_info'),
+    ('본사정책', 'policy_amt'), ('상담사정책', 'agent_policy'), ('지원금', 'support_amt'),
+    ('광고비', 'ad_cost'), ('설치일', 'installed_date'), ('최근메모', 'last_memo'),
+]
+
+SETTLEMENT_EXPORT_COLUMNS = [
+    ('ID', 'id'), ('고객명', 'name'), ('전화번호', 'phone'), ('플랫폼', 'platform'),
+    ('거래처', 'client'), ('상태', 'status'), ('담당자', 'owner__username'),
+    ('설치일', 'installed_date'), ('본사정책', 'policy_amt'), ('상담사정책', 'agent_policy'),
+    ('지원금', 'support_amt'), ('정산상태', 'settlement_status'), ('정산예정일', 'settlement_due_date'),
+    ('정산완료일', 'settlement_complete_date'), ('정산메모', 'settlement_memo'),
+]
+
+
+class Echo:
+    """csv.writer 가 쓰는 값을 그대로 돌려주는 가짜 버퍼"""
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    return value
+
+
+def queryset_rows(queryset, columns):
+    """values_list(...).iterator() 로 DB 커서에서 필요한 만큼씩만 읽습니다."""
+    paths = [path for _, path in columns]
+    for row in queryset.values_list(*paths).iterator(chunk_size=CHUNK_SIZE):
+        yield [_cell(v) for v in row]
+
+
+def _attachment(response, filename):
+    response['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+def stream_csv(filename, header, rows):
+    """첫 줄부터 바로 내려보내는 CSV 응답 (엑셀 한글 깨짐 방지용 BOM 포함)"""
+    writer = csv.writer(Echo())
+
+    def generate():
+        yield '\ufeff' + writer.writerow(header)
+        buffer = []
+        for row in rows:
+            buffer.append(writer.writerow(row))
+            if len(buffer) >= 500:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+    return _attachment(response, filename)
+
+
+def xlsx_response(filename, header, rows, sheet_title='Sheet1'):
+    """
+    openpyxl write-only 모드로 행을 디스크 임시파일에 바로 기록한 뒤 파일째 내려보냅니다.
+    (XLSX 는 zip 마지막에 목차가 붙는 형식이라 완성 후 전송 - 메모리는 행 수와 무관하게 일정)
+    """
+    from openpyxl import Workbook  # 엑셀 내보내기 시에만 로딩
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    response = FileResponse(
+        output, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    return _attachment(response, filename)
+
+
+def export_response(request, name, header, rows, sheet_title='Sheet1'):
+    """?file_format=csv(기본) | xlsx"""
+    stamp = datetime.date.today().strftime('%Y%m%d')
+    if request.query_params.get('file_format') == 'xlsx':
+        return xlsx_response(f'{name}_{stamp}.xlsx', header, rows, sheet_title)
+    return stream_csv(f'{name}_{stamp}.csv', header, rows)
+
+
+def export_queryset(request, name, queryset, columns, sheet_title='Sheet1'):
+    header = [title for title, _ in columns]
+    return export_response(request, name, header, queryset_rows(queryset, columns), sheet_title)
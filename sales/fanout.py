@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import User, TodoTask, Notice, PushDelivery
+from .push import get_push_client
+from .todo_inbox import mark_delivered
+
+
+# ==============================================================================
+# 📣 업무지시 / 공지 푸시 팬아웃 (커밋 후 백그라운드 발송)
+# ==============================================================================
+# 요청 처리 스레드는 커밋 직후 작업만 넘기고 바로 응답합니다.
+# 워커 프로세스당 전용 스레드 1개가 수신자 조회 → 500 토큰 단위 multicast → 수신자별 기록을 처리합니다.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='push-fanout')
+
+
+def resolve_recipients(kind, object_id):
+    """수신자 (id, fcm_token) 목록을 쿼리 한 번으로 가져옵니다. 반환: (recipients, title, body)"""
+    agents = User.objects.filter(role='AGENT', is_active=True)
+    if kind == 'todo':
+        task = TodoTask.objects.filter(id=object_id).values('content').first()
+        if task is None:
+            return [], '', ''
+        # 수신자는 업무지시 생성 시 만들어진 받은함 행 기준
+        recipients = User.objects.filter(todo_receipts__task_id=object_id, is_active=True)
+        title, body = "📋 새 업무 지시", task['content'][:100]
+    else:
+        notice = Notice.objects.filter(id=object_id).values('is_important', 'title').first()
+        # 일반 공지는 푸시 없이 목록에서만 확인
+        if notice is None or not notice['is_important']:
+            return [], '', ''
+        recipients, title, body = agents, "📢 중요 공지", notice['title'][:100]
+    return list(recipients.values_list('id', 'fcm_token')), title, body
+
+
+def run_fanout(kind, object_id, client=None):
+    """수신자별 발송 기록을 만들고 multicast 로 발송한 뒤 결과를 기록합니다. 반환: 성공 건수"""
+    recipients, title, body = resolve_recipients(kind, object_id)
+    if not recipients:
+        return 0
+
+    PushDelivery.objects.bulk_create([
+        PushDelivery(kind=kind, object_id=object_id, recipient_id=user_id, status='PENDING' if token else 'NO_TOKEN')
+        for user_id, token in recipients
+    ], ignore_conflicts=True)
+
+    # 이미 처리된 수신자는 제외 (같은 건을 다시 팬아웃해도 중복 발송하지 않음)
+    pending = set(PushDelivery.objects.filter(kind=kind, object_id=object_id, status='PENDING').values_list('recipient_id', flat=True))
+    targets = [(user_id, token) for user_id, token in recipients if token and user_id in pending]
+    if not targets:
+        return 0
+
+    deliveries = PushDelivery.objects.filter(kind=kind, object_id=object_id)
+    try:
+        results = (client or get_push_client()).send_multicast(
+            [token for _, token in targets], title, body, {'type': kind, 'id': object_id}
+        )
+    except Exception as e:
+        print(f"❌ 푸시 팬아웃 오류 ({kind}#{object_id}): {e}")
+        deliveries.filter(recipient_id__in=[u for u, _ in targets]).update(status='FAILED', error=str(e)[:1000])
+        return 0
+
+    sent = [user_id for (user_id, _), result in zip(targets, results) if result.success]
+    deliveries.filter(recipient_id__in=sent).update(status='SENT', sent_at=timezone.now())
+    if kind == 'todo':
+        mark_delivered(object_id, sent)
+    failures = {}
+    for (user_id, _), result in zip(targets, results):
+        if not result.success:
+            failures.setdefault(result.error[:1000], []).append(user_id)
+    for error, user_ids in failures.items():
+        deliveries.filter(recipient_id__in=user_ids).update(status='FAILED', error=error)
+    return len(sent)
+
+
+def _run_in_background(kind, object_id):
+    try:
+        run_fanout(kind, object_id)
+    except Exception as e:
+        print(f"❌ 푸시 팬아웃 처리 실패 ({kind}#{object_id}): {e}")
+    finally:
+        close_old_connections()
+
+
+def schedule_fanout(kind, object_id):
+    """현재 트랜잭션이 커밋된 뒤 팬아웃을 시작합니다. (PUSH_FANOUT_SYNC=True 면 즉시 같은 스레드에서 실행)"""
+    if getattr(settings, 'PUSH_FANOUT_SYNC', False):
+        transaction.on_commit(lambda: run_fanout(kind, object_id))
+    else:
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, kind, object_id))
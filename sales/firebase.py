@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+# ==============================================================================
+# 🔥 Firebase Admin SDK 지연 초기화
+# ==============================================================================
+# settings 로딩 시점에 firebase_admin 을 import 하면 모든 워커/manage.py 명령이
+# gRPC·google-auth 로딩 비용을 치르게 되므로, 실제로 푸시를 보낼 때 처음 초기화합니다.
+
+_app = None
+_initialized = False
+_retry_at = 0.0  # 초기화 실패 후 다음 시도 시각 (time.monotonic 기준)
+_lock = threading.Lock()
+RETRY_SECONDS = 30
+
+
+def get_firebase_app():
+    """
+    Firebase 앱을 (필요할 때 한 번만) 초기화해서 반환합니다. 인증 정보가 없거나 초기화에 실패하면 None.
+    성공했을 때만 초기화 완료로 표시하고, 실패하면 RETRY_SECONDS 뒤 다음 호출에서 다시 시도합니다.
+    """
+    global _app, _initialized, _retry_at
+    if _initialized:
+        return _app
+    if time.monotonic() < _retry_at:
+        return None
+
+    with _lock:  # 여러 스레드가 동시에 initialize_app 을 부르지 않도록
+        if _initialized:
+            return _app
+
+        import firebase_admin
+        from firebase_admin import credentials
+
+        if firebase_admin._apps:
+            _app, _initialized = firebase_admin.get_app(), True
+            return _app
+
+        try:
+            fb_config_str = os.environ.get('FIREBASE_CONFIG')
+            if fb_config_str:
+                cred = credentials.Certificate(json.loads(fb_config_str))
+                _app = firebase_admin.initialize_app(cred)
+                print("✅ Firebase: 환경 변수를 통해 초기화 완료")
+            elif os.path.exists(settings.FIREBASE_CREDENTIALS_PATH):
+                cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+                _app = firebase_admin.initialize_app(cred)
+                print("✅ Firebase: 로컬 파일을 통해 초기화 완료")
+            else:
+                print("⚠️ Firebase: 인증 정보가 없습니다.")
+        except Exception as e:
+            print(f"❌ Firebase 초기화 에러: {e}")
+
+        if _app is None:
+            _retry_at = time.monotonic() + RETRY_SECONDS
+        else:
+            _initialized = True
+    return _app
+
+
+def get_messaging():
+    """firebase_admin.messaging 모듈 (앱 초기화 포함). Firebase 를 쓸 수 없으면 None."""
+    if get_firebase_app() is None:
+        return None
+    from firebase_admin import messaging
+    return messaging
@@ -0,0 +1,148 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .activity import record_sms
+from .ingest import clean_phone, find_customers_by_phone
+from .models import Customer, InboundSMSEvent, SMSLog
+from .status_history import update_status
+from .webhook_queue import claim_batch, fail_batch, recover_queue
+
+
+# ==============================================================================
+# 📥 수신 문자 웹훅 큐 (빠른 응답 → 묶음 처리)
+# ==============================================================================
+# 웹훅은 원본을 InboundSMSEvent 에 한 줄 INSERT(같은 메시지 ID 재전송은 무시) 하고 바로 200 을 돌려줍니다.
+# 처리는 묶음 단위로: 번호 조회 1회 → SMSLog bulk_create → 활동 요약 F() UPDATE → '부재' → '재통' UPDATE 1회
+# - consume_inbound_sms 명령(별도 프로세스)으로 계속 돌리거나
+# - INBOUND_SMS_AUTO_DRAIN=True(기본) 면 웹훅 직후 워커 프로세스의 백그라운드 스레드가 대기열을 비웁니다.
+BATCH_SIZE = 500
+
+
+def extract_inbound_sms(data):
+    """
+    웹훅 본문에서 (발신번호, 내용, 메시지 ID, 기기 ID) 추출
+    SMS Gateway 웹훅 형식: {"deviceId", "event": "sms:received", "payload": {"messageId", "phoneNumber", "message"}}
+    """
+    if 'payload' in data:
+        # 웹훅 등록 방식으로 올 경우
+        payload = data.get('payload') or {}
+        return payload.get('phoneNumber'), payload.get('message'), payload.get('messageId'), data.get('deviceId')
+    # 그 외 일반적인 전송 방식일 경우 (예비용)
+    return (data.get('from') or data.get('sender'), data.get('message') or data.get('text'),
+            data.get('messageId') or data.get('id'), data.get('deviceId'))
+
+
+def enqueue_inbound_sms(data):
+    """
+    검증 후 원본을 대기열에 넣습니다. 같은 메시지 ID 의 재전송은 충돌 무시 INSERT 로 건너뜁니다.
+    반환: 필수값이 없으면 False, 아니면 True
+    """
+    from_num, msg_content, message_id, device_id = extract_inbound_sms(data)
+    if not from_num or not msg_content:
+        return False
+    payload = data.dict() if hasattr(data, 'dict') else dict(data)  # form 전송이면 QueryDict
+    InboundSMSEvent.objects.bulk_create([InboundSMSEvent(
+        from_number=str(from_num)[:30], message=msg_content, payload=payload,
+        gateway_message_id=str(message_id)[:64] if message_id else None, device_id=str(device_id or '')[:64],
+    )], ignore_conflicts=True)
+    if getattr(settings, 'INBOUND_SMS_AUTO_DRAIN', True):
+        transaction.on_commit(schedule_drain)
+    return True
+
+
+def _unsaved_logs(logs):
+    """이미 저장된 (메시지 ID, 기기 ID) 의 문자를 뺀 목록 (재전송이 안읽은 수를 다시 올리지 않도록)"""
+    message_ids = {log.gateway_message_id for log in logs if log.gateway_message_id}
+    if not message_ids:
+        return logs
+    saved = set(SMSLog.objects.filter(gateway_message_id__in=message_ids).values_list('gateway_message_id', 'device_id'))
+    return [log for log in logs if (log.gateway_message_id, log.device_id) not in saved]
+
+
+def process_inbound_batch(batch_size=BATCH_SIZE):
+    """
+    대기 중인 이벤트를 한 묶음 처리합니다. 여러 consumer 가 동시에 돌아도 묶음 ID 로 선점해 겹치지 않습니다. (webhook_queue)
+    반환: {'saved', 'ignored', 'failed'} (대기열이 비었으면 None)
+    """
+    batch_id = claim_batch(InboundSMSEvent, batch_size)
+    if batch_id is None:
+        return None
+    events = list(InboundSMSEvent.objects.filter(batch_id=batch_id).order_by('id').only('id', 'from_number', 'message', 'gateway_message_id', 'device_id'))
+
+    # 1. 번호 조회 한 번
+    customers = find_customers_by_phone(e.from_number for e in events)
+
+    logs, saved_ids, ignored_ids, no_owner_ids, recall_ids = [], [], [], [], set()
+    for event in events:
+        customer = customers.get(clean_phone(event.from_number))
+        if customer is None:
+            ignored_ids.append(event.id)
+        elif customer['owner_id'] is None:
+            no_owner_ids.append(event.id)  # SMSLog 는 담당 상담사가 필수
+        else:
+            logs.append(SMSLog(
+                customer_id=customer['id'], agent_id=customer['owner_id'], content=event.message,
+                direction='IN', status='RECEIVED',
+                gateway_message_id=event.gateway_message_id, device_id=event.device_id,
+            ))
+            saved_ids.append(event.id)
+            if customer['status'] == '부재':
+                recall_ids.add(customer['id'])
+
+    now = timezone.now()
+    events_in_batch = InboundSMSEvent.objects.filter(batch_id=batch_id)
+    try:
+        with transaction.atomic():
+            # 2. 문자 저장 한 번, 3. 고객 상태가 '부재'였다면 '재통'으로 한 번에 변경
+            # 이미 저장된 메시지 ID 는 미리 빼서 새로 저장한 문자만 셈 (대기열 이전에 들어온 재전송 등)
+            logs = _unsaved_logs(logs)
+            recall_ids &= {log.customer_id for log in logs}
+            SMSLog.objects.bulk_create(logs, batch_size=500, ignore_conflicts=True)
+            record_sms([log.customer_id for log in logs], 'IN', now)  # 최근 문자 시간 / 안읽은 수
+            if recall_ids:
+                update_status(Customer.objects.filter(id__in=recall_ids, status='부재'), '재통')
+            events_in_batch.filter(id__in=saved_ids).update(status='DONE', processed_at=now)
+            events_in_batch.filter(id__in=ignored_ids).update(status='IGNORED', processed_at=now)
+            events_in_batch.filter(id__in=no_owner_ids).update(status='IGNORED', processed_at=now, error='담당 상담사 없음')
+    except Exception as e:
+        print(f"❌ 수신 문자 묶음 처리 실패: {e}")
+        fail_batch(InboundSMSEvent, batch_id, e)
+        return {'saved': 0, 'ignored': 0, 'failed': len(events)}
+    return {'saved': len(saved_ids), 'ignored': len(ignored_ids) + len(no_owner_ids), 'failed': 0}
+
+
+def drain_inbound_queue(batch_size=BATCH_SIZE):
+    """멈춘 묶음 / 실패 이벤트를 대기열로 되돌린 뒤 빌 때까지 묶음 처리. 반환: 합계"""
+    recover_queue(InboundSMSEvent)
+    totals = {'saved': 0, 'ignored': 0, 'failed': 0}
+    while True:
+        result = process_inbound_batch(batch_size)
+        if result is None:
+            return totals
+        for key, value in result.items():
+            totals[key] += value
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inbound-sms')
+_drain_pending = threading.Event()
+
+
+def _drain_in_background():
+    _drain_pending.clear()  # 처리 도중 들어온 웹훅은 다음 drain 을 다시 예약
+    try:
+        drain_inbound_queue()
+    except Exception as e:
+        print(f"❌ 수신 문자 대기열 처리 오류: {e}")
+    finally:
+        close_old_connections()
+
+
+def schedule_drain():
+    """웹훅이 몰려도 대기 중인 drain 은 하나만 예약 (그 사이 쌓인 이벤트는 한 묶음으로 처리)"""
+    if not _drain_pending.is_set():
+        _drain_pending.set()
+        _executor.submit(_drain_in_background)
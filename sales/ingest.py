@@ -0,0 +1,201 @@
+import re
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+
+from .allocation import adjust_lead_loads, pick_agent_for_lead
+from .data_version import bump_version
+from .models import Customer, IdempotencyKey, User
+from .status_history import record_transitions
+
+
+# [유틸리티] 전화번호 정규화
+def clean_phone(phone):
+    if not phone: return ""
+    cleaned = re.sub(r'[^0-9]', '', str(phone))
+    if cleaned.startswith('82') and len(cleaned) > 10:
+        cleaned = '0' + cleaned[2:]
+    return cleaned
+
+
+def dedupe_key_for(phone, platform=None):
+    """
+    LEAD_DEDUPE_POLICY 에 따른 중복 방지 키
+    - 'phone': 정규화된 번호 하나당 고객 1명
+    - 'phone_platform': 같은 번호라도 유입 플랫폼이 다르면 별도 고객
+    """
+    phone = clean_phone(phone)
+    if not phone:
+        return None
+    if getattr(settings, 'LEAD_DEDUPE_POLICY', 'phone') == 'phone_platform':
+        return f"{phone}|{platform or ''}"
+    return phone
+
+
+# ==============================================================================
+# 🔁 고객 upsert (INSERT ... ON CONFLICT 한 문장)
+# ==============================================================================
+def upsert_customer(phone, platform=None, **fields):
+    """
+    dedupe_key 기준으로 고객을 한 문장으로 등록합니다. 이미 있으면 아무것도 바꾸지 않고 기존 고객을 돌려줍니다.
+    반환: (customer_id, owner_id, created)
+    동시에 같은 번호가 들어와도 유니크 제약 덕분에 한 건만 생성됩니다.
+    """
+    phone = clean_phone(phone)
+    customer = Customer(phone=phone, platform=platform, dedupe_key=dedupe_key_for(phone, platform), **fields)
+
+    qn = connection.ops.quote_name
+    columns, params = [], []
+    for field in Customer._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        columns.append(qn(field.column))
+        params.append(field.get_db_prep_save(field.pre_save(customer, add=True), connection))
+
+    # 새로 들어간 경우에만 RETURNING 행이 나오므로 그 자체가 '생성됨' 표시
+    sql = (
+        f"INSERT INTO {qn(Customer._meta.db_table)} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({qn('dedupe_key')}) DO NOTHING "
+        f"RETURNING {qn('id')}, {qn('owner_id')}"
+    )
+    for _ in range(3):
+        with transaction.atomic():  # 고객 INSERT 와 첫 상태 이력을 함께 커밋
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+            if row:
+                customer_id, owner_id = row
+                record_transitions([(customer_id, None, customer.status)])  # 🧭 신규 등록도 상태 이력의 시작점
+                bump_version()
+                return customer_id, owner_id, True
+        # 이미 있는 키 → 기존 고객 (그 사이 지워졌으면 다시 INSERT 시도)
+        existing = Customer.objects.filter(dedupe_key=customer.dedupe_key).values_list('id', 'owner_id').first()
+        if existing:
+            return existing[0], existing[1], False
+    raise IntegrityError(f"고객 upsert 실패: {customer.dedupe_key}")
+
+
+def register_lead(phone, name='신규문의', platform='기타', agent_id=None):
+    """
+    광고 유입 고객 등록 - 담당자 미지정 시 배정 엔진(LEAD_ASSIGNMENT)으로 자동 배정합니다.
+    반환: (customer_id, 문자 발송 담당자 id, created) - 이미 있던 고객이면 기존 담당자가 발송자
+    """
+    # 이미 있는 번호면 담당자를 고르지 않고 기존 고객/담당자 그대로 (배정 조회·카운터 선점 없음)
+    key = dedupe_key_for(phone, platform)
+    existing = key and Customer.objects.filter(dedupe_key=key).values_list('id', 'owner_id').first()
+    if existing:
+        return existing[0], existing[1], False
+
+    picked = not agent_id
+    if agent_id:
+        agent_id = User.objects.filter(id=agent_id).values_list('id', flat=True).first()
+    else:
+        agent_id = pick_agent_for_lead(platform)  # 고르면서 미결 카운터 +1
+
+    # 🔁 번호 기준 upsert (동시 유입/재전송에도 고객은 한 명만 생성)
+    customer_id, owner_id, created = upsert_customer(
+        phone, platform=platform, name=name, owner_id=agent_id, status='미통건'
+    )
+    if created and not picked:
+        adjust_lead_loads([(None, None, owner_id, '미통건')])
+    elif not created and picked:
+        adjust_lead_loads([(agent_id, '미통건', None, None)])  # 그 사이 다른 요청이 먼저 등록 → 선점한 카운터 되돌림
+    return customer_id, owner_id, created
+
+
+def find_customers_by_phone(phones):
+    """
+    정규화된 번호 목록 → {번호: {'id', 'owner_id', 'status'}}
+    번호당 중복 방지 키를 가진(가장 먼저 등록된) 고객을 dedupe_key 유니크 인덱스로 한 번에 찾고,
+    키로 못 찾은 번호는 phone 컬럼(인덱스)에서 가장 먼저 등록된 고객으로 찾습니다.
+    (키 선점 경합에서 밀렸거나 키가 아직 없는 고객도 수신 문자를 놓치지 않도록)
+    """
+    phones = sorted({clean_phone(p) for p in phones} - {''})
+    if not phones:
+        return {}
+    if getattr(settings, 'LEAD_DEDUPE_POLICY', 'phone') == 'phone_platform':
+        # '번호|플랫폼' 키 → 번호별 인덱스 범위 조회 ('}' 는 ASCII 에서 '|' 바로 다음 문자)
+        condition = Q()
+        for phone in phones:
+            condition |= Q(dedupe_key__gte=f"{phone}|", dedupe_key__lt=f"{phone}}}")
+    else:
+        condition = Q(dedupe_key__in=phones)
+    found = {}
+    for row in Customer.objects.filter(condition).order_by('id').values('id', 'owner_id', 'status', 'dedupe_key'):
+        found.setdefault(row.pop('dedupe_key').split('|')[0], row)
+    missing = [phone for phone in phones if phone not in found]
+    if missing:
+        for row in Customer.objects.filter(phone__in=missing).order_by('id').values('id', 'owner_id', 'status', 'phone'):
+            found.setdefault(row.pop('phone'), row)
+    return found
+
+
+def claim_dedupe_keys(customers):
+    """
+    수동 등록(엑셀 업로드 등)으로 생성된 고객 중 아직 키가 비어 있는 번호에 중복 방지 키를 부여합니다.
+    (이미 같은 키를 가진 고객이 있으면 그대로 둠 - 이후 웹훅 유입은 먼저 등록된 고객에게 합쳐짐)
+    """
+    pending = {}
+    for customer in customers:
+        key = dedupe_key_for(customer.phone, customer.platform)
+        if key and customer.dedupe_key is None and key not in pending:
+            pending[key] = customer
+    if not pending:
+        return
+    taken = set(Customer.objects.filter(dedupe_key__in=list(pending)).values_list('dedupe_key', flat=True))
+    claimed = []
+    for key, customer in pending.items():
+        if key not in taken:
+            customer.dedupe_key = key
+            claimed.append(customer)
+    try:
+        with transaction.atomic():
+            Customer.objects.bulk_update(claimed, ['dedupe_key'], batch_size=500)
+        return
+    except IntegrityError:
+        pass
+    # 그 사이 웹훅 유입이 일부 키를 먼저 가져간 경우 - 한 건씩 다시 시도해 충돌난 고객만 키 없이 둠
+    for customer in claimed:
+        try:
+            with transaction.atomic():
+                Customer.objects.filter(pk=customer.pk, dedupe_key__isnull=True).update(dedupe_key=customer.dedupe_key)
+        except IntegrityError:
+            customer.dedupe_key = None
+
+
+def sync_dedupe_key(customer):
+    """
+    직접 등록/수정한 고객의 중복 방지 키를 현재 번호(와 플랫폼)에 맞춥니다.
+    번호가 바뀌었으면 예전 키를 놓고 새 키를 잡습니다. (새 키를 다른 고객이 갖고 있으면 키 없이 둠)
+    """
+    key = dedupe_key_for(customer.phone, customer.platform)
+    if customer.dedupe_key == key:
+        return
+    if customer.dedupe_key is not None:
+        Customer.objects.filter(pk=customer.pk).update(dedupe_key=None)
+        customer.dedupe_key = None
+    claim_dedupe_keys([customer])
+
+
+# ==============================================================================
+# 🧾 Idempotency-Key 헤더 지원
+# ==============================================================================
+def get_idempotent_response(request, scope):
+    """같은 Idempotency-Key 로 이미 처리된 요청이면 (status, data) 를, 아니면 None 을 돌려줍니다."""
+    key = request.headers.get('Idempotency-Key')
+    if not key:
+        return None
+    row = IdempotencyKey.objects.filter(key=f"{scope}:{key}"[:200]).values_list('status_code', 'response').first()
+    return row
+
+
+def store_idempotent_response(request, scope, status_code, data):
+    key = request.headers.get('Idempotency-Key')
+    if not key:
+        return
+    IdempotencyKey.objects.bulk_create(
+        [IdempotencyKey(key=f"{scope}:{key}"[:200], status_code=status_code, response=data)],
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sales.archive import DEFAULT_BATCH_SIZE, archive_candidates, archive_customers, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "종료 상태(실패 / 접수취소 / 정산완료)로 오래된 고객을 상담기록·문자·녹취와 함께 보관 테이블로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, help='마지막 변경 후 경과 일수 (기본: settings.ARCHIVE_AFTER_DAYS, REPORTING_WINDOW_DAYS 보다 커야 함)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='트랜잭션 하나로 옮길 고객 수')
+        parser.add_argument('--limit', type=int, help='이번 실행에서 옮길 최대 고객 수')
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 수만 출력')
+
+    def handle(self, *args, **options):
+        try:
+            cutoff = archive_cutoff(options['older_than_days'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['dry_run']:
+            count = archive_candidates(cutoff).count()
+            self.stdout.write(f"🧊 보관 대상 {count}명 (마지막 변경 {cutoff:%Y-%m-%d %H:%M} 이전)")
+            return
+        archived = archive_customers(cutoff, batch_size=options['batch_size'], limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"✅ 고객 {archived}명 보관 완료"))
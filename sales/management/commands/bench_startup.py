@@ -0,0 +1,85 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# 워커 부팅 시 import 되면 안 되는 무거운 모듈 (첫 사용 시 지연 로딩 대상)
+# requests 는 rest_framework.compat 이 선택적으로 import 하므로 목록에서 제외합니다.
+HEAVY_MODULES = ['firebase_admin', 'google.cloud', 'grpc', 'httpx', 'pandas', 'numpy', 'pyarrow', 'openpyxl', 'streamlit', 'selenium']
+
+BOOT_SCRIPT = (
+    "import os, resource;"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r});"
+    "from crm_system.wsgi import application;"
+    "from django.urls import get_resolver; get_resolver().url_patterns;"
+    "print('MAXRSS', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+class Command(BaseCommand):
+    help = "python -X importtime 으로 워커 부팅(wsgi + URLConf 로딩) 시간과 메모리를 측정하고 예산을 검사합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-ms', type=float, default=1500, help='허용 import 시간 합계 (ms)')
+        parser.add_argument('--max-rss-mb', type=float, default=120, help='허용 최대 RSS (MB)')
+        parser.add_argument('--top', type=int, default=15, help='출력할 느린 최상위 모듈 수')
+        parser.add_argument('--runs', type=int, default=3, help='반복 측정 횟수 (최소값 사용)')
+
+    def handle(self, *args, **options):
+        results = [self.measure() for _ in range(options['runs'])]
+        total_us, top_level, loaded, rss_kb = min(results, key=lambda r: r[0])
+        total_ms = total_us / 1000
+        rss_mb = rss_kb / 1024
+
+        self.stdout.write(f"⏱ 부팅 import 시간: {total_ms:.1f}ms (최대 {options['max_ms']}ms)")
+        self.stdout.write(f"🧠 최대 RSS: {rss_mb:.1f}MB (최대 {options['max_rss_mb']}MB)")
+        self.stdout.write("📦 느린 최상위 import:")
+        for cumulative, name in sorted(top_level, reverse=True)[:options['top']]:
+            self.stdout.write(f"   {cumulative / 1000:8.1f}ms  {name}")
+
+        problems = []
+        heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+        if heavy:
+            problems.append(f"부팅 시 무거운 모듈이 로드됨: {', '.join(heavy)}")
+        if total_ms > options['max_ms']:
+            problems.append(f"import 시간 예산 초과 ({total_ms:.1f}ms > {options['max_ms']}ms)")
+        if rss_mb > options['max_rss_mb']:
+            problems.append(f"메모리 예산 초과 ({rss_mb:.1f}MB > {options['max_rss_mb']}MB)")
+
+        if problems:
+            raise CommandError(' / '.join(problems))
+        self.stdout.write(self.style.SUCCESS("✅ 부팅 시간/메모리 예산 통과"))
+
+    def measure(self):
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+        script = BOOT_SCRIPT.format(settings_module=os.environ.get('DJANGO_SETTINGS_MODULE', 'crm_system.settings'))
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"부팅 스크립트 실행 실패:\n{proc.stderr[-2000:]}")
+
+        total_us, top_level, loaded = 0, [], set()
+        for line in proc.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+            loaded.add(name)
+            loaded.add(name.split('.')[0])
+            if len(indent) <= 1:  # 최상위 import 만 합산 (하위 import 는 cumulative 에 포함됨)
+                total_us += cumulative
+                top_level.append((cumulative, name))
+
+        rss_kb = 0
+        for line in proc.stdout.splitlines():
+            if line.startswith('MAXRSS'):
+                rss_kb = int(line.split()[1])
+        return total_us, top_level, loaded, rss_kb
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sales.inbound_sms import BATCH_SIZE, drain_inbound_queue
+from sales.sms_status import drain_status_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "수신 문자 웹훅 대기열(InboundSMSEvent)을 묶음 단위로 고객 매칭 / SMSLog 저장하고, "
+        "발송 결과 대기열(SMSStatusEvent)을 SMSLog 상태에 반영합니다. "
+        "매 회 처리 도중 멈춘 묶음과 실패한 이벤트를 재시도 한도(WEBHOOK_QUEUE) 안에서 다시 대기열에 넣습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기열을 한 번 비우고 종료')
+        parser.add_argument('--interval', type=float, default=1.0, help='대기열 확인 간격(초)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='한 묶음 최대 건수')
+
+    def handle(self, *args, **options):
+        self.stdout.write("📥 수신 문자 대기열 처리 시작")
+        while True:
+            started = time.monotonic()
+            close_old_connections()
+            try:
+                totals = drain_inbound_queue(options['batch_size'])
+                if any(totals.values()):
+                    self.stdout.write(
+                        f"✅ 저장 {totals['saved']}건 / 미등록·담당자 없음 {totals['ignored']}건 / 실패 {totals['failed']}건"
+                    )
+                reports = drain_status_queue(options['batch_size'])
+                if any(reports.values()):
+                    self.stdout.write(
+                        f"📬 발송 결과 반영 {reports['updated']}건 / 발송 기록 없음 {reports['ignored']}건 / 실패 {reports['failed']}건"
+                    )
+            except Exception as e:
+                self.stderr.write(f"❌ 수신 문자 처리 오류: {e}")
+            if options['once']:
+                break
+            time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
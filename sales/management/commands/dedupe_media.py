@@ -0,0 +1,97 @@
+import datetime
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from sales.models import MediaBlob, PolicyImage, SMSLog
+from sales.storage import BLOB_DIR, media_storage, file_digest, hashed_name, is_hashed_name
+
+
+MEDIA_MODELS = [PolicyImage, SMSLog]
+ORPHAN_GRACE = datetime.timedelta(hours=1)  # 방금 올라와 아직 커밋 전인 업로드는 건드리지 않음
+
+
+class Command(BaseCommand):
+    help = "기존 업로드 이미지를 내용 해시 저장소(blobs/)로 옮기고 같은 내용의 중복 파일을 하나로 합칩니다. (참조 없는 blob 파일도 정리)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='변경 없이 절감 효과만 계산')
+
+    def sweep_orphans(self, dry_run):
+        """
+        참조 없이 남은 blob 파일 정리 - 업로드 후 행 저장이 롤백되면 파일만 남습니다. (참조 수는 커밋 때만 늘어남)
+        반환: 지운(지울) 파일 수
+        """
+        if not media_storage.exists(BLOB_DIR):
+            return 0
+        known = set(MediaBlob.objects.values_list('name', flat=True))
+        cutoff = datetime.datetime.now() - ORPHAN_GRACE
+        orphans = []
+        for prefix in media_storage.listdir(BLOB_DIR)[0]:
+            for filename in media_storage.listdir(f"{BLOB_DIR}/{prefix}")[1]:
+                name = f"{BLOB_DIR}/{prefix}/{filename}"
+                if name in known or media_storage.get_modified_time(name) > cutoff:
+                    continue
+                if any(model.objects.filter(image=name).exists() for model in MEDIA_MODELS):
+                    continue
+                orphans.append(name)
+        if not dry_run:
+            for name in orphans:
+                media_storage.delete(name)
+        if orphans:
+            self.stdout.write(f"🧹 참조 없는 blob 파일 {len(orphans)}개{' (dry-run)' if dry_run else ' 삭제'}")
+        return len(orphans)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.sweep_orphans(dry_run)
+
+        # 1. 아직 blob 으로 옮기지 않은 참조를 (모델, 파일명) 별로 집계
+        refs = defaultdict(lambda: defaultdict(int))  # 파일명 → 모델 → 행 수
+        for model in MEDIA_MODELS:
+            names = model.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)
+            for name in names.iterator(chunk_size=2000):
+                if not is_hashed_name(name):
+                    refs[name][model] += 1
+
+        # 2. 파일마다 한 번씩 해시 계산 → 같은 내용끼리 묶기
+        groups = defaultdict(list)
+        missing = 0
+        for name in refs:
+            if not media_storage.exists(name):
+                missing += 1
+                self.stderr.write(f"⚠️ 파일 없음 (건너뜀): {name}")
+                continue
+            with media_storage.open(name, 'rb') as f:
+                groups[file_digest(f)].append(name)
+
+        files = sum(len(names) for names in groups.values())
+        saved_bytes = sum(media_storage.size(name) for names in groups.values() for name in names[1:])
+        self.stdout.write(f"📦 대상 파일 {files}개 → 고유 내용 {len(groups)}개 (절감 {saved_bytes / 1024:.1f} KB, 누락 {missing}개)")
+        if dry_run or not groups:
+            return
+
+        # 3. 내용별 blob 하나로 옮기고 참조 행의 파일명을 바꾼 뒤, 커밋되면 옛 파일 삭제
+        old_files = []
+        with transaction.atomic():
+            for digest, names in groups.items():
+                blob = MediaBlob.objects.filter(sha256=digest).first()
+                target = blob.name if blob else hashed_name(digest, names[0])
+                if not media_storage.exists(target):
+                    with media_storage.open(names[0], 'rb') as f:
+                        media_storage.write_blob(target, f)
+
+                count = 0
+                for name in names:
+                    for model in refs[name]:
+                        count += model.objects.filter(image=name).update(image=target)
+                if blob:  # 옮기는 동안 올라온 업로드의 참조와 겹치지 않게 DB 에서 더함
+                    MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + count)
+                else:
+                    MediaBlob.objects.create(sha256=digest, name=target, size=media_storage.size(target), refcount=count)
+                old_files.extend(names)
+            transaction.on_commit(lambda: [media_storage.delete(name) for name in old_files])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {files}개 파일을 {len(groups)}개 blob 으로 정리했습니다."))
@@ -0,0 +1,179 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sales.models import User
+
+
+SYNC_PATH = '/api/sms/test_connection/'
+ASYNC_PATH = '/api/async/sms/test_connection/'
+
+
+class FakeGateway:
+    """지정한 지연 후 202 를 돌려주는 가짜 SMS 게이트웨이 (keep-alive 지원, 별도 스레드의 이벤트 루프)"""
+    def __init__(self, delay):
+        self.delay = delay
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = None
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.split(b'\r\n'):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':', 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.delay)
+                writer.write(b'HTTP/1.1 202 Accepted\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}')
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, '127.0.0.1', 0, backlog=2048))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        return f"http://127.0.0.1:{self.port}/message"
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def summarize(label, latencies, errors, elapsed):
+    ok = len(latencies)
+    ordered = sorted(latencies) or [0]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{label:<6} {ok + errors:>5}건 | 성공 {ok} / 실패 {errors} | {elapsed:.2f}s | "
+        f"{(ok + errors) / elapsed if elapsed else 0:.1f} req/s | "
+        f"p50 {statistics.median(ordered) * 1000:.0f}ms p95 {p95 * 1000:.0f}ms max {ordered[-1] * 1000:.0f}ms"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "가짜 SMS 게이트웨이(응답 지연 지정)를 띄워 테스트 발송 API 의 WSGI(동기) / ASGI(비동기) 처리량을 비교합니다. "
+        "기본은 서버 없이 프로세스 안에서 비교하고, --wsgi-url / --asgi-url 을 주면 실행 중인 서버에 요청합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='경로별 요청 수')
+        parser.add_argument('--concurrency', type=int, default=200, help='동시에 보내는 요청 수')
+        parser.add_argument('--gateway-delay', type=float, default=0.2, help='가짜 게이트웨이 응답 지연(초)')
+        parser.add_argument('--wsgi-threads', type=int, default=4, help='프로세스 내 WSGI 비교 시 워커 스레드 수 (gunicorn --threads)')
+        parser.add_argument('--wsgi-url', help='예) http://127.0.0.1:8000 (gunicorn crm_system.wsgi)')
+        parser.add_argument('--asgi-url', help='예) http://127.0.0.1:8001 (uvicorn crm_system.asgi:application)')
+        parser.add_argument('--token', help='API 토큰 (기본: 첫 번째 활성 사용자 토큰)')
+
+    def handle(self, *args, **options):
+        token = options['token'] or self.default_token()
+        gateway = FakeGateway(options['gateway_delay'])
+        payload = {
+            'phone': '01000000000',
+            'gateway_config': {'url': gateway.start(), 'username': 'load', 'password': 'test'},
+        }
+        self.stdout.write(
+            f"🚦 게이트웨이 지연 {options['gateway_delay'] * 1000:.0f}ms, 요청 {options['requests']}건, 동시 {options['concurrency']}건"
+        )
+        try:
+            if options['wsgi_url'] or options['asgi_url']:
+                for label, base in (('WSGI', options['wsgi_url']), ('ASGI', options['asgi_url'])):
+                    if base:
+                        path = SYNC_PATH if label == 'WSGI' else ASYNC_PATH
+                        self.stdout.write(asyncio.run(self.run_http(label, base.rstrip('/') + path, token, payload, options)))
+            else:
+                self.stdout.write(self.run_inprocess_wsgi(token, payload, options))
+                self.stdout.write(asyncio.run(self.run_inprocess_asgi(token, payload, options)))
+        finally:
+            gateway.stop()
+
+    def default_token(self):
+        from rest_framework.authtoken.models import Token
+        user = User.objects.filter(is_active=True).order_by('id').first()
+        if user is None:
+            raise CommandError("활성 사용자가 없습니다. --token 을 지정하세요.")
+        return Token.objects.get_or_create(user=user)[0].key
+
+    def host(self):
+        hosts = [h for h in settings.ALLOWED_HOSTS if h and '*' not in h and not h.startswith('.')]
+        return 'localhost' if 'localhost' in hosts or not hosts else hosts[0]
+
+    def run_inprocess_wsgi(self, token, payload, options):
+        """gunicorn gthread 워커 하나처럼 --wsgi-threads 개의 스레드가 동기 뷰를 처리"""
+        from django.test import Client
+        local = threading.local()
+
+        def one(_):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client(HTTP_AUTHORIZATION=f'Token {token}', HTTP_HOST=self.host())
+            started = time.perf_counter()
+            response = client.post(SYNC_PATH, payload, content_type='application/json')
+            return response.status_code == 200, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['wsgi_threads']) as pool:
+            results = list(pool.map(one, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        latencies = [t for ok, t in results if ok]
+        return summarize('WSGI', latencies, len(results) - len(latencies), elapsed)
+
+    async def run_inprocess_asgi(self, token, payload, options):
+        """하나의 이벤트 루프에서 ASGI 앱을 직접 호출 (uvicorn 워커 하나와 같은 조건)"""
+        import httpx
+        from django.core.asgi import get_asgi_application
+        transport = httpx.ASGITransport(app=get_asgi_application())
+        async with httpx.AsyncClient(transport=transport, base_url=f'http://{self.host()}', timeout=60) as client:
+            return await self.fire('ASGI', client, ASYNC_PATH, token, payload, options)
+
+    async def run_http(self, label, url, token, payload, options):
+        import httpx
+        limits = httpx.Limits(max_connections=options['concurrency'])
+        async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+            return await self.fire(label, client, url, token, payload, options)
+
+    async def fire(self, label, client, url, token, payload, options):
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies, errors = [], 0
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload, headers={'Authorization': f'Token {token}'})
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+                        return
+                except Exception:
+                    pass
+                errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(options['requests'])))
+        return summarize(label, latencies, errors, time.perf_counter() - started)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from sales.activity import recount_activity
+from sales.models import Customer
+
+
+class Command(BaseCommand):
+    help = "고객 활동 요약(상담기록 수 / 안읽은 문자 / 최근 문자·접촉 시간)을 원본 기록에서 다시 계산해 어긋난 값만 고칩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 다시 계산할 고객 수')
+        parser.add_argument('--customer', type=int, action='append', help='특정 고객만 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        queryset = Customer.objects.order_by('id')
+        if options['customer']:
+            queryset = queryset.filter(id__in=options['customer'])
+        batch_size = options['batch_size']
+
+        checked = fixed = 0
+        last_id = 0
+        while True:
+            # id 순으로 끊어서 처리 (묶음마다 짧은 트랜잭션)
+            ids = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                fixed += recount_activity(ids)
+            checked += len(ids)
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"✅ 고객 {checked}명 확인, {fixed}명 활동 요약 수정"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sales.reminders import send_due_callback_reminders
+
+
+class Command(BaseCommand):
+    help = "재통화 예정 고객을 매 분 조회해 담당 상담사에게 FCM 알림을 묶어서 보냅니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='한 번만 실행하고 종료')
+        parser.add_argument('--interval', type=int, default=60, help='실행 간격(초)')
+        parser.add_argument('--lead-minutes', type=int, default=None, help='몇 분 전에 알릴지 (기본 settings.CALLBACK_REMINDER_LEAD_MINUTES)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("⏰ 재통화 알림 스케줄러 시작")
+        while True:
+            started = time.monotonic()
+            close_old_connections()
+            try:
+                sent, failed, customers = send_due_callback_reminders(lead_minutes=options['lead_minutes'])
+                if customers:
+                    self.stdout.write(f"🔔 고객 {customers}건 알림 - 상담사 {sent}명 성공 / {failed}명 실패")
+            except Exception as e:
+                self.stderr.write(f"❌ 재통화 알림 처리 오류: {e}")
+            if options['once']:
+                break
+            time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
@@ -0,0 +1,171 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotAllowed, HttpResponseNotModified,
+)
+from django.utils._os import safe_join
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .storage import is_hashed_name, media_signature
+
+
+# ==============================================================================
+# 🖼️ 미디어 파일 서빙 (Range / 조건부 요청 / 프론트 서버 위임)
+# ==============================================================================
+# settings.MEDIA_ACCEL
+# - None      : Django 가 직접 응답 (FileResponse → gunicorn 등에서는 wsgi.file_wrapper 로 os.sendfile 전송)
+# - 'nginx'   : X-Accel-Redirect 로 nginx 에 넘김 (MEDIA_ACCEL_PREFIX 의 internal location 필요)
+# - 'sendfile': X-Sendfile 로 Apache(mod_xsendfile) / lighttpd 에 넘김
+# 고객 문자 사진 / 정책 이미지이므로 storage.url() 이 붙인 서명(?sig=)이 맞거나 로그인한 사용자만 받을 수 있습니다.
+IMMUTABLE_CACHE = 'private, max-age=31536000, immutable'  # 해시 이름은 내용이 절대 바뀌지 않음 (공용 캐시에는 두지 않음)
+REVALIDATE_CACHE = 'private, no-cache'                     # 그 외에는 매번 ETag 로 확인 (304)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """파일의 [start, start+length) 구간만 읽히는 래퍼 (fileno 를 노출해 sendfile 도 가능)"""
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self._file = file
+        self._remaining = length
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def parse_range(header, size):
+    """
+    단일 구간 Range 헤더만 해석합니다. (여러 구간 요청은 전체 응답으로 처리)
+    반환: (start, end) / None = 무시하고 전체 전송 / False = 만족할 수 없는 구간(416)
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:  # bytes=-500 → 마지막 500바이트
+        length = int(last)
+        return (max(0, size - length), size - 1) if length and size else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, end
+
+
+def file_etag(name, st):
+    if is_hashed_name(name):
+        return quote_etag(os.path.splitext(os.path.basename(name))[0])  # 파일명 = sha256
+    return quote_etag(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+
+
+def is_not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:  # ETag 가 있으면 If-Modified-Since 보다 우선
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or f'W/{etag}' in etags
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    return since is not None and int(mtime) <= since
+
+
+def _range_allowed(request, etag, mtime):
+    """If-Range 가 현재 파일과 다르면 Range 를 무시하고 전체를 보냅니다."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(mtime) <= since
+
+
+def media_authorized(request, path):
+    """서명된 URL 이거나, 세션/토큰으로 로그인한 사용자"""
+    signature = request.GET.get('sig')
+    if signature and constant_time_compare(signature, media_signature(path)):
+        return True
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return True
+    try:
+        return TokenAuthentication().authenticate(request) is not None
+    except AuthenticationFailed:
+        return False
+
+
+def serve_media(request, path):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    if not media_authorized(request, path):
+        return HttpResponseForbidden('forbidden')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("파일이 없습니다.")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("파일이 없습니다.")
+
+    etag = file_etag(path, st)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Cache-Control': IMMUTABLE_CACHE if is_hashed_name(path) else REVALIDATE_CACHE,
+        'Accept-Ranges': 'bytes',
+    }
+    if is_not_modified(request, etag, st.st_mtime):
+        return HttpResponseNotModified(headers=headers)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    # 1. 프론트 서버에 위임 (Range 도 프론트 서버가 처리) - 파이썬 워커는 헤더만 만들고 바로 반환
+    accel = getattr(settings, 'MEDIA_ACCEL', None)
+    if accel == 'nginx':
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/').rstrip('/')
+        return HttpResponse(content_type=content_type, headers={**headers, 'X-Accel-Redirect': f"{prefix}/{quote(path)}"})
+    if accel == 'sendfile':
+        return HttpResponse(content_type=content_type, headers={**headers, 'X-Sendfile': full_path})
+
+    # 2. 직접 전송 (Range 지원)
+    size = st.st_size
+    byte_range = None
+    if request.headers.get('Range') and _range_allowed(request, etag, st.st_mtime):
+        byte_range = parse_range(request.headers['Range'], size)
+        if byte_range is False:
+            return HttpResponse(status=416, headers={**headers, 'Content-Range': f"bytes */{size}"})
+
+    start, end = byte_range or (0, size - 1)
+    length = max(0, end - start + 1)
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, headers=headers)
+    elif byte_range:
+        response = FileResponse(RangeFile(open(full_path, 'rb'), start, length), content_type=content_type, headers=headers)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type, headers=headers)
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    response['Content-Length'] = str(length)
+    return response
@@ -0,0 +1,251 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+# ==============================================================================
+# 📈 Prometheus 텍스트 포맷 메트릭 레지스트리 (파일 기반, 워커 간 합산)
+# ==============================================================================
+# gunicorn 워커마다 메모리에 값을 모아두고, 주기적으로 METRICS_DIR/metrics_<pid>.json 에
+# 스냅샷을 기록합니다. /api/metrics 요청 시 살아 있는 워커 파일만 합산해서 내려줍니다.
+# 종료된 워커의 파일은 워커 시작 시 / gunicorn child_exit 훅(gunicorn.conf.py)에서 지웁니다.
+# (워커가 바뀌면 카운터가 줄어들 수 있으며, Prometheus 는 이를 카운터 리셋으로 처리합니다.)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP_TEXT = {
+    'http_request_duration_seconds': ('histogram', '요청 처리 시간 (URL 이름/메서드/상태코드별)'),
+    'db_queries_total': ('counter', '요청 처리 중 실행된 SQL 쿼리 수'),
+    'db_query_seconds_total': ('counter', '요청 처리 중 SQL 실행에 쓴 시간'),
+    'sms_gateway_request_duration_seconds': ('histogram', 'SMS 게이트웨이 호출 시간'),
+    'sms_gateway_requests_total': ('counter', 'SMS 게이트웨이 호출 결과 (success/failure)'),
+    'webhook_events_total': ('counter', '외부 웹훅 수신 건수'),
+}
+
+
+def get_metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'crm_metrics')
+
+
+def _snapshot_pid(filename):
+    """metrics_<pid>.json → pid (형식이 다르면 None)"""
+    if not (filename.startswith('metrics_') and filename.endswith('.json')):
+        return None
+    pid = filename[len('metrics_'):-len('.json')]
+    return int(pid) if pid.isdigit() else None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # 다른 사용자의 프로세스 - 살아 있음
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def mark_process_dead(pid):
+    """종료된 워커의 스냅샷 파일을 지웁니다. (gunicorn child_exit 훅에서 호출)"""
+    try:
+        os.remove(os.path.join(get_metrics_dir(), f'metrics_{pid}.json'))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"❌ 메트릭 파일 정리 실패: {e}")
+
+
+def prune_dead_workers():
+    """살아 있지 않은 pid 의 스냅샷 파일을 모두 지웁니다."""
+    try:
+        filenames = os.listdir(get_metrics_dir())
+    except OSError:
+        return
+    for filename in filenames:
+        pid = _snapshot_pid(filename)
+        if pid is not None and pid != os.getpid() and not _pid_alive(pid):
+            mark_process_dead(pid)
+
+
+class MetricsRegistry:
+    def __init__(self, flush_interval=1.0):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> float
+        self._histograms = {}  # (name, labels) -> [버킷별 카운트..., sum, count]
+        self._last_flush = 0.0
+        self._pid = None
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            row = self._histograms.get(key)
+            if row is None:
+                row = self._histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+        self._maybe_flush()
+
+    # --- 파일 스냅샷 -----------------------------------------------------------
+    def _path(self):
+        return os.path.join(get_metrics_dir(), f'metrics_{os.getpid()}.json')
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            # fork 이후 부모 프로세스의 값을 이어받지 않도록 초기화
+            started = self._pid != os.getpid()
+            if started:
+                if self._pid is not None:
+                    self._counters.clear()
+                    self._histograms.clear()
+                self._pid = os.getpid()
+            snapshot = {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), row] for (name, labels), row in self._histograms.items()],
+            }
+            self._last_flush = time.monotonic()
+        if started:
+            prune_dead_workers()  # 워커 시작 시 죽은 워커(재사용된 pid 의 예전 파일 포함)의 스냅샷 정리
+        try:
+            os.makedirs(get_metrics_dir(), exist_ok=True)
+            path = self._path()
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"❌ 메트릭 저장 실패: {e}")
+
+    # --- 합산 및 출력 ----------------------------------------------------------
+    def collect(self):
+        """살아 있는 워커의 스냅샷을 합산해 (counters, histograms) 를 반환합니다."""
+        self.flush()
+        counters, histograms = {}, {}
+        metrics_dir = get_metrics_dir()
+        for filename in os.listdir(metrics_dir):
+            pid = _snapshot_pid(filename)
+            if pid is None:
+                continue
+            if not _pid_alive(pid):
+                mark_process_dead(pid)
+                continue
+            try:
+                with open(os.path.join(metrics_dir, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in snapshot.get('counters', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, row in snapshot.get('histograms', []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged = histograms.get(key)
+                if merged is None or len(merged) != len(row):
+                    histograms[key] = list(row)
+                else:
+                    histograms[key] = [a + b for a, b in zip(merged, row)]
+        return counters, histograms
+
+    def render(self, buckets=DEFAULT_BUCKETS):
+        counters, histograms = self.collect()
+        lines = []
+        for name in sorted({key[0] for key in counters} | {key[0] for key in histograms}):
+            kind, help_text = HELP_TEXT.get(name, ('counter' if any(k[0] == name for k in counters) else 'histogram', name))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            for (metric, labels), row in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(buckets, row):
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {count}')
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {row[-1]}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(row[-2])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {row[-1]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry(flush_interval=getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0))
+
+
+# ==============================================================================
+# 🧭 요청 지연시간 / DB 쿼리 수 수집 미들웨어
+# ==============================================================================
+class MetricsMiddleware:
+    """
+    MIDDLEWARE 맨 앞에 두어 요청 전체 처리시간을 URL 이름/상태코드별 히스토그램으로 기록합니다.
+    SQLInstrumentationMiddleware 가 남긴 request.sql_stats 가 있으면 쿼리 수도 함께 누적합니다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        return self.record(request, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self.record(request, response, time.perf_counter() - start)
+
+    def record(self, request, response, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        registry.observe(
+            'http_request_duration_seconds', elapsed,
+            view=view, method=request.method, status=response.status_code,
+        )
+
+        sql_stats = getattr(request, 'sql_stats', None)
+        if sql_stats is not None:
+            registry.inc('db_queries_total', sql_stats.count, view=view)
+            registry.inc('db_query_seconds_total', sql_stats.sql_time, view=view)
+        return response
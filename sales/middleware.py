@@ -0,0 +1,220 @@
+import contextvars
+import heapq
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .data_version import bump_version, defer_bumps, finish_deferred_bumps
+
+
+# ==============================================================================
+# 🔍 요청별 SQL 계측 미들웨어
+# ==============================================================================
+class QueryCollector:
+    """
+    요청 동안 현재 컨텍스트에 걸려 쿼리 수 / SQL 소요시간을 집계합니다. (collect_queries 참고)
+    운영 환경에서도 켜둘 수 있도록 파라미터는 보관하지 않고,
+    가장 느린 쿼리 N개만 작은 힙으로 유지합니다.
+    """
+    def __init__(self, keep_slowest=5):
+        self.count = 0
+        self.sql_time = 0.0
+        self.keep_slowest = keep_slowest
+        self._slowest = []  # (소요시간, 순번, sql) 최소 힙
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.sql_time += elapsed
+            item = (elapsed, self.count, sql)
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, item)
+            elif elapsed > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    @property
+    def slowest(self):
+        return [(elapsed, sql) for elapsed, _, sql in sorted(self._slowest, reverse=True)]
+
+
+# 현재 요청의 QueryCollector - ASGI 에서 ORM 은 sync_to_async 워커 스레드(자기 연결)에서 돌지만
+# 컨텍스트 변수는 그 스레드로 복사되므로, 모든 연결에 걸어 둔 _collect 가 같은 collector 를 찾습니다.
+_current_collector = contextvars.ContextVar('sql_collector', default=None)
+
+
+def _collect(execute, sql, params, many, context):
+    collector = _current_collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    return collector(execute, sql, params, many, context)
+
+
+def _install_wrapper(connection, **kwargs):
+    if _collect not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_collect)
+
+
+connection_created.connect(_install_wrapper)
+
+
+def collect_queries(collector):
+    """
+    collector 를 현재 컨텍스트에 걸고 해제용 토큰을 돌려줍니다.
+    이미 열려 있던 현재 스레드의 연결에도 _collect 를 걸어 둡니다. (이후 새 연결은 connection_created 로)
+    """
+    for connection in connections.all(initialized_only=True):
+        _install_wrapper(connection)
+    return _current_collector.set(collector)
+
+
+def get_sql_budget(url_name):
+    """settings.SQL_BUDGETS 에서 URL 이름별 예산을 찾고, 없으면 'default' 예산을 사용합니다."""
+    budgets = getattr(settings, 'SQL_BUDGETS', {})
+    budget = dict(budgets.get('default', {}))
+    budget.update(budgets.get(url_name, {}))
+    return budget
+
+
+class SQLInstrumentationMiddleware:
+    """
+    모든 요청의 쿼리 수와 SQL/전체 처리시간을 측정해
+    `Server-Timing`, `X-DB-Queries` 응답 헤더로 내려줍니다.
+    URL 이름별 예산(SQL_BUDGETS)을 넘으면 느린 쿼리 목록과 함께 로그를 남깁니다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.keep_slowest = getattr(settings, 'SQL_LOG_SLOWEST', 5)
+        if iscoroutinefunction(get_response):  # ASGI: 비동기 뷰가 스레드로 밀려나지 않도록 그대로 await
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        collector = QueryCollector(keep_slowest=self.keep_slowest)
+        start = time.perf_counter()
+        token = collect_queries(collector)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_collector.reset(token)
+        return self.finish(request, response, collector, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        # 쿼리는 sync_to_async 워커 스레드에서 실행되므로 이벤트 루프 스레드의 연결이 아니라 컨텍스트로 모음
+        collector = QueryCollector(keep_slowest=self.keep_slowest)
+        start = time.perf_counter()
+        token = collect_queries(collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_collector.reset(token)
+        return self.finish(request, response, collector, time.perf_counter() - start)
+
+    def finish(self, request, response, collector, total_time):
+        # 다른 미들웨어(메트릭 등)에서 재사용할 수 있도록 요청에 보관
+        request.sql_stats = collector
+
+        sql_ms = collector.sql_time * 1000
+        total_ms = total_time * 1000
+        response['X-DB-Queries'] = str(collector.count)
+        response['Server-Timing'] = (
+            f'db;dur={sql_ms:.1f};desc="{collector.count} queries", total;dur={total_ms:.1f}'
+        )
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else None
+        if url_name:
+            self.check_budget(request, url_name, collector, sql_ms, total_ms)
+        return response
+
+    def check_budget(self, request, url_name, collector, sql_ms, total_ms):
+        budget = get_sql_budget(url_name)
+        max_queries = budget.get('queries')
+        max_sql_ms = budget.get('sql_ms')
+        over_queries = max_queries is not None and collector.count > max_queries
+        over_time = max_sql_ms is not None and sql_ms > max_sql_ms
+        if not (over_queries or over_time):
+            return
+
+        print(
+            f"🐢 [SQL 예산 초과] {request.method} {request.path} ({url_name}) "
+            f"쿼리 {collector.count}건 / SQL {sql_ms:.1f}ms / 전체 {total_ms:.1f}ms "
+            f"(예산: 쿼리 {max_queries if max_queries is not None else '-'}건, "
+            f"SQL {max_sql_ms if max_sql_ms is not None else '-'}ms)"
+        )
+        for elapsed, sql in collector.slowest:
+            print(f"   ⏱ {elapsed * 1000:.1f}ms | {sql[:500]}")
+
+
+# ==============================================================================
+# 🔢 고객 데이터 버전 - 요청당 한 번만 올림
+# ==============================================================================
+class DataVersionMiddleware:
+    """
+    요청 동안 고객/광고 단가 save()·delete() 시그널의 데이터 버전 증가를 모아 두었다가 응답 후 한 번만 반영합니다.
+    (저장마다 전역 DataVersion 한 행을 UPDATE 하면 동시 요청이 그 행에서 줄을 섬)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = defer_bumps()
+        try:
+            return self.get_response(request)
+        finally:
+            if finish_deferred_bumps(token):
+                bump_version()
+
+    async def __acall__(self, request):
+        token = defer_bumps()
+        try:
+            return await self.get_response(request)
+        finally:
+            if finish_deferred_bumps(token):
+                await sync_to_async(bump_version)()
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise 미들웨어는 동기 전용이라 ASGI 에서 아래쪽 뷰 전체를 스레드로 돌리게 만듭니다.
+    정적 파일이 아닌 요청은 그대로 await 로 넘기고, 정적 파일 응답만 스레드에서 만듭니다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
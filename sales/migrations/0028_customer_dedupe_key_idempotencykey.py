@@ -0,0 +1,62 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:07
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_dedupe_key(apps, schema_editor):
+    """기존 고객 중 번호(정책에 따라 번호|플랫폼)별 가장 먼저 등록된 고객에게 중복 방지 키를 부여"""
+    Customer = apps.get_model('sales', 'Customer')
+    policy = getattr(settings, 'LEAD_DEDUPE_POLICY', 'phone')
+    seen = set()
+    batch = []
+    for customer in Customer.objects.order_by('id').only('id', 'phone', 'platform').iterator(chunk_size=2000):
+        phone = re.sub(r'[^0-9]', '', str(customer.phone or ''))
+        if phone.startswith('82') and len(phone) > 10:
+            phone = '0' + phone[2:]
+        if not phone:
+            continue
+        key = f"{phone}|{customer.platform or ''}" if policy == 'phone_platform' else phone
+        if key in seen:
+            continue
+        seen.add(key)
+        customer.dedupe_key = key
+        batch.append(customer)
+        if len(batch) >= 500:
+            Customer.objects.bulk_update(batch, ['dedupe_key'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['dedupe_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0027_customer_settlement_complete_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('response', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='dedupe_key',
+            field=models.CharField(blank=True, editable=False, max_length=80, null=True, verbose_name='중복 방지 키'),
+        ),
+        migrations.RunPython(backfill_dedupe_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customer',
+            name='dedupe_key',
+            field=models.CharField(blank=True, editable=False, max_length=80, null=True, unique=True, verbose_name='중복 방지 키'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0028_customer_dedupe_key_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, verbose_name='파일명')),
+                ('dry_run', models.BooleanField(default=False, verbose_name='미리보기(미반영)')),
+                ('row_count', models.IntegerField(default=0)),
+                ('matched_count', models.IntegerField(default=0)),
+                ('mismatch_count', models.IntegerField(default=0)),
+                ('report', models.JSONField(default=dict, verbose_name='대사 결과')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0029_settlementbatch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['owner', 'callback_schedule'], name='customer_owner_callback_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0030_customer_owner_callback_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallbackReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_for', models.DateTimeField(verbose_name='재통화 예정시각')),
+                ('status', models.CharField(choices=[('PENDING', '발송중'), ('SENT', '발송완료'), ('FAILED', '발송실패')], default='PENDING', max_length=10)),
+                ('batch_id', models.UUIDField(db_index=True, verbose_name='발송 묶음 ID')),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['callback_schedule'], name='customer_callback_idx'),
+        ),
+        migrations.AddField(
+            model_name='callbackreminder',
+            name='agent',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='callback_reminders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='callbackreminder',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='callback_reminders', to='sales.customer'),
+        ),
+        migrations.AddConstraint(
+            model_name='callbackreminder',
+            constraint=models.UniqueConstraint(fields=('customer', 'scheduled_for'), name='unique_callback_reminder'),
+        ),
+    ]
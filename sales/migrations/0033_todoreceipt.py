@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_receipts(apps, schema_editor):
+    """기존 업무지시에 수신자별 상태 생성 (이미 지나간 지시는 읽음 처리 - 배지 폭증 방지)"""
+    TodoTask = apps.get_model('sales', 'TodoTask')
+    TodoReceipt = apps.get_model('sales', 'TodoReceipt')
+    User = apps.get_model('sales', 'User')
+    agent_ids = list(User.objects.filter(role='AGENT', is_active=True).values_list('id', flat=True))
+    batch = []
+    for task in TodoTask.objects.order_by('id').iterator(chunk_size=500):
+        user_ids = agent_ids if task.is_global else [task.assigned_to_id] if task.assigned_to_id else []
+        for user_id in user_ids:
+            batch.append(TodoReceipt(
+                task_id=task.id, user_id=user_id, delivered_at=task.created_at, read_at=task.created_at,
+                # 전체 지시의 완료 여부는 한 칸뿐이라 개인별로 나눌 수 없음 → 개인 지시만 이관
+                completed_at=task.created_at if task.is_completed and not task.is_global else None,
+            ))
+        if len(batch) >= 2000:
+            TodoReceipt.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TodoReceipt.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0032_pushdelivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoInboxCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='todo_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TodoReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='sales.todotask')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='todo_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-id'], name='todo_receipt_inbox_idx')],
+                'constraints': [models.UniqueConstraint(fields=('task', 'user'), name='unique_todo_receipt')],
+            },
+        ),
+        migrations.RunPython(backfill_receipts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:21
+
+import sales.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0033_todoreceipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='저장 경로')),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='참조 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='policyimage',
+            name='image',
+            field=models.ImageField(storage=sales.storage.get_media_storage, upload_to='policy_images/', verbose_name='정책 이미지'),
+        ),
+        migrations.AlterField(
+            model_name='smslog',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=sales.storage.get_media_storage, upload_to='sms_images/'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0034_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboundSMSEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_number', models.CharField(max_length=30, verbose_name='발신 번호')),
+                ('message', models.TextField(verbose_name='문자 내용')),
+                ('payload', models.JSONField(default=dict, verbose_name='웹훅 원본')),
+                ('status', models.CharField(choices=[('PENDING', '처리대기'), ('PROCESSING', '처리중'), ('DONE', '저장완료'), ('IGNORED', '미등록 번호'), ('FAILED', '처리실패')], default='PENDING', max_length=10)),
+                ('batch_id', models.UUIDField(blank=True, db_index=True, null=True, verbose_name='처리 묶음 ID')),
+                ('error', models.TextField(blank=True, default='')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='inbound_sms_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0035_inboundsmsevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboundsmsevent',
+            name='device_id',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='게이트웨이 기기 ID'),
+        ),
+        migrations.AddField(
+            model_name='inboundsmsevent',
+            name='gateway_message_id',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='게이트웨이 메시지 ID'),
+        ),
+        migrations.AddField(
+            model_name='smslog',
+            name='device_id',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='게이트웨이 기기 ID'),
+        ),
+        migrations.AddField(
+            model_name='smslog',
+            name='gateway_message_id',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='게이트웨이 메시지 ID'),
+        ),
+        migrations.AddConstraint(
+            model_name='inboundsmsevent',
+            constraint=models.UniqueConstraint(fields=('gateway_message_id', 'device_id'), name='unique_inbound_sms_message'),
+        ),
+        migrations.AddConstraint(
+            model_name='smslog',
+            constraint=models.UniqueConstraint(fields=('gateway_message_id', 'device_id'), name='unique_smslog_gateway_message'),
+        ),
+    ]
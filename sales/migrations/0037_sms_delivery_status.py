@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0036_sms_gateway_message_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='smslog',
+            name='fail_reason',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='실패 사유'),
+        ),
+        migrations.AddField(
+            model_name='smslog',
+            name='status_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='발송 결과 수신 시간'),
+        ),
+        migrations.AlterField(
+            model_name='smslog',
+            name='status',
+            field=models.CharField(choices=[('PENDING', '발송대기'), ('SUCCESS', '전송성공'), ('SENT', '발송완료'), ('DELIVERED', '수신확인'), ('FAIL', '전송실패'), ('RECEIVED', '수신완료')], default='PENDING', max_length=10, verbose_name='상태'),
+        ),
+        migrations.CreateModel(
+            name='SMSStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gateway_message_id', models.CharField(max_length=64, verbose_name='게이트웨이 메시지 ID')),
+                ('device_id', models.CharField(blank=True, default='', max_length=64, verbose_name='게이트웨이 기기 ID')),
+                ('event', models.CharField(choices=[('sms:sent', '발송완료'), ('sms:delivered', '수신확인'), ('sms:failed', '발송실패')], max_length=20)),
+                ('reason', models.CharField(blank=True, default='', max_length=255, verbose_name='실패 사유')),
+                ('occurred_at', models.DateTimeField(verbose_name='게이트웨이 기준 발생 시간')),
+                ('status', models.CharField(choices=[('PENDING', '처리대기'), ('PROCESSING', '처리중'), ('DONE', '반영완료'), ('IGNORED', '발송 기록 없음'), ('FAILED', '처리실패')], default='PENDING', max_length=10)),
+                ('batch_id', models.UUIDField(blank=True, db_index=True, null=True, verbose_name='처리 묶음 ID')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='sms_status_queue_idx')],
+                'constraints': [models.UniqueConstraint(fields=('gateway_message_id', 'device_id', 'event'), name='unique_sms_status_event')],
+            },
+        ),
+    ]
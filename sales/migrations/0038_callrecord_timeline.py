@@ -0,0 +1,90 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+CALL_LOG_PREFIX = "[자동저장] 통화 녹취 파일: "
+
+
+def move_call_logs(apps, schema_editor):
+    """자유 텍스트 상담기록으로 저장돼 있던 녹취 링크를 CallRecord 로 이관 (작성 시각 유지)"""
+    ConsultationLog = apps.get_model('sales', 'ConsultationLog')
+    CallRecord = apps.get_model('sales', 'CallRecord')
+    logs = ConsultationLog.objects.filter(content__startswith=CALL_LOG_PREFIX).order_by('id')
+    while True:
+        batch = list(logs[:1000])
+        if not batch:
+            break
+        records = CallRecord.objects.bulk_create([
+            CallRecord(customer_id=log.customer_id, agent_id=log.writer_id, file_link=log.content[len(CALL_LOG_PREFIX):].strip()[:500])
+            for log in batch
+        ])
+        # auto_now_add 때문에 생성 시각은 따로 덮어씀
+        for record, log in zip(records, batch):
+            record.created_at = log.created_at
+        CallRecord.objects.bulk_update(records, ['created_at'])
+        ConsultationLog.objects.filter(id__in=[log.id for log in batch]).delete()
+
+
+def restore_call_logs(apps, schema_editor):
+    """되돌릴 때: 녹취를 이전 형식의 상담기록으로 다시 만듦 (작성 시각 유지, CallRecord 테이블은 이어서 삭제됨)"""
+    ConsultationLog = apps.get_model('sales', 'ConsultationLog')
+    CallRecord = apps.get_model('sales', 'CallRecord')
+    records = CallRecord.objects.order_by('id')
+    last_id = 0
+    while True:
+        batch = list(records.filter(id__gt=last_id)[:1000])
+        if not batch:
+            break
+        logs = ConsultationLog.objects.bulk_create([
+            ConsultationLog(customer_id=record.customer_id, writer_id=record.agent_id, content=f"{CALL_LOG_PREFIX}{record.file_link}")
+            for record in batch
+        ])
+        for log, record in zip(logs, batch):
+            log.created_at = record.created_at
+        ConsultationLog.objects.bulk_update(logs, ['created_at'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0037_sms_delivery_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_link', models.CharField(max_length=500, verbose_name='녹취 파일 링크')),
+                ('duration', models.PositiveIntegerField(blank=True, null=True, verbose_name='통화 시간(초)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='consultationlog',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='consult_log_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smslog',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='smslog_timeline_idx'),
+        ),
+        migrations.AddField(
+            model_name='callrecord',
+            name='agent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='담당 상담사'),
+        ),
+        migrations.AddField(
+            model_name='callrecord',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='call_records', to='sales.customer'),
+        ),
+        migrations.AddIndex(
+            model_name='callrecord',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='call_record_timeline_idx'),
+        ),
+        migrations.RunPython(move_call_logs, restore_call_logs),
+    ]
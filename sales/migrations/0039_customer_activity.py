@@ -0,0 +1,70 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_sms_read(apps, schema_editor):
+    """기존 수신 문자는 읽은 것으로 간주 (recount_activity 실행 시 배지 폭증 방지)"""
+    Customer = apps.get_model('sales', 'Customer')
+    Customer.objects.update(sms_read_at=django.utils.timezone.now())
+
+
+def backfill_activity(apps, schema_editor):
+    """기존 상담기록/문자/녹취로 활동 요약 채우기 - recount_activity 와 같은 집계를 과거 모델로"""
+    from sales.activity import recount_activity
+
+    models = tuple(apps.get_model('sales', name) for name in ('Customer', 'ConsultationLog', 'SMSLog', 'CallRecord'))
+    customers = models[0].objects.order_by('id')
+    last_id = 0
+    while True:
+        ids = list(customers.filter(id__gt=last_id).values_list('id', flat=True)[:1000])
+        if not ids:
+            break
+        recount_activity(ids, models=models)
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0038_callrecord_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='last_contact_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='최근 접촉 시간'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='last_sms_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='최근 문자 시간'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='log_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='상담기록 수'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='sms_read_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='문자 확인 시간'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='sms_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='안읽은 수신 문자'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['owner', 'last_contact_at'], name='customer_owner_contact_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['last_contact_at'], name='customer_contact_idx'),
+        ),
+        migrations.RunPython(mark_existing_sms_read, migrations.RunPython.noop),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
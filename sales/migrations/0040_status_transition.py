@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0039_customer_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCode',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration', models.PositiveIntegerField(blank=True, null=True, verbose_name='이전 상태 체류 시간(초)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='변경자')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='sales.customer')),
+                ('from_status', models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='sales.statuscode', verbose_name='이전 상태')),
+                ('to_status', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='sales.statuscode', verbose_name='변경 상태')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer', 'created_at'], name='status_tr_customer_idx'), models.Index(fields=['to_status', 'customer', 'created_at'], name='status_tr_to_idx'), models.Index(fields=['from_status', 'created_at'], name='status_tr_from_idx')],
+            },
+        ),
+    ]
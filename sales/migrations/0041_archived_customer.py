@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:58
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0040_status_transition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCustomer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_id', models.IntegerField(unique=True, verbose_name='원래 고객 ID')),
+                ('phone', models.CharField(db_index=True, max_length=20, verbose_name='전화번호')),
+                ('name', models.CharField(max_length=50, verbose_name='고객명')),
+                ('platform', models.CharField(blank=True, max_length=50, null=True)),
+                ('status', models.CharField(max_length=50)),
+                ('settlement_status', models.CharField(blank=True, default='', max_length=50)),
+                ('upload_date', models.DateField(blank=True, null=True)),
+                ('last_updated_at', models.DateTimeField(blank=True, null=True, verbose_name='보관 전 마지막 변경')),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='고객 정보')),
+                ('logs', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='상담기록')),
+                ('sms', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='문자')),
+                ('calls', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='통화 녹취')),
+                ('history', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='상태 변경 이력')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_customers', to=settings.AUTH_USER_MODEL, verbose_name='담당 상담사')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'archived_at'], name='archived_owner_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:15
+
+from django.db import migrations, models
+
+
+def create_customer_version(apps, schema_editor):
+    DataVersion = apps.get_model('sales', 'DataVersion')
+    DataVersion.objects.get_or_create(name='customer')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0042_customer_phone_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=1)),
+            ],
+        ),
+        migrations.RunPython(create_customer_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0043_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentLeadLoad',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='lead_load', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('open_leads', models.IntegerField(default=0)),
+                ('assigned_total', models.BigIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
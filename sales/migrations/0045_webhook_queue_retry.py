@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0044_agent_lead_load'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboundsmsevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='처리 시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='inboundsmsevent',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='선점 시각'),
+        ),
+        migrations.AddField(
+            model_name='smsstatusevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='처리 시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='smsstatusevent',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='선점 시각'),
+        ),
+        migrations.AddField(
+            model_name='smsstatusevent',
+            name='error',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0045_webhook_queue_retry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callbackreminder',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=1, verbose_name='발송 시도 횟수'),
+        ),
+    ]
@@ -1,11 +1,14 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from django.conf import settings
-import os
-from django.db.models.signals import post_delete
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from .data_version import bump_after_request
+from .storage import get_media_storage
+
 
 # ==============================================================================
 # 1. 사용자 (상담사/관리자) 모델
@@ -84,6 +87,15 @@ class Customer(models.Model):
     client = models.CharField(max_length=50, blank=True, null=True, verbose_name="거래처")
     settlement_memo = models.TextField(blank=True, null=True, verbose_name="정산 메모")
     settlement_complete_date = models.DateField(null=True, blank=True, verbose_name="정산 완료일")
+    # 🔑 중복 유입 방지 키 (LEAD_DEDUPE_POLICY 에 따라 정규화 번호 또는 번호|플랫폼, 웹훅 유입만 사용)
+    dedupe_key = models.CharField(max_length=80, null=True, blank=True, unique=True, editable=False, verbose_name="중복 방지 키")
+
+    # 📊 활동 요약 (상담기록/문자/녹취 저장 시 F() 로 갱신, 어긋나면 manage.py recount_activity)
+    log_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="상담기록 수")
+    sms_unread_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="안읽은 수신 문자")
+    sms_read_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="문자 확인 시간")
+    last_sms_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="최근 문자 시간")
+    last_contact_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="최근 접촉 시간")
 
     # ⬇️ [핵심 추가] 관리자 확인 요청 기능용 필드
     request_status = models.CharField(
@@ -99,9 +111,71 @@ class Customer(models.Model):
         help_text="관리자가 보낸 확인 요청 메시지"
     )
 
+    class Meta:
+        indexes = [
+            # 상담사별 재통화 대기열 (/api/customers/callbacks/)
+            models.Index(fields=['owner', 'callback_schedule'], name='customer_owner_callback_idx'),
+            # 재통화 알림 스케줄러의 시간 범위 조회
+            models.Index(fields=['callback_schedule'], name='customer_callback_idx'),
+            # 최근 활동순 목록 (?ordering=-last_contact_at)
+            models.Index(fields=['owner', 'last_contact_at'], name='customer_owner_contact_idx'),
+            models.Index(fields=['last_contact_at'], name='customer_contact_idx'),
+            # 중복 방지 키가 없는 고객(수동 등록, 키 선점 경합)의 수신 문자 번호 조회
+            models.Index(fields=['phone'], name='customer_phone_idx'),
+        ]
+
+    # F()/조건부 UPDATE 로만 갱신하는 컬럼 - 일반 save() 가 읽어 둔 옛 값으로 덮어쓰지 않도록 제외
+    SEPARATELY_UPDATED_FIELDS = ('log_count', 'sms_unread_count', 'sms_read_at', 'last_sms_at', 'last_contact_at', 'dedupe_key')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.SEPARATELY_UPDATED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 읽어 온 (담당자, 상태) - 저장/삭제 시 자동 배정 미결 카운터 보정에 사용 (allocation 수신기)
+        if 'owner_id' in instance.__dict__ and 'status' in instance.__dict__:
+            instance._loaded_assignment = (instance.owner_id, instance.status)
+        return instance
+
     def __str__(self):
         return f"[{self.status}] {self.name} ({self.phone})"
 
+class StatusCode(models.Model):
+    """상태 이름 ↔ 2바이트 코드 (이력 테이블은 문자열 대신 코드만 저장)"""
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class StatusTransition(models.Model):
+    """고객 상태 변경 이력 (추가 전용) - 전환 퍼널 / 단계별 체류 시간 집계용"""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="status_history")
+    from_status = models.ForeignKey(StatusCode, on_delete=models.PROTECT, null=True, related_name='+', verbose_name="이전 상태")
+    to_status = models.ForeignKey(StatusCode, on_delete=models.PROTECT, related_name='+', verbose_name="변경 상태")
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="변경자")
+    duration = models.PositiveIntegerField(null=True, blank=True, verbose_name="이전 상태 체류 시간(초)")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # 고객별 직전 변경 조회 (체류 시간 계산)
+            models.Index(fields=['customer', 'created_at'], name='status_tr_customer_idx'),
+            # 퍼널: 특정 상태로 들어온 고객 / 단계별 체류 시간: 이전 상태별 GROUP BY
+            models.Index(fields=['to_status', 'customer', 'created_at'], name='status_tr_to_idx'),
+            models.Index(fields=['from_status', 'created_at'], name='status_tr_from_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.from_status_id} → {self.to_status_id}"
+
 # ==============================================================================
 # 4. 상담 이력 및 양방향 문자 로그
 # ==============================================================================
@@ -113,6 +187,17 @@ class ConsultationLog(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # 고객 타임라인 (고객별 시간순 keyset 조회)
+            models.Index(fields=['customer', 'created_at', 'id'], name='consult_log_timeline_idx'),
+        ]
+
+def _remember_image(instance):
+    """읽어 온 이미지 파일명 - 이미지를 바꿔 저장하면 옛 파일 참조를 내려놓는 데 사용 (track_image_reference)"""
+    if 'image' in instance.__dict__:
+        instance._loaded_image = instance.image.name or ''
+    return instance
+
 
 class SMSLog(models.Model):
     DIRECTION_CHOICES = (
@@ -121,7 +206,9 @@ class SMSLog(models.Model):
     )
     STATUS_CHOICES = (
         ('PENDING', '발송대기'),
-        ('SUCCESS', '전송성공'),
+        ('SUCCESS', '전송성공'),  # 게이트웨이 접수 (실제 발송 전)
+        ('SENT', '발송완료'),     # 기기가 통신사로 발송 (sms:sent)
+        ('DELIVERED', '수신확인'),  # 고객 단말 도착 (sms:delivered)
         ('FAIL', '전송실패'),
         ('RECEIVED', '수신완료'),
     )
@@ -130,18 +217,51 @@ class SMSLog(models.Model):
     content = models.TextField(verbose_name="문자 내용")
     direction = models.CharField(max_length=5, choices=DIRECTION_CHOICES, default='OUT', verbose_name="방향")
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', verbose_name="상태")
-    image = models.ImageField(upload_to='sms_images/', null=True, blank=True)
+    image = models.ImageField(upload_to='sms_images/', storage=get_media_storage, null=True, blank=True)
+    # 게이트웨이(SMS Gateway 앱) 메시지 식별자 - 재전송 중복 방지 / 발송 결과 역조회
+    gateway_message_id = models.CharField(max_length=64, null=True, blank=True, verbose_name="게이트웨이 메시지 ID")
+    device_id = models.CharField(max_length=64, blank=True, default='', verbose_name="게이트웨이 기기 ID")
+    status_updated_at = models.DateTimeField(null=True, blank=True, verbose_name="발송 결과 수신 시간")
+    fail_reason = models.CharField(max_length=255, blank=True, default='', verbose_name="실패 사유")
     
     sent_at = models.DateTimeField(auto_now_add=True, verbose_name="발송 시간")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성 시간")
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # 메시지 ID 가 앞 컬럼이라 ID 만으로 찾는 역조회에도 이 인덱스를 사용
+            models.UniqueConstraint(fields=['gateway_message_id', 'device_id'], name='unique_smslog_gateway_message'),
+        ]
+        indexes = [
+            models.Index(fields=['customer', 'created_at', 'id'], name='smslog_timeline_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        return _remember_image(super().from_db(db, field_names, values))
 
     def __str__(self):
         return f"[{self.get_direction_display()}] {self.customer.name}: {self.content[:20]}"
 
 
+class CallRecord(models.Model):
+    """통화 녹취 (녹음 앱 웹훅 /api/call/record/)"""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="call_records")
+    agent = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="담당 상담사")
+    file_link = models.CharField(max_length=500, verbose_name="녹취 파일 링크")
+    duration = models.PositiveIntegerField(null=True, blank=True, verbose_name="통화 시간(초)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', 'created_at', 'id'], name='call_record_timeline_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id} 녹취 {self.file_link}"
+
+
 # [추가] 광고 채널 관리
 class AdChannel(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -176,9 +296,13 @@ class Notice(models.Model):
 class PolicyImage(models.Model):
     PLATFORM_CHOICES = (('KT', 'KT'), ('SK', 'SK'), ('LG', 'LG'), ('Sky', 'Sky'))
     platform = models.CharField(max_length=10, choices=PLATFORM_CHOICES)
-    image = models.ImageField(upload_to='policy_images/', verbose_name="정책 이미지")
+    image = models.ImageField(upload_to='policy_images/', storage=get_media_storage, verbose_name="정책 이미지")
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        return _remember_image(super().from_db(db, field_names, values))
+
     def __str__(self):
         return f"{self.platform} 정책 ({self.updated_at})"
 
@@ -195,6 +319,117 @@ class TodoTask(models.Model):
         return f"{self.sender} -> {self.content}"
 
 
+class TodoReceipt(models.Model):
+    """업무지시의 수신자별 상태 (전달/읽음/완료 시각만 기록)"""
+    task = models.ForeignKey(TodoTask, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='todo_receipts')
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'user'], name='unique_todo_receipt'),
+        ]
+        indexes = [
+            # 받은 업무함: 사용자별 최신순 커서 페이지
+            models.Index(fields=['user', '-id'], name='todo_receipt_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} → {self.user_id}"
+
+
+class TodoInboxCounter(models.Model):
+    """받은 업무함 안읽음 배지 카운터 - 수신/읽음 시 F() 로 증감"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='todo_counter')
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread}"
+
+
+class CallbackReminder(models.Model):
+    """재통화 알림 푸시 발송 기록 - (고객, 예정시각) 당 한 번만 발송"""
+    STATUS_CHOICES = (
+        ('PENDING', '발송중'),
+        ('SENT', '발송완료'),
+        ('FAILED', '발송실패'),
+    )
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='callback_reminders')
+    agent = models.ForeignKey(User, on_delete=models.CASCADE, related_name='callback_reminders')
+    scheduled_for = models.DateTimeField(verbose_name="재통화 예정시각")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    batch_id = models.UUIDField(db_index=True, verbose_name="발송 묶음 ID")
+    attempts = models.PositiveSmallIntegerField(default=1, verbose_name="발송 시도 횟수")
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'scheduled_for'], name='unique_callback_reminder'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id} @ {self.scheduled_for} ({self.status})"
+
+
+class PushDelivery(models.Model):
+    """업무지시/공지 푸시의 수신자별 발송 기록"""
+    KIND_CHOICES = (
+        ('todo', '업무지시'),
+        ('notice', '공지사항'),
+    )
+    STATUS_CHOICES = (
+        ('PENDING', '발송중'),
+        ('SENT', '발송완료'),
+        ('FAILED', '발송실패'),
+        ('NO_TOKEN', '기기 미연결'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='push_deliveries')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'recipient'], name='unique_push_delivery'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id} → {self.recipient_id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """웹훅 재전송(Idempotency-Key 헤더) 시 처음 응답을 그대로 돌려주기 위한 기록"""
+    key = models.CharField(max_length=200, unique=True)  # "<엔드포인트>:<헤더값>"
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.key
+
+
+class SettlementBatch(models.Model):
+    """본사 정산 파일(CSV/XLSX) 일괄 반영 이력 및 대사(reconciliation) 결과"""
+    file_name = models.CharField(max_length=255, verbose_name="파일명")
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    dry_run = models.BooleanField(default=False, verbose_name="미리보기(미반영)")
+    row_count = models.IntegerField(default=0)
+    matched_count = models.IntegerField(default=0)
+    mismatch_count = models.IntegerField(default=0)
+    report = models.JSONField(default=dict, verbose_name="대사 결과")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.created_at:%Y-%m-%d})"
+
+
 class CancelReason(models.Model):
     """접수 취소 사유 관리"""
     reason = models.CharField(max_length=100)
@@ -203,6 +438,82 @@ class CancelReason(models.Model):
     def __str__(self):
         return self.reason
 
+class InboundSMSEvent(models.Model):
+    """수신 문자 웹훅 원본 - 받자마자 저장하고 응답하며, 고객 매칭/저장은 consume_inbound_sms 가 묶어서 처리"""
+    STATUS_CHOICES = (
+        ('PENDING', '처리대기'),
+        ('PROCESSING', '처리중'),
+        ('DONE', '저장완료'),
+        ('IGNORED', '미등록 번호'),
+        ('FAILED', '처리실패'),
+    )
+    from_number = models.CharField(max_length=30, verbose_name="발신 번호")
+    message = models.TextField(verbose_name="문자 내용")
+    payload = models.JSONField(default=dict, verbose_name="웹훅 원본")
+    gateway_message_id = models.CharField(max_length=64, null=True, blank=True, verbose_name="게이트웨이 메시지 ID")
+    device_id = models.CharField(max_length=64, blank=True, default='', verbose_name="게이트웨이 기기 ID")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True, verbose_name="처리 묶음 ID")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="선점 시각")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="처리 시도 횟수")
+    error = models.TextField(blank=True, default='')
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # 처리 대기열 (status='PENDING' 을 id 순으로)
+            models.Index(fields=['status', 'id'], name='inbound_sms_queue_idx'),
+        ]
+        constraints = [
+            # 게이트웨이 재전송(같은 메시지 ID)은 대기열에 다시 쌓지 않음
+            models.UniqueConstraint(fields=['gateway_message_id', 'device_id'], name='unique_inbound_sms_message'),
+        ]
+
+    def __str__(self):
+        return f"{self.from_number} ({self.status})"
+
+
+class SMSStatusEvent(models.Model):
+    """발송 결과 웹훅(sms:sent / sms:delivered / sms:failed) 원본 - 묶어서 SMSLog 상태에 반영"""
+    EVENT_CHOICES = (
+        ('sms:sent', '발송완료'),
+        ('sms:delivered', '수신확인'),
+        ('sms:failed', '발송실패'),
+    )
+    STATUS_CHOICES = (
+        ('PENDING', '처리대기'),
+        ('PROCESSING', '처리중'),
+        ('DONE', '반영완료'),
+        ('IGNORED', '발송 기록 없음'),
+        ('FAILED', '처리실패'),
+    )
+    gateway_message_id = models.CharField(max_length=64, verbose_name="게이트웨이 메시지 ID")
+    device_id = models.CharField(max_length=64, blank=True, default='', verbose_name="게이트웨이 기기 ID")
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    reason = models.CharField(max_length=255, blank=True, default='', verbose_name="실패 사유")
+    occurred_at = models.DateTimeField(verbose_name="게이트웨이 기준 발생 시간")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True, verbose_name="처리 묶음 ID")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="선점 시각")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="처리 시도 횟수")
+    error = models.TextField(blank=True, default='')
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='sms_status_queue_idx'),
+        ]
+        constraints = [
+            # 같은 결과 웹훅의 재전송은 한 번만 저장
+            models.UniqueConstraint(fields=['gateway_message_id', 'device_id', 'event'], name='unique_sms_status_event'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.gateway_message_id}"
+
+
 class Client(models.Model):
     name = models.CharField(max_length=50, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -211,13 +522,123 @@ class Client(models.Model):
         return self.name
 
 
+class MediaBlob(models.Model):
+    """내용 해시로 한 벌만 저장된 미디어 파일과 참조 수"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True, verbose_name="저장 경로")
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0, verbose_name="참조 수")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} (x{self.refcount})"
+
+
+class ArchivedCustomer(models.Model):
+    """
+    보관(콜드) 고객 - 종료 상태로 오래된 고객을 상담기록/문자/녹취/상태이력과 함께 한 행으로 옮겨 둔 것
+    (manage.py archive_customers, 조회 전용 /api/archive/customers/)
+    """
+    customer_id = models.IntegerField(unique=True, verbose_name="원래 고객 ID")
+    phone = models.CharField(max_length=20, db_index=True, verbose_name="전화번호")
+    name = models.CharField(max_length=50, verbose_name="고객명")
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="archived_customers", verbose_name="담당 상담사")
+    platform = models.CharField(max_length=50, blank=True, null=True)
+    status = models.CharField(max_length=50)
+    settlement_status = models.CharField(max_length=50, blank=True, default='')
+    upload_date = models.DateField(null=True, blank=True)
+    last_updated_at = models.DateTimeField(null=True, blank=True, verbose_name="보관 전 마지막 변경")
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="고객 정보")
+    logs = models.JSONField(default=list, encoder=DjangoJSONEncoder, verbose_name="상담기록")
+    sms = models.JSONField(default=list, encoder=DjangoJSONEncoder, verbose_name="문자")
+    calls = models.JSONField(default=list, encoder=DjangoJSONEncoder, verbose_name="통화 녹취")
+    history = models.JSONField(default=list, encoder=DjangoJSONEncoder, verbose_name="상태 변경 이력")
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'archived_at'], name='archived_owner_idx'),
+        ]
+
+    def __str__(self):
+        return f"[보관] {self.name} ({self.phone})"
+
+
+class DataVersion(models.Model):
+    """분석 캐시 무효화용 데이터 버전 - 워커/관리 명령이 모두 보도록 DB 에 둠 (data_version 참고)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class AgentLeadLoad(models.Model):
+    """자동 배정용 상담사별 카운터 - 미결 건수 / 누적 자동 배정 수 (allocation 참고)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='lead_load')
+    open_leads = models.IntegerField(default=0)
+    assigned_total = models.BigIntegerField(default=0)
+    synced_at = models.DateTimeField(null=True, blank=True)  # 마지막으로 실제 미결 건수와 맞춘 시각
+
+    def __str__(self):
+        return f"{self.user_id}: 미결 {self.open_leads}"
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+@receiver(post_save, sender=AdChannel)
+@receiver(post_delete, sender=AdChannel)
+def bump_customer_data_version(sender, instance, **kwargs):
+    """고객 / 광고 단가 저장·삭제 시 분석 캐시(코호트, 피벗 등) 무효화 (요청 중이면 응답 후 한 번)"""
+    bump_after_request()
+
+
+def _release_image(storage, name):
+    if hasattr(storage, 'release'):
+        storage.release(name)
+    elif storage.exists(name):
+        storage.delete(name)
+        print(f"✅ 파일 삭제 완료: {storage.path(name)}")
+
+
+@receiver(post_save, sender=PolicyImage)
+@receiver(post_save, sender=SMSLog)
+def track_image_reference(sender, instance, created, update_fields=None, **kwargs):
+    """
+    이미지 참조는 행이 커밋된 뒤에 얻습니다. (롤백된 저장은 참조 수를 남기지 않음)
+    이미지를 바꿔 저장하면 커밋 후 옛 파일의 참조를 내려놓습니다.
+    """
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    old = '' if created else getattr(instance, '_loaded_image', None)
+    new = instance.image.name or ''
+    if old == new:
+        return
+    instance._loaded_image = new
+    storage = instance.image.storage
+    if new and hasattr(storage, 'acquire'):
+        transaction.on_commit(lambda: storage.acquire(new))
+    if old:  # None 이면 이전 파일명을 읽어 오지 않은 인스턴스 - 건드리지 않음
+        transaction.on_commit(lambda: _release_image(storage, old))
+
+
 @receiver(post_delete, sender=PolicyImage)
+@receiver(post_delete, sender=SMSLog)
 def auto_delete_file_on_delete(sender, instance, **kwargs):
     """
-    PolicyImage 모델 데이터가 삭제될 때, 
-    서버의 'media/policy_images/' 폴더 내 실제 파일도 삭제합니다.
+    PolicyImage / SMSLog 데이터가 삭제되어 커밋되면 이미지 참조를 하나 내려놓습니다.
+    같은 사진을 쓰는 다른 행이 없을 때만 서버의 실제 파일도 삭제됩니다.
     """
-    if instance.image:
-        if os.path.isfile(instance.image.path):
-            os.remove(instance.image.path)
-            print(f"✅ 파일 삭제 완료: {instance.image.path}")
\ No newline at end of file
+    name = getattr(instance, '_loaded_image', instance.image.name)
+    if name:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: _release_image(storage, name))
+
+
+@receiver(post_delete, sender=ArchivedCustomer)
+def release_archived_images(sender, instance, **kwargs):
+    """보관 고객을 지우면 (커밋 후) 보관 중이던 문자 사진 참조도 내려놓습니다."""
+    storage = SMSLog._meta.get_field('image').storage
+    names = [message['image'] for message in instance.sms if message.get('image')]
+    if names:
+        transaction.on_commit(lambda: [_release_image(storage, name) for name in names])
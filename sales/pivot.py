@@ -0,0 +1,185 @@
+import datetime
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, TruncMonth, TruncWeek
+
+from .models import AdChannel, Customer, User
+
+
+# ==============================================================================
+# 🧩 피벗 집계 (차원 × 지표를 SQL GROUP BY 한 번으로)
+# ==============================================================================
+# 허용된 차원/지표/필터만 받아 values(차원).annotate(지표) 쿼리 하나로 만들고,
+# 결과는 data_version.cached_result 로 '파라미터 + 데이터 버전(DB)' 기준 캐시합니다.
+# 상담사 이름은 이름을 바꿔도 데이터 버전이 오르지 않으므로 캐시에 넣지 않고 응답 때 붙입니다. (label_owners)
+# 광고비는 AdChannel 단가를 상관 서브쿼리로 붙여 같은 쿼리 안에서 계산합니다. (StatisticsView 와 같은 기준)
+MAX_DIMENSIONS = 3
+MAX_ROWS = 5000
+DEFAULT_MEASURES = ['db', 'accepted', 'installed', 'accepted_revenue', 'installed_revenue']
+
+ACCEPTED_STATUSES = ['접수완료', '설치완료', '해지진행']
+AD_EXCLUDED_STATUSES = ['AS요청', '실패', '중복', '실패이관']
+SETTLED_STATUS = '정산완료'
+
+
+class PivotError(ValueError):
+    pass
+
+
+def _revenue():
+    agent_policy = Cast(Coalesce(F('agent_policy'), Value(0)), IntegerField())
+    support_amt = Cast(Coalesce(F('support_amt'), Value(0)), IntegerField())
+    return (agent_policy - support_amt) * 10000
+
+
+def _sum_when(condition, value):
+    return Coalesce(Sum(Case(When(condition, then=value), default=0, output_field=IntegerField())), 0)
+
+
+class _TruncMonth(TruncMonth):
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # DateField 는 'YYYY-MM-DD' 문자열 → 행마다 파이썬 함수(django_date_trunc) 대신 문자열 연산
+        sql, params = compiler.compile(self.lhs)
+        return f"SUBSTR({sql}, 1, 7) || '-01'", params
+
+
+class _TruncWeek(TruncWeek):
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"DATE({sql}, 'weekday 0', '-6 days')", params  # 그 주 월요일
+
+
+def _ad_unit_cost():
+    channel = AdChannel.objects.filter(name=Coalesce(OuterRef('platform'), Value('기타'))).values('cost')[:1]
+    return Coalesce(Subquery(channel, output_field=IntegerField()), Value(0))
+
+
+AD_TARGET = ~Q(status__in=AD_EXCLUDED_STATUSES)
+ACCEPTED = Q(status__in=ACCEPTED_STATUSES)
+INSTALLED = Q(status='설치완료')
+SETTLED = Q(settlement_status=SETTLED_STATUS)
+
+# 차원: 이름 → (GROUP BY 식, 값 표시 형식)
+DIMENSIONS = {
+    'owner': (lambda: F('owner_id'), None),
+    'platform': (lambda: F('platform'), None),
+    'client': (lambda: F('client'), None),
+    'status': (lambda: F('status'), None),
+    'settlement_status': (lambda: F('settlement_status'), None),
+    'product': (lambda: F('product_info'), None),
+    'upload_day': (lambda: F('upload_date'), '%Y-%m-%d'),
+    'upload_week': (lambda: _TruncWeek('upload_date'), '%Y-%m-%d'),
+    'upload_month': (lambda: _TruncMonth('upload_date'), '%Y-%m'),
+    'installed_month': (lambda: _TruncMonth('installed_date'), '%Y-%m'),
+    'settlement_month': (lambda: _TruncMonth('settlement_complete_date'), '%Y-%m'),
+}
+
+# 지표: 이름 → 집계식
+MEASURES = {
+    'db': lambda: Count('id'),
+    'ad_target': lambda: Count('id', filter=AD_TARGET),
+    'accepted': lambda: Count('id', filter=ACCEPTED),
+    'installed': lambda: Count('id', filter=INSTALLED),
+    'canceled': lambda: Count('id', filter=Q(status='접수취소')),
+    'accepted_revenue': lambda: _sum_when(ACCEPTED, _revenue()),
+    'installed_revenue': lambda: _sum_when(INSTALLED, _revenue()),
+    'ad_spend': lambda: _sum_when(AD_TARGET, _ad_unit_cost()),
+    'net_profit': lambda: MEASURES['installed_revenue']() - MEASURES['ad_spend'](),
+    'lead_cost': lambda: Coalesce(Sum('ad_cost'), 0),
+    'settled': lambda: Count('id', filter=SETTLED),
+    'settled_policy': lambda: _sum_when(SETTLED, F('policy_amt')),
+    'settlement_diff': lambda: _sum_when(SETTLED, F('policy_amt') - F('agent_policy')),
+}
+
+# 필터: 이름 → 조회 조건 (쉼표로 여러 값)
+FILTERS = {
+    'platform': 'platform__in',
+    'owner': 'owner_id__in',
+    'client': 'client__in',
+    'status': 'status__in',
+    'settlement_status': 'settlement_status__in',
+}
+DATE_FIELDS = ('upload_date', 'installed_date', 'settlement_complete_date')
+
+
+def _split(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or '').split(',') if v.strip()]
+
+
+def normalize_request(params):
+    """
+    요청 파라미터(dict) → 검증된 피벗 옵션 (캐시 키로도 사용)
+    잘못된 값은 PivotError
+    """
+    dimensions = _split(params.get('dimensions'))
+    measures = _split(params.get('measures')) or list(DEFAULT_MEASURES)
+    unknown = [d for d in dimensions if d not in DIMENSIONS] + [m for m in measures if m not in MEASURES]
+    if unknown:
+        raise PivotError(f"지원하지 않는 항목: {', '.join(unknown)} (차원: {', '.join(DIMENSIONS)} / 지표: {', '.join(MEASURES)})")
+    if len(dimensions) > MAX_DIMENSIONS or len(set(dimensions)) != len(dimensions):
+        raise PivotError(f"차원은 중복 없이 최대 {MAX_DIMENSIONS}개까지 가능합니다.")
+
+    filters = {}
+    for name in FILTERS:
+        values = _split(params.get(name))
+        if not values or values == ['ALL']:
+            continue
+        if name == 'owner':
+            if not all(v.isdigit() for v in values):
+                raise PivotError("owner 는 상담사 ID 입니다.")
+            values = [int(v) for v in values]
+        filters[name] = sorted(values)
+
+    date_field = params.get('date_field') or 'upload_date'
+    if date_field not in DATE_FIELDS:
+        raise PivotError(f"date_field 는 {', '.join(DATE_FIELDS)} 중 하나입니다.")
+    try:
+        start_date = datetime.date.fromisoformat(params['start_date']).isoformat() if params.get('start_date') else None
+        end_date = datetime.date.fromisoformat(params['end_date']).isoformat() if params.get('end_date') else None
+    except ValueError:
+        raise PivotError("날짜 형식은 YYYY-MM-DD 입니다.")
+
+    return {
+        'dimensions': dimensions, 'measures': list(dict.fromkeys(measures)), 'filters': filters,
+        'date_field': date_field, 'start_date': start_date, 'end_date': end_date,
+    }
+
+
+def _format(value, fmt):
+    if fmt and isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime(fmt)
+    return value
+
+
+def build_pivot(dimensions, measures, filters, date_field='upload_date', start_date=None, end_date=None):
+    """normalize_request() 결과로 집계 쿼리 하나를 실행합니다."""
+    queryset = Customer.objects.all()
+    for name, values in filters.items():
+        queryset = queryset.filter(**{FILTERS[name]: values})
+    if start_date:
+        queryset = queryset.filter(**{f'{date_field}__gte': start_date})
+    if end_date:
+        queryset = queryset.filter(**{f'{date_field}__lte': end_date})
+
+    aggregates = {name: MEASURES[name]() for name in measures}
+    if not dimensions:
+        return {'rows': [queryset.aggregate(**aggregates)], 'truncated': False}
+
+    # 모델 필드와 이름이 겹치지 않도록 'dim_' 별칭으로 묶고, 응답에서 원래 이름으로 되돌림
+    group = {f'dim_{name}': DIMENSIONS[name][0]() for name in dimensions}
+    rows = list(queryset.values(**group).annotate(**aggregates).order_by(*group)[:MAX_ROWS + 1])
+
+    results = []
+    for row in rows[:MAX_ROWS]:
+        item = {name: _format(row[f'dim_{name}'], DIMENSIONS[name][1]) for name in dimensions}
+        item.update((name, row[name]) for name in measures)
+        results.append(item)
+    return {'rows': results, 'truncated': len(rows) > MAX_ROWS}
+
+
+def label_owners(rows):
+    """owner 차원 행에 현재 상담사 이름(owner_name)을 붙인 새 목록 (쿼리 한 번)"""
+    names = dict(User.objects.filter(id__in={row['owner'] for row in rows if row.get('owner')}).values_list('id', 'username'))
+    return [{**row, 'owner_name': names.get(row['owner'], '미배정')} for row in rows]
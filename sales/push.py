@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .firebase import get_messaging
+
+
+# ==============================================================================
+# 🔔 푸시(FCM) 발송 클라이언트
+# ==============================================================================
+# settings.PUSH_CLIENT 로 교체할 수 있습니다.
+# - 'sales.push.FirebasePushClient': 실제 FCM 발송 (기본)
+# - 'sales.push.LocalPushClient'   : 네트워크 없이 발송 내역만 메모리에 기록 (로컬/테스트용)
+
+FCM_BATCH_LIMIT = 500  # FCM send_each / multicast 1회 최대 건수
+
+
+@dataclass
+class PushMessage:
+    token: str
+    title: str
+    body: str
+    data: dict = field(default_factory=dict)
+
+
+@dataclass
+class PushResult:
+    success: bool
+    error: str = ''
+
+
+def _chunks(items, size=FCM_BATCH_LIMIT):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class FirebasePushClient:
+    def _messaging(self):
+        messaging = get_messaging()
+        if messaging is None:
+            raise RuntimeError("Firebase 인증 정보가 없어 푸시를 보낼 수 없습니다.")
+        return messaging
+
+    def send_each(self, messages):
+        """서로 다른 메시지 여러 건을 500건씩 묶어서 한 번의 FCM 호출로 보냅니다."""
+        messaging = self._messaging()
+        results = []
+        for chunk in _chunks(list(messages)):
+            batch = messaging.send_each([
+                messaging.Message(
+                    token=m.token,
+                    notification=messaging.Notification(title=m.title, body=m.body),
+                    data={k: str(v) for k, v in m.data.items()},
+                )
+                for m in chunk
+            ])
+            results.extend(PushResult(r.success, str(r.exception or '')) for r in batch.responses)
+        return results
+
+    def send_multicast(self, tokens, title, body, data=None):
+        """같은 메시지를 여러 기기에 500개 토큰 단위 multicast 로 보냅니다. (토큰 순서대로 결과 반환)"""
+        messaging = self._messaging()
+        results = []
+        for chunk in _chunks(list(tokens)):
+            batch = messaging.send_each_for_multicast(messaging.MulticastMessage(
+                tokens=chunk,
+                notification=messaging.Notification(title=title, body=body),
+                data={k: str(v) for k, v in (data or {}).items()},
+            ))
+            results.extend(PushResult(r.success, str(r.exception or '')) for r in batch.responses)
+        return results
+
+
+class LocalPushClient:
+    """오프라인용 가짜 클라이언트 - 보낸 메시지를 sent 에 쌓아둡니다."""
+    sent = []
+
+    def send_each(self, messages):
+        messages = list(messages)
+        self.sent.extend(messages)
+        return [PushResult(True) for _ in messages]
+
+    def send_multicast(self, tokens, title, body, data=None):
+        return self.send_each([PushMessage(token, title, body, data or {}) for token in tokens])
+
+
+_client = None
+
+
+def get_push_client():
+    global _client
+    if _client is None:
+        _client = import_string(getattr(settings, 'PUSH_CLIENT', 'sales.push.FirebasePushClient'))()
+    return _client
@@ -0,0 +1,111 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .allocation import CLOSED_STATUSES
+from .models import Customer, CallbackReminder
+from .push import PushMessage, get_push_client
+
+
+# ==============================================================================
+# ⏰ 재통화 알림 (상담사별로 묶어서 FCM 일괄 발송)
+# ==============================================================================
+def _max_attempts():
+    return getattr(settings, 'CALLBACK_REMINDER_MAX_ATTEMPTS', 3)
+
+
+def find_due_callbacks(now, lead_minutes):
+    """
+    지금부터 lead_minutes 안에 예정된 재통화 중 아직 알림을 보내지 않은 건 (callback_schedule 인덱스 범위 조회)
+    발송에 실패한 건은 시도 횟수가 한도(CALLBACK_REMINDER_MAX_ATTEMPTS) 미만이면 다시 대상
+    """
+    already_sent = CallbackReminder.objects.filter(
+        customer=OuterRef('pk'), scheduled_for=OuterRef('callback_schedule'),
+    ).exclude(status='FAILED', attempts__lt=_max_attempts())
+    return (
+        Customer.objects
+        .filter(
+            callback_schedule__gte=now,
+            callback_schedule__lt=now + datetime.timedelta(minutes=lead_minutes),
+            owner__isnull=False,
+        )
+        .exclude(status__in=CLOSED_STATUSES)
+        .exclude(owner__fcm_token__isnull=True).exclude(owner__fcm_token='')
+        .exclude(Exists(already_sent))
+        .order_by('callback_schedule')
+        .values('id', 'name', 'phone', 'owner_id', 'owner__fcm_token', 'callback_schedule')
+    )
+
+
+def _build_message(token, rows):
+    lines = [f"{r['callback_schedule']:%H:%M} {r['name']} ({r['phone'][-4:]})" for r in rows[:3]]
+    if len(rows) > 3:
+        lines.append(f"외 {len(rows) - 3}건")
+    return PushMessage(
+        token=token,
+        title=f"📞 재통화 알림 ({len(rows)}건)",
+        body='\n'.join(lines),
+        data={'type': 'callback', 'customer_ids': ','.join(str(r['id']) for r in rows)},
+    )
+
+
+def send_due_callback_reminders(now=None, lead_minutes=None, client=None):
+    """
+    한 번 실행분: 대상 조회 → 발송 기록 선점(실패 건 재시도 포함) → 상담사별 메시지로 묶어 일괄 발송 → 결과 기록
+    반환: (발송 성공 상담사 수, 실패 상담사 수, 알림 고객 수)
+    """
+    now = now or timezone.now()
+    lead_minutes = lead_minutes or getattr(settings, 'CALLBACK_REMINDER_LEAD_MINUTES', 10)
+    client = client or get_push_client()
+
+    rows = list(find_due_callbacks(now, lead_minutes))
+    if not rows:
+        return 0, 0, 0
+
+    # 1. 발송 기록을 먼저 선점 (유니크 제약으로 다른 스케줄러와 중복 발송 방지)
+    batch_id = uuid.uuid4()
+    CallbackReminder.objects.bulk_create([
+        CallbackReminder(customer_id=r['id'], agent_id=r['owner_id'], scheduled_for=r['callback_schedule'], batch_id=batch_id)
+        for r in rows
+    ], ignore_conflicts=True)
+    # 실패했던 알림은 이번 묶음으로 다시 선점 (상태 조건부 UPDATE 라 다른 스케줄러와 겹치지 않음)
+    due = {(r['id'], r['callback_schedule']) for r in rows}
+    retry_ids = [
+        reminder_id for reminder_id, customer_id, scheduled_for in CallbackReminder.objects.filter(
+            customer_id__in=[r['id'] for r in rows], status='FAILED', attempts__lt=_max_attempts(),
+        ).values_list('id', 'customer_id', 'scheduled_for')
+        if (customer_id, scheduled_for) in due
+    ]
+    if retry_ids:
+        CallbackReminder.objects.filter(id__in=retry_ids, status='FAILED').update(
+            status='PENDING', batch_id=batch_id, attempts=F('attempts') + 1, error='',
+        )
+    claimed = set(CallbackReminder.objects.filter(batch_id=batch_id).values_list('customer_id', flat=True))
+
+    # 2. 상담사별로 묶기
+    per_agent = {}
+    for r in rows:
+        if r['id'] in claimed:
+            per_agent.setdefault(r['owner_id'], {'token': r['owner__fcm_token'], 'rows': []})['rows'].append(r)
+    if not per_agent:
+        return 0, 0, 0
+
+    agent_ids = list(per_agent)
+    messages = [_build_message(per_agent[a]['token'], per_agent[a]['rows']) for a in agent_ids]
+    try:
+        results = client.send_each(messages)
+    except Exception as e:
+        print(f"❌ 재통화 알림 발송 오류: {e}")
+        CallbackReminder.objects.filter(batch_id=batch_id).update(status='FAILED', error=str(e)[:1000])
+        return 0, len(agent_ids), len(claimed)
+
+    # 3. 결과 기록 (상담사 단위로 UPDATE)
+    sent_agents = [a for a, r in zip(agent_ids, results) if r.success]
+    CallbackReminder.objects.filter(batch_id=batch_id, agent_id__in=sent_agents).update(status='SENT', sent_at=timezone.now())
+    for agent_id, result in zip(agent_ids, results):
+        if not result.success:
+            CallbackReminder.objects.filter(batch_id=batch_id, agent_id=agent_id).update(status='FAILED', error=result.error[:1000])
+    return len(sent_agents), len(agent_ids) - len(sent_agents), len(claimed)
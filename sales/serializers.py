@@ -3,7 +3,8 @@ from .models import (
     Customer, User, ConsultationLog, 
     Platform, FailureReason, CustomStatus, 
     SettlementStatus, SalesProduct, AdChannel, Bank,
-    Notice, PolicyImage, TodoTask, CancelReason, Client # ⭐️ 신규 모델 임포트
+    Notice, PolicyImage, TodoTask, TodoReceipt, CancelReason, Client, # ⭐️ 신규 모델 임포트
+    ArchivedCustomer, SMSLog,
 )
 
 # ==============================================================================
@@ -98,7 +99,11 @@ class CustomerSerializer(serializers.ModelSerializer):
             'logs', 
             'created_at', 'updated_at',
             'settlement_memo',
+
+            # --- 활동 요약 (작성/수신 시 자동 갱신) ---
+            'log_count', 'sms_unread_count', 'last_sms_at', 'last_contact_at',
         ]
+        read_only_fields = ['log_count', 'sms_unread_count', 'last_sms_at', 'last_contact_at']
 
     # 순수익 계산 로직: (본사정책 - 지원금) * 10000
     def get_net_profit(self, obj):
@@ -111,6 +116,16 @@ class CustomerSerializer(serializers.ModelSerializer):
         return (policy - support) * 10000
 
 
+# ⭐️ [신규] 일괄 변경(bulk PATCH) 시 변경값 검증용 - 허용 필드만 받음
+class CustomerBulkChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = [
+            'status', 'settlement_status', 'settlement_due_date', 'settlement_complete_date',
+            'settlement_memo', 'client', 'callback_schedule', 'owner',
+        ]
+
+
 class AdChannelSerializer(serializers.ModelSerializer):
     class Meta:
         model = AdChannel
@@ -150,6 +165,19 @@ class TodoTaskSerializer(serializers.ModelSerializer):
         model = TodoTask
         fields = '__all__'
 
+class TodoReceiptSerializer(serializers.ModelSerializer):
+    """받은 업무함 항목 (업무 내용 + 내 처리 상태)"""
+    task_id = serializers.ReadOnlyField(source='task.id')
+    content = serializers.ReadOnlyField(source='task.content')
+    is_global = serializers.ReadOnlyField(source='task.is_global')
+    sender_name = serializers.ReadOnlyField(source='task.sender.username')
+    created_at = serializers.ReadOnlyField(source='task.created_at')
+
+    class Meta:
+        model = TodoReceipt
+        fields = ['id', 'task_id', 'content', 'is_global', 'sender_name', 'created_at',
+                  'delivered_at', 'read_at', 'completed_at']
+
 class CancelReasonSerializer(serializers.ModelSerializer):
     class Meta:
         model = CancelReason
@@ -159,4 +187,34 @@ class CancelReasonSerializer(serializers.ModelSerializer):
 class ClientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Client
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+# 🧊 보관 고객 (조회 전용)
+class ArchivedCustomerSerializer(serializers.ModelSerializer):
+    owner_name = serializers.ReadOnlyField(source='owner.username')
+
+    class Meta:
+        model = ArchivedCustomer
+        fields = ['customer_id', 'phone', 'name', 'owner', 'owner_name', 'platform', 'status',
+                  'settlement_status', 'upload_date', 'last_updated_at', 'archived_at']
+
+
+class ArchivedCustomerDetailSerializer(ArchivedCustomerSerializer):
+    """보관 당시 고객 정보 + 상담기록/문자/녹취/상태이력 (문자 사진은 URL 로)"""
+    sms = serializers.SerializerMethodField()
+
+    class Meta(ArchivedCustomerSerializer.Meta):
+        fields = ArchivedCustomerSerializer.Meta.fields + ['data', 'logs', 'sms', 'calls', 'history']
+
+    def get_sms(self, obj):
+        request = self.context.get('request')
+        storage = SMSLog._meta.get_field('image').storage
+        messages = []
+        for message in obj.sms:
+            image = message.get('image')
+            if image:
+                url = storage.url(image)
+                message = {**message, 'image': request.build_absolute_uri(url) if request else url}
+            messages.append(message)
+        return messages
@@ -0,0 +1,203 @@
+import csv
+import datetime
+import io
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from .data_version import bump_version
+from .db_utils import bulk_update_case
+from .ingest import clean_phone
+from .models import Customer, SettlementBatch
+from .system_config import CONFIG_DATA
+
+
+# ==============================================================================
+# 💰 본사 정산 파일 일괄 반영 / 대사
+# ==============================================================================
+# 본사마다 컬럼명이 조금씩 달라서 별칭으로 찾습니다.
+COLUMN_ALIASES = {
+    'phone': ['전화번호', '휴대폰번호', '휴대폰', '연락처', 'phone'],
+    'amount': ['정책', '정책금', '정책금액', '본사정책', 'policy_amt', 'amount'],
+    'client': ['거래처', 'client'],
+    'date': ['정산일', '정산완료일', '지급일', 'settlement_date'],
+    'memo': ['비고', '메모', 'memo'],
+}
+
+REPORT_SAMPLE_LIMIT = 200
+
+
+def _parse_int(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    cleaned = re.sub(r'[^0-9\-]', '', str(value))
+    return int(cleaned) if cleaned not in ('', '-') else None
+
+
+def _parse_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = str(value).strip().replace('.', '-').replace('/', '-')
+    try:
+        return datetime.date.fromisoformat(text[:10])
+    except ValueError:
+        return None
+
+
+def _resolve_columns(header):
+    """헤더 행에서 필요한 컬럼 위치를 찾습니다."""
+    normalized = [str(h or '').strip() for h in header]
+    positions = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                positions[key] = normalized.index(alias)
+                break
+    if 'phone' not in positions or 'amount' not in positions:
+        raise ValueError("정산 파일에 전화번호/정책 컬럼이 없습니다.")
+    return positions
+
+
+def iter_settlement_rows(upload):
+    """CSV(utf-8/cp949) 또는 XLSX 파일을 한 줄씩 (phone, amount, client, date, memo) 로 읽습니다."""
+    name = (upload.name or '').lower()
+    if name.endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook  # 엑셀 정산 시에만 로딩
+        workbook = load_workbook(upload, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+    else:
+        raw = upload.read()
+        try:
+            text = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            text = raw.decode('cp949')
+        rows = csv.reader(io.StringIO(text))
+
+    positions = None
+    for row in rows:
+        if positions is None:
+            if not any(row):
+                continue
+            positions = _resolve_columns(row)
+            continue
+
+        def cell(key):
+            index = positions.get(key)
+            return row[index] if index is not None and index < len(row) else None
+
+        phone = clean_phone(cell('phone'))
+        if not phone:
+            continue
+        yield {
+            'phone': phone,
+            'amount': _parse_int(cell('amount')),
+            'client': str(cell('client')).strip() if cell('client') else None,
+            'date': _parse_date(cell('date')),
+            'memo': str(cell('memo')).strip() if cell('memo') else None,
+        }
+
+
+def _empty_total():
+    return {'count': 0, 'policy_amt': 0, 'agent_policy': 0, 'diff': 0, 'mismatch': 0}
+
+
+def run_settlement_batch(upload, user=None, settlement_status='정산완료', dry_run=False):
+    """
+    정산 파일을 대상 고객과 메모리 해시 조인으로 매칭하고, UPDATE ... CASE 일괄 갱신으로 반영합니다.
+    - 매칭 키: 정규화된 전화번호 (같은 번호가 여럿이면 가장 최근 고객)
+    - 본사 정책(파일) 과 상담사 입력 정책(agent_policy) 이 다르면 불일치로 표시
+    """
+    # 1. 대상 고객을 한 번에 읽어 번호 → 고객 해시 테이블 구성
+    fields = ['id', 'phone', 'name', 'platform', 'client', 'agent_policy', 'policy_amt',
+              'settlement_status', 'settlement_complete_date', 'settlement_memo']
+    candidates = Customer.objects.filter(
+        status__in=CONFIG_DATA['settlement_target_statuses']
+    ).only(*fields).order_by('id')
+    by_phone = {}
+    for customer in candidates.iterator(chunk_size=2000):
+        by_phone[clean_phone(customer.phone)] = customer  # id 오름차순이므로 최근 고객이 남음
+
+    # 2. 파일 한 줄씩 매칭
+    today = datetime.date.today()
+    totals_by_client, totals_by_platform = {}, {}
+    unmatched, mismatches = [], []
+    matched = {}
+    row_count = mismatch_count = duplicate_count = 0
+    for row in iter_settlement_rows(upload):
+        row_count += 1
+        customer = by_phone.get(row['phone'])
+        if customer is None:
+            if len(unmatched) < REPORT_SAMPLE_LIMIT:
+                unmatched.append({'phone': row['phone'], 'amount': row['amount'], 'client': row['client']})
+            continue
+        if customer.id in matched:
+            duplicate_count += 1
+            continue
+        matched[customer.id] = customer
+
+        amount = row['amount'] if row['amount'] is not None else customer.policy_amt
+        agent_policy = customer.agent_policy or 0
+        client = row['client'] or customer.client or '미지정'
+        platform = customer.platform or '기타'
+        is_mismatch = amount != agent_policy
+        if is_mismatch:
+            mismatch_count += 1
+            if len(mismatches) < REPORT_SAMPLE_LIMIT:
+                mismatches.append({
+                    'customer_id': customer.id, 'name': customer.name, 'phone': row['phone'],
+                    'policy_amt': amount, 'agent_policy': agent_policy, 'diff': amount - agent_policy,
+                })
+
+        for bucket, key in ((totals_by_client, client), (totals_by_platform, platform)):
+            total = bucket.setdefault(key, _empty_total())
+            total['count'] += 1
+            total['policy_amt'] += amount
+            total['agent_policy'] += agent_policy
+            total['diff'] += amount - agent_policy
+            total['mismatch'] += int(is_mismatch)
+
+        customer.policy_amt = amount
+        customer.settlement_status = settlement_status
+        customer.settlement_complete_date = row['date'] or today
+        if row['client'] and not customer.client:
+            customer.client = row['client']
+        if row['memo']:
+            customer.settlement_memo = row['memo']
+
+    report = {
+        'summary': {
+            'rows': row_count, 'matched': len(matched), 'unmatched': row_count - len(matched) - duplicate_count,
+            'duplicates': duplicate_count, 'mismatches': mismatch_count,
+            'policy_amt': sum(t['policy_amt'] for t in totals_by_client.values()),
+            'agent_policy': sum(t['agent_policy'] for t in totals_by_client.values()),
+        },
+        'by_client': totals_by_client,
+        'by_platform': totals_by_platform,
+        'mismatches': mismatches,
+        'unmatched': unmatched,
+    }
+
+    # 3. 반영 (미리보기면 DB 변경 없이 결과만 저장)
+    with transaction.atomic():
+        if not dry_run:
+            # 원시 UPDATE 라 auto_now 가 적용되지 않으므로 변경 시각도 직접 (보관 기준 등에서 사용)
+            now = timezone.now()
+            for customer in matched.values():
+                customer.updated_at = now
+            bulk_update_case(
+                Customer, matched.values(),
+                ['policy_amt', 'settlement_status', 'settlement_complete_date', 'client', 'settlement_memo', 'updated_at'],
+            )
+            bump_version()
+        batch = SettlementBatch.objects.create(
+            file_name=upload.name or '', uploaded_by=user, dry_run=dry_run,
+            row_count=row_count, matched_count=len(matched), mismatch_count=mismatch_count, report=report,
+        )
+    return batch
@@ -0,0 +1,228 @@
+import asyncio
+import contextlib
+import re
+import threading
+import time
+import uuid
+import weakref
+
+from django.conf import settings
+
+from .metrics import registry as metrics
+
+
+# ==============================================================================
+# 📡 SMS 게이트웨이(Traccar/SMS Gateway 앱) HTTP 클라이언트
+# ==============================================================================
+# requests 는 첫 발송 시점에 import 하고, 워커당 하나의 Session 을 재사용합니다.
+# (커넥션 풀 재사용으로 매 발송마다 TCP/TLS 핸드셰이크를 하지 않습니다.)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                _session = requests.Session()
+    return _session
+
+
+_ssl_context = None  # CA 인증서 로딩(수십 ms)은 프로세스당 한 번만
+_loop_pools = weakref.WeakKeyDictionary()  # 이벤트 루프 → _LoopClientPool
+
+
+def _get_ssl_context():
+    global _ssl_context
+    if _ssl_context is None:
+        with _session_lock:
+            if _ssl_context is None:
+                import httpx
+                _ssl_context = httpx.create_ssl_context()
+    return _ssl_context
+
+
+class _LoopClientPool:
+    """
+    이벤트 루프 하나가 쓰는 httpx.AsyncClient(샤드) 묶음
+    httpcore 커넥션 풀은 요청을 배정할 때마다 풀의 모든 연결을 훑기 때문에 풀이 클수록 급격히 느려집니다.
+    (200 연결 풀 하나로 동시 200건: 1000건에 26초 → 10 연결 × 20개: 1.9초)
+    그래서 SMS_GATEWAY_POOL_SHARD_SIZE 크기의 작은 클라이언트를 쓰되, 있는 샤드가 모두 꽉 찼을 때만
+    하나씩 늘립니다. (최대 SMS_GATEWAY_MAX_CONNECTIONS / 샤드 크기 개)
+    WSGI 에서 비동기 뷰가 요청마다 새 루프로 실행되면 루프당 클라이언트는 보통 하나뿐입니다.
+    """
+
+    def __init__(self):
+        import httpx
+        max_connections = getattr(settings, 'SMS_GATEWAY_MAX_CONNECTIONS', 500)
+        self.shard_size = max(1, min(getattr(settings, 'SMS_GATEWAY_POOL_SHARD_SIZE', 10), max_connections))
+        self.max_shards = max(1, max_connections // self.shard_size)
+        self.limits = httpx.Limits(max_connections=self.shard_size, max_keepalive_connections=self.shard_size)
+        self.clients = []
+        self.in_flight = []
+        self.closer = None
+
+    def acquire(self):
+        """진행 중인 요청이 가장 적은 샤드 번호 (모두 꽉 찼으면 새 샤드)"""
+        index = min(range(len(self.clients)), key=self.in_flight.__getitem__, default=None)
+        if index is None or (self.in_flight[index] >= self.shard_size and len(self.clients) < self.max_shards):
+            import httpx
+            self.clients.append(httpx.AsyncClient(timeout=5, limits=self.limits, verify=_get_ssl_context()))
+            self.in_flight.append(0)
+            index = len(self.clients) - 1
+        self.in_flight[index] += 1
+        return index
+
+    async def aclose(self):
+        clients, self.clients, self.in_flight = self.clients, [], []
+        for client in clients:
+            await client.aclose()
+
+
+async def _close_pool_on_loop_shutdown(pool):
+    # 루프가 끝날 때(asyncio.run / async_to_sync 의 shutdown_asyncgens) finally 가 실행되어 연결을 닫음
+    try:
+        yield
+    finally:
+        await pool.aclose()
+
+
+@contextlib.asynccontextmanager
+async def async_gateway_client():
+    """
+    현재 이벤트 루프의 게이트웨이 httpx.AsyncClient 를 빌려줍니다.
+    클라이언트는 만들어진 루프에 묶이므로 루프별로 따로 두고, 루프가 끝나면 aclose() 로 소켓을 정리합니다.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _loop_pools.get(loop)
+    if pool is None:
+        pool = _loop_pools[loop] = _LoopClientPool()
+        pool.closer = _close_pool_on_loop_shutdown(pool)
+        await pool.closer.__anext__()  # 루프의 async generator 목록에 등록
+    index = pool.acquire()
+    try:
+        yield pool.clients[index]
+    finally:
+        if index < len(pool.in_flight):
+            pool.in_flight[index] -= 1
+
+
+def format_gateway_phone(phone):
+    """📱 [중요] 전화번호를 +8210... 형식으로 변환"""
+    # 모든 특수문자 제거
+    raw_num = re.sub(r'[^0-9]', '', str(phone))
+    if raw_num.startswith('0'):
+        # 앞의 0을 제거하고 +82를 붙임 (01012345678 -> +821012345678)
+        return '+82' + raw_num[1:]
+    elif raw_num.startswith('82'):
+        return '+' + raw_num
+    return '+82' + raw_num
+
+
+# ==============================================================================
+# [핵심] 문자 발송 함수
+# ==============================================================================
+def new_gateway_message_id():
+    """발송 전에 정해 두는 게이트웨이 메시지 ID (발송 결과 웹훅이 이 ID 로 돌아옴)"""
+    return uuid.uuid4().hex
+
+
+def build_gateway_request(phone, sms_text, gateway_config, message_id=None):
+    """(url, payload, auth) 를 만들고, 설정값이 빠져 있으면 None 을 돌려줍니다."""
+    url = gateway_config.get('url')
+    username = gateway_config.get('username')
+    password = gateway_config.get('password')
+
+    if not all([url, username, password]):
+        return None
+
+    formatted_phone = format_gateway_phone(phone)
+    payload = {
+        "textMessage": {
+            "text": sms_text
+        },
+        "phoneNumbers": [formatted_phone] # 👈 변환된 번호 사용
+    }
+    if message_id:
+        payload["id"] = message_id  # 지정하지 않으면 게이트웨이가 만들어 응답에 담아 줌
+    return url, payload, (username, password)
+
+
+def _handle_gateway_response(phone, status_code, text):
+    formatted_phone = format_gateway_phone(phone)
+    if status_code in [200, 201, 202]:
+        print(f"✅ 발송 성공: {formatted_phone}")
+        return True
+    # 400 에러 메시지를 로그에 더 자세히 출력
+    print(f"❌ 발송 실패: {status_code} - {text}")
+    return False
+
+
+def _response_message_id(response, message_id):
+    """게이트웨이 응답({"id": ..., "state": "Pending"})의 메시지 ID, 없으면 요청에 넣은 ID"""
+    try:
+        data = response.json()
+    except ValueError:
+        return message_id
+    return (data.get('id') if isinstance(data, dict) else None) or message_id
+
+
+def _record_gateway_call(started, success):
+    # 📈 게이트웨이 호출 지연시간 / 성공·실패 카운터
+    metrics.observe('sms_gateway_request_duration_seconds', time.perf_counter() - started)
+    metrics.inc('sms_gateway_requests_total', result='success' if success else 'failure')
+
+
+def send_gateway_sms(phone, sms_text, gateway_config, message_id=None):
+    """
+    문자 발송 후 (성공 여부, 게이트웨이 메시지 ID) 를 돌려줍니다.
+    메시지 ID 는 SMSLog.gateway_message_id 에 저장해 두면 발송 결과 웹훅(sms_status)이 상태를 갱신합니다.
+    """
+    gateway_request = build_gateway_request(phone, sms_text, gateway_config, message_id)
+    if gateway_request is None:
+        return False, None
+    url, payload, auth = gateway_request
+
+    started = time.perf_counter()
+    success = False
+    try:
+        response = get_http_session().post(url, json=payload, auth=auth, timeout=5)
+        success = _handle_gateway_response(phone, response.status_code, response.text)
+        return success, _response_message_id(response, message_id) if success else None
+    except Exception as e:
+        print(f"❌ 연결 오류: {e}")
+        return False, None
+    finally:
+        _record_gateway_call(started, success)
+
+
+async def asend_gateway_sms(phone, sms_text, gateway_config, message_id=None):
+    """send_gateway_sms 의 비동기 버전 - 게이트웨이 응답을 기다리는 동안 워커가 다른 요청을 처리합니다."""
+    gateway_request = build_gateway_request(phone, sms_text, gateway_config, message_id)
+    if gateway_request is None:
+        return False, None
+    url, payload, auth = gateway_request
+
+    started = time.perf_counter()
+    success = False
+    try:
+        async with async_gateway_client() as client:
+            response = await client.post(url, json=payload, auth=auth)
+        success = _handle_gateway_response(phone, response.status_code, response.text)
+        return success, _response_message_id(response, message_id) if success else None
+    except Exception as e:
+        print(f"❌ 연결 오류: {e}")
+        return False, None
+    finally:
+        _record_gateway_call(started, success)
+
+
+def send_traccar_cloud_sms(phone, sms_text, gateway_config):
+    return send_gateway_sms(phone, sms_text, gateway_config)[0]
+
+
+async def asend_traccar_cloud_sms(phone, sms_text, gateway_config):
+    return (await asend_gateway_sms(phone, sms_text, gateway_config))[0]
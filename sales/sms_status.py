@@ -0,0 +1,137 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .db_utils import bulk_update_case
+from .models import SMSLog, SMSStatusEvent
+from .webhook_queue import claim_batch, fail_batch, recover_queue
+
+
+# ==============================================================================
+# 📬 발송 결과 웹훅 (sms:sent / sms:delivered / sms:failed) → SMSLog 상태 반영
+# ==============================================================================
+# 게이트웨이 2xx 응답은 '접수'(SUCCESS)일 뿐이라, 실제 발송/도착/실패는 결과 웹훅으로 받습니다.
+# 웹훅은 한 줄 INSERT(같은 결과의 재전송은 무시) 후 바로 응답하고,
+# 묶음마다 메시지 ID 로 SMSLog 를 한 번 조회 → UPDATE ... CASE id 한 번으로 상태를 갱신합니다.
+# (단체 문자 발송 중 분당 수천 건의 결과가 와도 묶음당 쿼리 수는 일정)
+BATCH_SIZE = 1000
+STATUS_EVENTS = ('sms:sent', 'sms:delivered', 'sms:failed')
+
+EVENT_STATUS = {'sms:sent': 'SENT', 'sms:delivered': 'DELIVERED', 'sms:failed': 'FAIL'}
+EVENT_TIME_FIELD = {'sms:sent': 'sentAt', 'sms:delivered': 'deliveredAt', 'sms:failed': 'failedAt'}
+# 결과 웹훅은 순서가 뒤바뀌어 올 수 있어 더 진행된 상태로만 바꿉니다. (도착/실패는 최종 상태)
+STATUS_RANK = {'PENDING': 0, 'SUCCESS': 1, 'SENT': 2, 'DELIVERED': 3, 'FAIL': 3}
+
+
+def _event_time(payload, event):
+    occurred = parse_datetime(str(payload.get(EVENT_TIME_FIELD[event]) or ''))
+    if occurred is None:
+        return timezone.now()
+    if timezone.is_aware(occurred) and not settings.USE_TZ:
+        occurred = timezone.make_naive(occurred)
+    return occurred
+
+
+def enqueue_status_report(data):
+    """
+    발송 결과 웹훅을 대기열에 넣습니다.
+    형식: {"deviceId", "event": "sms:delivered", "payload": {"messageId", "phoneNumber", "deliveredAt"}}
+    반환: 형식이 맞지 않으면 False
+    """
+    event = data.get('event')
+    payload = data.get('payload') or {}
+    message_id = payload.get('messageId') if isinstance(payload, dict) else None
+    if event not in STATUS_EVENTS or not message_id:
+        return False
+    SMSStatusEvent.objects.bulk_create([SMSStatusEvent(
+        gateway_message_id=str(message_id)[:64], device_id=str(data.get('deviceId') or '')[:64], event=event,
+        reason=str(payload.get('reason') or '')[:255], occurred_at=_event_time(payload, event),
+    )], ignore_conflicts=True)
+    if getattr(settings, 'INBOUND_SMS_AUTO_DRAIN', True):
+        transaction.on_commit(schedule_drain)
+    return True
+
+
+def process_status_batch(batch_size=BATCH_SIZE):
+    """
+    대기 중인 결과 한 묶음을 SMSLog 에 반영합니다.
+    반환: {'updated', 'ignored', 'failed'} (대기열이 비었으면 None)
+    """
+    batch_id = claim_batch(SMSStatusEvent, batch_size)
+    if batch_id is None:
+        return None
+    events = list(SMSStatusEvent.objects.filter(batch_id=batch_id).order_by('occurred_at', 'id'))
+
+    # 1. 메시지 ID 로 발신 기록 한 번 조회 (unique_smslog_gateway_message 인덱스)
+    logs = {}
+    for log in SMSLog.objects.filter(
+        gateway_message_id__in={e.gateway_message_id for e in events}, direction='OUT'
+    ).only('id', 'gateway_message_id', 'status', 'status_updated_at', 'fail_reason'):
+        logs[log.gateway_message_id] = log
+
+    # 2. 메모리에서 로그별 최종 상태 계산 (같은 묶음 안의 sent → delivered 는 delivered 하나로)
+    changed, done_ids, ignored_ids = {}, [], []
+    for event in events:
+        log = logs.get(event.gateway_message_id)
+        if log is None:
+            ignored_ids.append(event.id)  # 연동 테스트 문자 등 SMSLog 가 없는 발송
+            continue
+        done_ids.append(event.id)
+        new_status = EVENT_STATUS[event.event]
+        if STATUS_RANK[new_status] <= STATUS_RANK.get(log.status, 0):
+            continue
+        log.status = new_status
+        log.status_updated_at = event.occurred_at
+        log.fail_reason = event.reason if new_status == 'FAIL' else ''
+        changed[log.id] = log
+
+    now = timezone.now()
+    events_in_batch = SMSStatusEvent.objects.filter(batch_id=batch_id)
+    try:
+        with transaction.atomic():
+            # 3. UPDATE ... SET status = CASE id WHEN ... END WHERE id IN (...) 한 번
+            bulk_update_case(SMSLog, changed.values(), ['status', 'status_updated_at', 'fail_reason'])
+            events_in_batch.filter(id__in=done_ids).update(status='DONE', processed_at=now)
+            events_in_batch.filter(id__in=ignored_ids).update(status='IGNORED', processed_at=now)
+    except Exception as e:
+        print(f"❌ 발송 결과 묶음 처리 실패: {e}")
+        fail_batch(SMSStatusEvent, batch_id, e)
+        return {'updated': 0, 'ignored': 0, 'failed': len(events)}
+    return {'updated': len(changed), 'ignored': len(ignored_ids), 'failed': 0}
+
+
+def drain_status_queue(batch_size=BATCH_SIZE):
+    """멈춘 묶음 / 실패 이벤트를 대기열로 되돌린 뒤 빌 때까지 묶음 처리. 반환: 합계"""
+    recover_queue(SMSStatusEvent)
+    totals = {'updated': 0, 'ignored': 0, 'failed': 0}
+    while True:
+        result = process_status_batch(batch_size)
+        if result is None:
+            return totals
+        for key, value in result.items():
+            totals[key] += value
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sms-status')
+_drain_pending = threading.Event()
+
+
+def _drain_in_background():
+    _drain_pending.clear()  # 처리 도중 들어온 웹훅은 다음 drain 을 다시 예약
+    try:
+        drain_status_queue()
+    except Exception as e:
+        print(f"❌ 발송 결과 대기열 처리 오류: {e}")
+    finally:
+        close_old_connections()
+
+
+def schedule_drain():
+    """결과 웹훅이 몰려도 대기 중인 drain 은 하나만 예약"""
+    if not _drain_pending.is_set():
+        _drain_pending.set()
+        _executor.submit(_drain_in_background)
@@ -0,0 +1,207 @@
+import datetime
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Avg, Case, Count, Max, Min, When
+from django.utils import timezone
+
+from .data_version import bump_version
+from .models import StatusCode, StatusTransition
+
+
+# ==============================================================================
+# 🧭 고객 상태 변경 이력 (전환 퍼널 / 단계별 체류 시간)
+# ==============================================================================
+# 상태를 바꾸는 모든 경로(save / queryset.update)에서 같은 트랜잭션 안에 StatusTransition 을 추가합니다.
+# - 상태 이름은 StatusCode(2바이트 코드)로 바꿔 저장해 이력 행을 작게 유지
+# - duration = 이전 상태에 머문 초 (직전 변경 시각 기준) → 단계별 체류 시간은 GROUP BY 한 번
+RECORD_CHUNK_SIZE = 500
+
+_code_cache = {}  # 상태 이름 → 코드 (커밋된 코드만 보관)
+
+
+def status_code_ids(names, create=True):
+    """상태 이름들 → {이름: 코드}. create=True 면 처음 보는 상태는 코드를 새로 만듭니다."""
+    names = {name for name in names if name}
+    codes = {name: _code_cache[name] for name in names if name in _code_cache}
+    missing = names - set(codes)
+    if missing:
+        if create:
+            StatusCode.objects.bulk_create([StatusCode(name=name) for name in missing], ignore_conflicts=True)
+        found = dict(StatusCode.objects.filter(name__in=missing).values_list('name', 'id'))
+        codes.update(found)
+        # 롤백될 수 있는 코드를 캐시에 넣지 않도록 커밋 후에 보관
+        transaction.on_commit(lambda: _code_cache.update(found))
+    return codes
+
+
+def record_transitions(changes, actor_id=None, at=None):
+    """
+    [(고객 ID, 이전 상태, 변경 상태), ...] 를 이력에 추가합니다. (이전 상태 None = 신규 등록)
+    반환: 추가한 행 수
+    """
+    changes = [(customer_id, old, new) for customer_id, old, new in changes if new and old != new]
+    if not changes:
+        return 0
+    at = at or timezone.now()
+    codes = status_code_ids({old for _, old, _ in changes} | {new for _, _, new in changes})
+
+    created = 0
+    for start in range(0, len(changes), RECORD_CHUNK_SIZE):
+        chunk = changes[start:start + RECORD_CHUNK_SIZE]
+        # 고객별 직전 변경 시각 (status_tr_customer_idx)
+        last_changed = dict(
+            StatusTransition.objects.filter(customer_id__in=[c[0] for c in chunk])
+            .values('customer_id').annotate(last=Max('created_at')).values_list('customer_id', 'last')
+        )
+        rows = []
+        for customer_id, old, new in chunk:
+            last = last_changed.get(customer_id)
+            rows.append(StatusTransition(
+                customer_id=customer_id, from_status_id=codes.get(old), to_status_id=codes[new], actor_id=actor_id,
+                duration=max(0, int((at - last).total_seconds())) if last and old else None, created_at=at,
+            ))
+        StatusTransition.objects.bulk_create(rows)
+        created += len(rows)
+    return created
+
+
+def update_status(queryset, status, actor_id=None, **fields):
+    """
+    queryset.update(status=...) 와 같지만, 실제로 상태가 바뀌는 고객의 이력을 같은 트랜잭션에 남깁니다.
+    반환: UPDATE 된 행 수
+    """
+    from .allocation import adjust_lead_loads  # allocation 이 이 모듈을 import 하므로 지연 로딩
+
+    reassigning = 'owner' in fields or 'owner_id' in fields
+    new_owner = fields.get('owner_id', getattr(fields.get('owner'), 'pk', fields.get('owner')))
+    with transaction.atomic():
+        # 담당자도 바꾸면 상태가 같은 고객도 미결 카운터가 옮겨 가므로 전부 읽음
+        targets = queryset if reassigning else queryset.exclude(status=status)
+        previous = list(targets.select_for_update().values_list('id', 'status', 'owner_id'))
+        updated = queryset.update(status=status, **fields)
+        record_transitions([(customer_id, old, status) for customer_id, old, _ in previous], actor_id)
+        adjust_lead_loads([(owner, old, new_owner if reassigning else owner, status) for _, old, owner in previous])
+        if updated:
+            bump_version()
+    return updated
+
+
+# ==============================================================================
+# 📈 집계
+# ==============================================================================
+def _date_range(queryset, start_date, end_date, field='created_at'):
+    if start_date:
+        queryset = queryset.filter(**{f'{field}__gte': datetime.date.fromisoformat(str(start_date))})
+    if end_date:
+        queryset = queryset.filter(**{f'{field}__lt': datetime.date.fromisoformat(str(end_date)) + datetime.timedelta(days=1)})
+    return queryset
+
+
+def _hours(seconds):
+    return round(seconds / 3600, 1) if seconds is not None else None
+
+
+def _seconds_between(start, end):
+    """두 시각 컬럼 사이의 초 (DB 별 SQL 표현)"""
+    if connection.vendor == 'postgresql':
+        return f"EXTRACT(EPOCH FROM ({end} - {start}))"
+    if connection.vendor == 'mysql':
+        return f"TIMESTAMPDIFF(SECOND, {start}, {end})"
+    return f"ROUND((julianday({end}) - julianday({start})) * 86400)"
+
+
+def conversion_funnel(from_status, to_status, start_date=None, end_date=None, platform=None):
+    """
+    from_status 에 들어온 고객 중 to_status 까지 간 비율과 걸린 시간 (플랫폼별)
+    고객마다 각 상태에 처음 들어온 시각 기준이며, 기간은 from_status 진입 시각으로 거릅니다.
+    """
+    codes = status_code_ids([from_status, to_status], create=False)
+    if from_status not in codes or to_status not in codes:
+        return {'from': from_status, 'to': to_status, 'total': None, 'platforms': []}
+    entered_code, converted_code = codes[from_status], codes[to_status]
+
+    # 1. 두 상태로의 변경만 읽어 고객별 첫 진입 시각을 GROUP BY (status_tr_to_idx)
+    queryset = StatusTransition.objects.filter(to_status_id__in=[entered_code, converted_code])
+    if platform:
+        queryset = queryset.filter(customer__platform=platform)
+    rows = queryset.values('customer_id').annotate(
+        entered=Min(Case(When(to_status_id=entered_code, then='created_at'))),
+        converted=Min(Case(When(to_status_id=converted_code, then='created_at'))),
+    ).filter(entered__isnull=False)
+    rows = _date_range(rows, start_date, end_date, field='entered')
+    inner_sql, params = rows.values('customer__platform', 'entered', 'converted').query.sql_with_params()
+
+    # 2. 그 결과를 감싸서 플랫폼별 진입/전환 수, 평균은 GROUP BY 로, 중앙값은 창 함수로 가운데 행만 가져옴
+    #    (앞쪽 행: platform, 진입 수, 전환 수, 평균 초 / 뒤쪽 행: platform, 플랫폼 내 순번, 플랫폼 전환 수, 초, 전체 순번, 전체 전환 수)
+    qn = connection.ops.quote_name
+    sql = f"""
+        WITH firsts AS (
+            SELECT COALESCE({qn('customer__platform')}, '기타') AS platform,
+                   CASE WHEN converted >= entered THEN {_seconds_between('entered', 'converted')} END AS took
+            FROM ({inner_sql}) per_customer
+        ),
+        ranked AS (
+            SELECT platform, took,
+                   ROW_NUMBER() OVER (PARTITION BY platform ORDER BY took) AS rn, COUNT(*) OVER (PARTITION BY platform) AS n,
+                   ROW_NUMBER() OVER (ORDER BY took) AS rn_all, COUNT(*) OVER () AS n_all
+            FROM firsts WHERE took IS NOT NULL
+        )
+        SELECT 'summary', platform, COUNT(*), COUNT(took), AVG(took), NULL, NULL FROM firsts GROUP BY platform
+        UNION ALL
+        SELECT 'middle', platform, rn, n, took, rn_all, n_all FROM ranked
+        WHERE rn IN ((n + 1) / 2, n / 2 + 1) OR rn_all IN ((n_all + 1) / 2, n_all / 2 + 1)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        result_rows = cursor.fetchall()
+
+    summary, middles, total_middles = {}, defaultdict(list), []
+    for kind, name, a, b, seconds, rn_all, n_all in result_rows:
+        if kind == 'summary':
+            summary[name] = {'entered': a, 'converted': b, 'avg': seconds}
+            continue
+        if a in ((b + 1) // 2, b // 2 + 1):
+            middles[name].append(seconds)
+        if rn_all in ((n_all + 1) // 2, n_all // 2 + 1):
+            total_middles.append(seconds)
+
+    def summarize(name, bucket, middle):
+        return {
+            'platform': name,
+            'entered': bucket['entered'],
+            'converted': bucket['converted'],
+            'conversion_rate': round(bucket['converted'] / bucket['entered'] * 100, 1) if bucket['entered'] else 0,
+            'avg_hours': _hours(bucket['avg']),
+            'median_hours': _hours(sum(middle) / len(middle)) if middle else None,
+        }
+
+    platforms = sorted(
+        (summarize(name, bucket, middles[name]) for name, bucket in summary.items()),
+        key=lambda r: (-r['entered'], r['platform']),
+    )
+    total = None
+    if summary:
+        converted = sum(b['converted'] for b in summary.values())
+        total = summarize('전체', {
+            'entered': sum(b['entered'] for b in summary.values()),
+            'converted': converted,
+            'avg': sum(b['avg'] * b['converted'] for b in summary.values() if b['converted']) / converted if converted else None,
+        }, total_middles)
+    return {'from': from_status, 'to': to_status, 'total': total, 'platforms': platforms}
+
+
+def stage_durations(start_date=None, end_date=None, platform=None):
+    """상태별 평균/최대 체류 시간 - 그 상태를 벗어난 변경(from_status)으로 GROUP BY"""
+    queryset = StatusTransition.objects.filter(from_status__isnull=False, duration__isnull=False)
+    if platform:
+        queryset = queryset.filter(customer__platform=platform)
+    queryset = _date_range(queryset, start_date, end_date)
+    rows = queryset.values('from_status__name').annotate(
+        count=Count('id'), avg=Avg('duration'), longest=Max('duration'),
+    ).order_by('-count')
+    return [
+        {'status': row['from_status__name'], 'count': row['count'],
+         'avg_hours': _hours(row['avg']), 'max_hours': _hours(row['longest'])}
+        for row in rows
+    ]
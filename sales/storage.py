@@ -0,0 +1,119 @@
+import hashlib
+import os
+import re
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.crypto import salted_hmac
+
+
+# ==============================================================================
+# 🗂️ 내용 해시(SHA-256) 기반 미디어 저장소
+# ==============================================================================
+# 같은 사진을 여러 번 올려도 디스크에는 blobs/ab/<sha256>.<확장자> 한 벌만 저장하고,
+# MediaBlob.refcount 로 몇 개의 행이 참조하는지 셉니다.
+# 참조는 행이 커밋된 뒤에 얻고(acquire), 파일은 마지막 참조가 지워질 때(release)만 삭제됩니다.
+# 롤백으로 참조 없이 남은 blob 파일은 dedupe_media 명령이 정리합니다.
+BLOB_DIR = 'blobs'
+HASHED_NAME_RE = re.compile(r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}(\.[A-Za-z0-9]+)?$')
+
+
+def is_hashed_name(name):
+    return bool(name and HASHED_NAME_RE.match(name))
+
+
+def hashed_name(digest, original_name):
+    ext = os.path.splitext(original_name or '')[1].lower()
+    return f"{BLOB_DIR}/{digest[:2]}/{digest}{ext}"
+
+
+def media_signature(name):
+    """미디어 경로 서명 - /media/ 는 서명이 맞거나 로그인한 사용자에게만 파일을 내줍니다. (<img> 태그는 토큰 헤더를 못 보냄)"""
+    return salted_hmac('sales.media', name).hexdigest()[:32]
+
+
+def file_digest(file_obj):
+    """파일을 청크 단위로 읽어 SHA-256 을 구합니다. (큰 파일도 메모리에 올리지 않음)"""
+    sha = hashlib.sha256()
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    chunks = file_obj.chunks() if hasattr(file_obj, 'chunks') else iter(lambda: file_obj.read(64 * 1024), b'')
+    for chunk in chunks:
+        sha.update(chunk)
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    return sha.hexdigest()
+
+
+class ContentHashStorage(FileSystemStorage):
+
+    def url(self, name):
+        url = super().url(name)
+        return f"{url}?sig={media_signature(name)}" if name else url
+
+    def _blob_model(self):
+        return apps.get_model('sales', 'MediaBlob')  # models.py 가 이 모듈을 임포트하므로 지연 조회
+
+    def acquire(self, name):
+        """
+        저장된 blob 의 참조를 하나 늘립니다. 처음 보는 내용이면 행을 만듭니다.
+        참조하는 행이 커밋된 뒤(on_commit)에 부르므로 롤백된 저장은 참조 수에 남지 않습니다.
+        """
+        if not is_hashed_name(name):
+            return
+        MediaBlob = self._blob_model()
+        digest = os.path.splitext(os.path.basename(name))[0]
+        if MediaBlob.objects.filter(sha256=digest).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(sha256=digest, name=name, size=self.size(name) if self.exists(name) else 0, refcount=1)
+        except IntegrityError:  # 동시에 같은 파일이 커밋된 경우
+            MediaBlob.objects.filter(sha256=digest).update(refcount=F('refcount') + 1)
+
+    def write_blob(self, target, content):
+        """해시 이름으로 파일을 한 번만 씁니다. (이미 있으면 그대로 둠)"""
+        if self.exists(target):
+            return
+        saved = super()._save(target, content)
+        if saved != target:  # 다른 프로세스가 같은 내용을 먼저 썼음 - 중복 사본 제거
+            self.delete(saved)
+
+    def _save(self, name, content):
+        digest = file_digest(content)
+        MediaBlob = self._blob_model()
+        existing = MediaBlob.objects.filter(sha256=digest).values_list('name', flat=True).first()
+        target = existing or hashed_name(digest, name)
+        self.write_blob(target, content)
+        return target  # 참조 수는 행이 커밋될 때 acquire() 로 (models.track_image_reference)
+
+    def release(self, name):
+        """
+        참조 하나를 내려놓습니다. 마지막 참조였으면 파일까지 지웁니다.
+        (blob 으로 관리되지 않는 예전 파일은 참조가 하나뿐이므로 바로 삭제)
+        반환: 실제 파일을 지웠는지
+        """
+        if not name:
+            return False
+        MediaBlob = self._blob_model()
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.refcount > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') - 1)
+                return False
+            if blob is not None:
+                blob.delete()
+        if self.exists(name):
+            self.delete(name)
+            print(f"✅ 파일 삭제 완료: {self.path(name)}")
+            return True
+        return False
+
+
+media_storage = ContentHashStorage()
+
+
+def get_media_storage():
+    return media_storage
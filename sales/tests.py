@@ -1,3 +1,166 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from . import views
+from .inbound_sms import drain_inbound_queue, enqueue_inbound_sms
+from .ingest import register_lead, upsert_customer
+from .models import Customer, SMSLog, StatusTransition, User
+from .sms_status import drain_status_queue, enqueue_status_report
+
+
+def inbound_webhook(phone, message_id, message='문의드립니다', device_id='dev-1'):
+    return {'deviceId': device_id, 'event': 'sms:received',
+            'payload': {'messageId': message_id, 'phoneNumber': phone, 'message': message}}
+
+
+def status_webhook(message_id, event, device_id='dev-1'):
+    return {'deviceId': device_id, 'event': event, 'payload': {'messageId': message_id}}
+
+
+# ==============================================================================
+# 🔁 고객 upsert (created 플래그)
+# ==============================================================================
+class UpsertCustomerTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+
+    def test_first_call_creates_and_repeat_returns_existing(self):
+        first = upsert_customer('010-1234-5678', platform='당근', name='신규문의', owner_id=self.agent.id, status='미통건')
+        second = upsert_customer('01012345678', platform='당근', name='다른이름', owner_id=None, status='부재')
+
+        self.assertTrue(first[2])
+        self.assertEqual(second, (first[0], self.agent.id, False))
+        customer = Customer.objects.get(id=first[0])
+        self.assertEqual((customer.name, customer.status, customer.dedupe_key), ('신규문의', '미통건', '01012345678'))
+        # 상태 이력 시작점은 처음 생성할 때 한 번만
+        self.assertEqual(StatusTransition.objects.filter(customer_id=customer.id).count(), 1)
+
+    def test_lead_capture_reports_created_flag(self):
+        payload = json.dumps({'phone': '01055556666', 'agent_id': self.agent.id})
+        first = self.client.post('/api/leads/capture/', payload, content_type='application/json')
+        second = self.client.post('/api/leads/capture/', payload, content_type='application/json')
+
+        self.assertEqual((first.status_code, first.json()['created']), (201, True))
+        self.assertEqual((second.status_code, second.json()['created']), (201, False))
+        self.assertEqual(first.json()['customer_id'], second.json()['customer_id'])
+
+    @override_settings(LEAD_ASSIGNMENT={'STRATEGY': 'least_open'})
+    def test_existing_lead_keeps_owner_as_sender_without_picking(self):
+        other = User.objects.create_user(username='agent2', password='pw', role='AGENT')
+        customer_id, _, _ = upsert_customer('01055556666', platform='기타', owner_id=self.agent.id, status='재통')
+
+        with mock.patch('sales.ingest.pick_agent_for_lead') as pick, \
+                mock.patch.object(views, 'send_gateway_sms', return_value=(True, None)):
+            auto = register_lead('010-5555-6666')
+            response = self.client.post('/api/leads/capture/', json.dumps({
+                'phone': '01055556666', 'agent_id': other.id, 'message': '다시 문의드립니다',
+            }), content_type='application/json')
+
+        pick.assert_not_called()
+        self.assertEqual(auto, (customer_id, self.agent.id, False))
+        self.assertEqual(response.json()['created'], False)
+        self.assertEqual(SMSLog.objects.get(customer_id=customer_id).agent_id, self.agent.id)
+
+
+# ==============================================================================
+# 📥 수신 문자 (번호 매칭 / 중복 웹훅)
+# ==============================================================================
+@override_settings(INBOUND_SMS_AUTO_DRAIN=False)
+class InboundSMSTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.token = Token.objects.create(user=self.agent)
+
+    def test_customer_without_dedupe_key_receives_sms(self):
+        # 수동 등록 / 키 선점 경합에서 밀린 고객처럼 키가 없는 고객
+        customer = Customer.objects.create(name='수동', phone='01011112222', owner=self.agent, status='부재')
+        self.assertIsNone(customer.dedupe_key)
+
+        enqueue_inbound_sms(inbound_webhook('+821011112222', 'm-1'))
+        self.assertEqual(drain_inbound_queue(), {'saved': 1, 'ignored': 0, 'failed': 0})
+
+        customer.refresh_from_db()
+        self.assertEqual(SMSLog.objects.filter(customer=customer, direction='IN').count(), 1)
+        self.assertEqual((customer.status, customer.sms_unread_count), ('재통', 1))
+
+    def test_phone_changed_by_patch_receives_sms(self):
+        customer = Customer.objects.create(name='변경', phone='01033334444', owner=self.agent, status='부재')
+        response = self.client.patch(
+            f'/api/customers/{customer.id}/', json.dumps({'phone': '01077778888'}),
+            content_type='application/json', HTTP_AUTHORIZATION=f'Token {self.token.key}',
+        )
+        self.assertEqual(response.status_code, 200)
+        customer.refresh_from_db()
+        self.assertEqual(customer.dedupe_key, '01077778888')
+
+        enqueue_inbound_sms(inbound_webhook('01077778888', 'm-2'))
+        drain_inbound_queue()
+        self.assertEqual(SMSLog.objects.filter(customer=customer, direction='IN').count(), 1)
+
+    def test_duplicate_webhook_does_not_change_unread_count(self):
+        customer = Customer.objects.create(name='중복', phone='01055556666', owner=self.agent, status='재통')
+        enqueue_inbound_sms(inbound_webhook('01055556666', 'm-3'))
+        drain_inbound_queue()
+        customer.refresh_from_db()
+        self.assertEqual(customer.sms_unread_count, 1)
+
+        # 대기열을 거치지 않고 이미 저장된 메시지가 다시 들어온 경우 (대기열 도입 이전 기록 등)
+        SMSLog.objects.create(customer=customer, agent=self.agent, content='이전', direction='IN',
+                              status='RECEIVED', gateway_message_id='m-4', device_id='dev-1')
+        enqueue_inbound_sms(inbound_webhook('01055556666', 'm-3'))  # 같은 메시지 재전송
+        enqueue_inbound_sms(inbound_webhook('01055556666', 'm-4'))
+        drain_inbound_queue()
+
+        customer.refresh_from_db()
+        self.assertEqual(customer.sms_unread_count, 1)
+        self.assertEqual(SMSLog.objects.filter(customer=customer, direction='IN').count(), 2)
+
+
+# ==============================================================================
+# 📬 발송 상태는 앞으로만 (SUCCESS < SENT < DELIVERED/FAIL)
+# ==============================================================================
+@override_settings(INBOUND_SMS_AUTO_DRAIN=False)
+class SMSStatusOrderTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.customer = Customer.objects.create(name='발송', phone='01099990000', owner=self.agent)
+
+    def _log(self, status='SUCCESS'):
+        return SMSLog.objects.create(customer=self.customer, agent=self.agent, content='안내', direction='OUT',
+                                     status=status, gateway_message_id='out-1')
+
+    def test_late_sent_event_does_not_downgrade_delivered(self):
+        log = self._log()
+        enqueue_status_report(status_webhook('out-1', 'sms:delivered'))
+        drain_status_queue()
+        enqueue_status_report(status_webhook('out-1', 'sms:sent'))
+        drain_status_queue()
+
+        log.refresh_from_db()
+        self.assertEqual(log.status, 'DELIVERED')
+
+    def test_send_result_does_not_overwrite_status_webhook(self):
+        def deliver_while_sending(phone, text, config, message_id=None):
+            # 게이트웨이 응답을 기다리는 사이 발송 결과 웹훅이 먼저 처리된 경우
+            SMSLog.objects.filter(gateway_message_id=message_id).update(status='DELIVERED')
+            return True, message_id
+
+        with mock.patch.object(views, 'send_gateway_sms', deliver_while_sending):
+            response = self.client.post('/api/leads/capture/', json.dumps({
+                'phone': '01012120000', 'agent_id': self.agent.id, 'message': '안녕하세요',
+            }), content_type='application/json')
+
+        log = SMSLog.objects.get(customer_id=response.json()['customer_id'])
+        self.assertEqual(log.status, 'DELIVERED')
+
+    def test_send_result_is_recorded_while_pending(self):
+        with mock.patch.object(views, 'send_gateway_sms', return_value=(False, None)):
+            response = self.client.post('/api/leads/capture/', json.dumps({
+                'phone': '01012120001', 'agent_id': self.agent.id, 'message': '안녕하세요',
+            }), content_type='application/json')
+
+        log = SMSLog.objects.get(customer_id=response.json()['customer_id'])
+        self.assertEqual(log.status, 'FAIL')
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from .activity import mark_sms_read, recount_activity, record_logs, record_sms
+from .models import ConsultationLog, Customer, SMSLog, User
+
+
+# ==============================================================================
+# 📊 고객 활동 요약 (상담기록 수 / 안읽은 문자 / 최근 접촉)
+# ==============================================================================
+class ActivitySummaryTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.customer = Customer.objects.create(name='활동', phone='01011112222', owner=self.agent)
+
+    def test_counters_follow_records_and_recount_agrees(self):
+        ConsultationLog.objects.create(customer=self.customer, writer=self.agent, content='상담')
+        record_logs([self.customer.id])
+        for i in range(2):
+            SMSLog.objects.create(customer=self.customer, agent=self.agent, content='문의', direction='IN', status='RECEIVED')
+        record_sms([self.customer.id] * 2, 'IN')
+
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.log_count, self.customer.sms_unread_count), (1, 2))
+        self.assertEqual(recount_activity([self.customer.id]), 1)  # 원본 기록 시각으로만 맞춤
+
+        mark_sms_read(self.customer.id)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sms_unread_count, 0)
+        self.assertEqual(recount_activity([self.customer.id]), 0)
+
+    def test_recount_fixes_drifted_counters(self):
+        ConsultationLog.objects.create(customer=self.customer, writer=self.agent, content='상담')
+        Customer.objects.filter(id=self.customer.id).update(log_count=7)
+        self.assertEqual(recount_activity([self.customer.id]), 1)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.log_count, 1)
+        self.assertIsNotNone(self.customer.last_contact_at)
+
+
+class ActivityBackfillMigrationTests(TransactionTestCase):
+    """0039 마이그레이션이 기존 기록으로 활동 요약을 채우는지 (과거 모델 상태에서 실행)"""
+    before = [('sales', '0038_callrecord_timeline')]
+    after = [('sales', '0039_customer_activity')]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_backfill_counts_existing_records(self):
+        apps = self._migrate(self.before)
+        agent = apps.get_model('sales', 'User').objects.create(username='agent1', role='AGENT')
+        customer = apps.get_model('sales', 'Customer').objects.create(name='기존', phone='01011112222', owner_id=agent.id)
+        quiet = apps.get_model('sales', 'Customer').objects.create(name='기록 없음', phone='01033334444')
+        for content in ('첫 상담', '재상담'):
+            apps.get_model('sales', 'ConsultationLog').objects.create(customer_id=customer.id, writer_id=agent.id, content=content)
+        apps.get_model('sales', 'SMSLog').objects.create(
+            customer_id=customer.id, agent_id=agent.id, content='문의', direction='IN', status='RECEIVED')
+        call = apps.get_model('sales', 'CallRecord').objects.create(customer_id=customer.id, file_link='https://example.com/a.m4a')
+
+        apps = self._migrate(self.after)
+        rows = apps.get_model('sales', 'Customer').objects.in_bulk([customer.id, quiet.id])
+        backfilled = rows[customer.id]
+        self.assertEqual(backfilled.log_count, 2)
+        self.assertEqual(backfilled.sms_unread_count, 0)  # 기존 수신 문자는 읽은 것으로
+        self.assertIsNotNone(backfilled.last_sms_at)
+        self.assertEqual(backfilled.last_contact_at, call.created_at)  # 가장 나중 기록
+        self.assertEqual((rows[quiet.id].log_count, rows[quiet.id].last_contact_at), (0, None))
@@ -0,0 +1,132 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from . import allocation
+from .allocation import open_lead_counts, pick_agent_for_lead, plan_distribution
+from .ingest import register_lead
+from .models import AgentLeadLoad, Customer, StatusTransition, User
+from .status_history import update_status
+
+
+# ==============================================================================
+# ⚖️ 가중치 라운드로빈 일괄 분배
+# ==============================================================================
+class DistributionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.a1, self.a2 = (User.objects.create_user(username=f'agent{i}', password='pw', role='AGENT').id for i in (1, 2))
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.admin).key}'}
+
+    def _distribute(self, payload):
+        return self.client.post('/api/customers/distribute/', json.dumps(payload), content_type='application/json', **self.auth)
+
+    def test_plan_follows_weights_existing_load_and_caps(self):
+        plan, leftover = plan_distribution(range(6), [{'id': self.a1, 'weight': 2}, {'id': self.a2}], {self.a1: 1})
+        self.assertEqual((len(plan[self.a1]), len(plan[self.a2]), leftover), (4, 2, []))
+
+        plan, leftover = plan_distribution(range(5), [{'id': self.a1, 'cap': 1}, {'id': self.a2, 'cap': 2}], {})
+        self.assertEqual((plan, leftover), ({self.a1: [0], self.a2: [1, 2]}, [3, 4]))
+
+    def test_distribute_filtered_customers(self):
+        unowned = [Customer.objects.create(name='신규', phone=f'0102222000{i}', status='미통건') for i in range(3)]
+        Customer.objects.create(name='배정됨', phone='01022229999', status='미통건', owner_id=self.a1)
+
+        response = self._distribute({'filter': {'status': '미통건', 'owner': 'none'},
+                                     'agents': [{'id': self.a1}, {'id': self.a2}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['assigned'], {str(self.a1): 1, str(self.a2): 2})  # a1 은 기존 미결 1건
+
+        rows = Customer.objects.filter(id__in=[c.id for c in unowned])
+        self.assertEqual(set(rows.values_list('status', flat=True)), {'재통'})
+        self.assertFalse(rows.filter(owner__isnull=True).exists())
+        self.assertEqual(StatusTransition.objects.filter(customer_id__in=[c.id for c in unowned]).count(), 3)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self._distribute({'customer_ids': [1], 'agents': []}).status_code, 400)
+        self.assertEqual(self._distribute({'customer_ids': [1], 'agents': [{'id': 999}]}).status_code, 400)
+        self.assertEqual(self._distribute({'agents': [{'id': self.a1}]}).status_code, 400)
+        self.assertEqual(self._distribute({'filter': {'nope': 1}, 'agents': [{'id': self.a1}]}).status_code, 400)
+
+
+# ==============================================================================
+# 🤖 신규 유입 리드 자동 배정 (상담사별 카운터)
+# ==============================================================================
+@override_settings(LEAD_ASSIGNMENT={'STRATEGY': 'least_open'})
+class LeadAssignmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.agents = [User.objects.create_user(username=f'agent{i}', password='pw', role='AGENT') for i in range(1, 4)]
+        self.a1, self.a2, self.a3 = (a.id for a in self.agents)
+        self.token = Token.objects.create(user=self.admin)
+
+    def _open(self, owner_id, count, status='재통'):
+        for _ in range(count):
+            Customer.objects.create(name='기존', phone=f'0109{Customer.objects.count():07d}', owner_id=owner_id, status=status)
+
+    def _loads(self):
+        return dict(AgentLeadLoad.objects.values_list('user_id', 'open_leads'))
+
+    def test_least_open_balances_with_existing_leads(self):
+        self._open(self.a1, 2)
+        self._open(self.a2, 1)
+        owners = [register_lead(f'0101111000{i}')[1] for i in range(5)]
+        self.assertEqual(owners, [self.a3, self.a2, self.a3, self.a1, self.a2])
+        self.assertEqual(self._loads(), {self.a1: 3, self.a2: 3, self.a3: 2})
+
+    def test_pick_reads_counters_without_group_by(self):
+        register_lead('01011110000')  # 첫 배정에서 카운터 행 생성 (동기화)
+        with CaptureQueriesContext(connection) as ctx:
+            pick_agent_for_lead()
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()])
+
+    def test_concurrent_claim_is_retried(self):
+        pick_agent_for_lead()  # 카운터 행 생성 (a1 선점)
+        real = allocation._lead_loads
+        raced = []
+
+        def read_then_lose_race(agent_ids):
+            loads = real(agent_ids)
+            if not raced:  # 읽은 직후 다른 워커가 a2 를 먼저 선점
+                raced.append(True)
+                AgentLeadLoad.objects.filter(user_id=self.a2).update(open_leads=F('open_leads') + 1)
+            return loads
+
+        with mock.patch.object(allocation, '_lead_loads', read_then_lose_race):
+            picked = pick_agent_for_lead()
+        self.assertEqual(picked, self.a3)
+        self.assertEqual(self._loads(), {self.a1: 1, self.a2: 1, self.a3: 1})
+
+    def test_closing_and_reassigning_moves_counters(self):
+        self._open(self.a1, 3)
+        register_lead('01011110000')  # 동기화 (a2 선점)
+        customers = list(Customer.objects.filter(owner_id=self.a1).order_by('id'))
+        auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+
+        update_status(Customer.objects.filter(id=customers[0].id), '실패')  # 종결
+        self.client.post(f'/api/customers/{customers[1].id}/assign/', {'user_id': self.a3}, **auth)  # 재배정
+        self.client.patch('/api/customers/bulk/', json.dumps({'ids': [customers[2].id], 'changes': {'owner': self.a2}}),
+                          content_type='application/json', **auth)
+        Customer.objects.filter(owner_id=self.a2).first().delete()
+
+        self.assertEqual(self._loads(), {a: open_lead_counts().get(a, 0) for a in (self.a1, self.a2, self.a3)})
+        self.assertEqual(self._loads(), {self.a1: 0, self.a2: 1, self.a3: 1})
+
+    def test_existing_number_returns_counter(self):
+        first = register_lead('01011110000')
+        second = register_lead('010-1111-0000')
+        self.assertFalse(second[2])
+        self.assertEqual(sum(self._loads().values()), 1)
+
+    @override_settings(LEAD_ASSIGNMENT={'STRATEGY': 'round_robin'})
+    def test_round_robin_takes_turns(self):
+        self._open(self.a1, 4)  # 미결 건수와 무관하게 차례대로
+        owners = [register_lead(f'0101111000{i}')[1] for i in range(6)]
+        self.assertEqual(owners, [self.a1, self.a2, self.a3] * 2)
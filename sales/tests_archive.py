@@ -0,0 +1,73 @@
+import datetime
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .archive import archive_candidates, archive_customers, archive_cutoff
+from .models import ArchivedCustomer, ConsultationLog, Customer, SMSLog, StatusTransition, User
+from .status_history import record_transitions
+
+
+# ==============================================================================
+# 🧊 종료 고객 보관
+# ==============================================================================
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.cutoff = archive_cutoff()
+        self.long_ago = timezone.now() - datetime.timedelta(days=500)
+
+    def _old_customer(self, **fields):
+        """마지막 변경/업로드/상태 이력이 모두 500일 전인 종료 고객"""
+        defaults = {'name': '종료', 'phone': '01011112222', 'owner': self.agent, 'status': '실패'}
+        customer = Customer.objects.create(**{**defaults, **fields})
+        record_transitions([(customer.id, None, customer.status)], at=self.long_ago)
+        Customer.objects.filter(id=customer.id).update(updated_at=self.long_ago, upload_date=self.long_ago.date())
+        return customer
+
+    def test_old_terminal_customer_is_candidate(self):
+        customer = self._old_customer()
+        active = self._old_customer(phone='01033334444', status='재통')
+        ids = set(archive_candidates(self.cutoff).values_list('id', flat=True))
+        self.assertIn(customer.id, ids)
+        self.assertNotIn(active.id, ids)
+
+    def test_recent_activity_that_bypasses_auto_now_keeps_customer(self):
+        # updated_at 은 오래됐지만 queryset.update / CASE UPDATE / F() 로 바뀐 최근 활동이 있는 고객들
+        recent_contact = self._old_customer(phone='01000000001')
+        Customer.objects.filter(id=recent_contact.id).update(last_contact_at=timezone.now())
+        recent_settlement = self._old_customer(phone='01000000002', status='설치완료', settlement_status='정산완료')
+        Customer.objects.filter(id=recent_settlement.id).update(settlement_complete_date=datetime.date.today())
+        recent_transition = self._old_customer(phone='01000000003')
+        record_transitions([(recent_transition.id, '부재', '실패')])
+
+        ids = set(archive_candidates(self.cutoff).values_list('id', flat=True))
+        self.assertEqual(ids & {recent_contact.id, recent_settlement.id, recent_transition.id}, set())
+
+    def test_archive_moves_history_and_deletes_original(self):
+        customer = self._old_customer()
+        ConsultationLog.objects.create(customer=customer, writer=self.agent, content='마지막 상담')
+        SMSLog.objects.create(customer=customer, agent=self.agent, content='안녕하세요', direction='OUT', status='SENT')
+        Customer.objects.filter(id=customer.id).update(updated_at=self.long_ago, last_contact_at=None, last_sms_at=None)
+
+        self.assertEqual(archive_customers(self.cutoff), 1)
+
+        self.assertFalse(Customer.objects.filter(id=customer.id).exists())
+        self.assertFalse(StatusTransition.objects.filter(customer_id=customer.id).exists())
+        archived = ArchivedCustomer.objects.get(customer_id=customer.id)
+        self.assertEqual([log['content'] for log in archived.logs], ['마지막 상담'])
+        self.assertEqual([sms['content'] for sms in archived.sms], ['안녕하세요'])
+        self.assertEqual([h['to_status__name'] for h in archived.history], ['실패'])
+
+        token = Token.objects.create(user=self.agent)
+        response = self.client.get(f'/api/archive/customers/{customer.id}/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(REPORTING_WINDOW_DAYS=365)
+    def test_threshold_must_exceed_reporting_window(self):
+        with self.assertRaises(ValueError):
+            archive_cutoff(200)
+        with self.assertRaises(CommandError):
+            call_command('archive_customers', '--older-than-days', '365', '--dry-run')
@@ -0,0 +1,68 @@
+import json
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import ConsultationLog, Customer, StatusTransition, User
+
+
+# ==============================================================================
+# ✏️ 고객 일괄 변경 (PATCH /api/customers/bulk/)
+# ==============================================================================
+class BulkPatchTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.other = User.objects.create_user(username='agent2', password='pw', role='AGENT')
+        self.customers = [
+            Customer.objects.create(name=f'일괄{i}', phone=f'0103333000{i}', status='재통', owner=self.agent)
+            for i in range(3)
+        ]
+
+    def _patch(self, payload, user=None):
+        token = Token.objects.get_or_create(user=user or self.admin)[0]
+        return self.client.patch('/api/customers/bulk/', json.dumps(payload), content_type='application/json',
+                                 HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_per_item_changes_skip_unchanged_rows(self):
+        first, second, third = self.customers
+        response = self._patch({'items': [
+            {'id': first.id, 'changes': {'status': '가망'}},
+            {'id': second.id, 'changes': {'status': '재통'}},  # 그대로
+            {'id': third.id, 'changes': {'client': '본사', 'owner': self.other.id}},
+            {'id': 999999, 'changes': {'status': '가망'}},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((sorted(body['ids']), body['not_found']), (sorted([first.id, third.id]), [999999]))
+
+        third.refresh_from_db()
+        self.assertEqual((third.client, third.owner_id), ('본사', self.other.id))
+        self.assertEqual(list(ConsultationLog.objects.values_list('customer_id', flat=True).order_by('customer_id')),
+                         [first.id, third.id])
+        self.assertEqual(list(StatusTransition.objects.values_list('customer_id', 'to_status__name')), [(first.id, '가망')])
+        first.refresh_from_db()
+        self.assertEqual(first.log_count, 1)
+
+    def test_ids_and_filter_apply_one_change(self):
+        ids = [c.id for c in self.customers[:2]]
+        self.assertEqual(self._patch({'ids': ids, 'changes': {'status': '부재'}}).json()['updated'], 2)
+        response = self._patch({'filter': {'status': '부재'}, 'changes': {'settlement_memo': '확인'}})
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(Customer.objects.filter(settlement_memo='확인').count(), 2)
+
+    def test_agent_cannot_touch_other_agents_customers(self):
+        theirs = Customer.objects.create(name='남의 고객', phone='01033339999', status='재통', owner=self.other)
+        response = self._patch({'ids': [theirs.id, self.customers[0].id], 'changes': {'status': '가망'}}, user=self.agent)
+        self.assertEqual(response.json()['ids'], [self.customers[0].id])
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.status, '재통')
+
+    def test_invalid_change_is_rejected_before_any_update(self):
+        response = self._patch({'items': [
+            {'id': self.customers[0].id, 'changes': {'status': '가망'}},
+            {'id': self.customers[1].id, 'changes': {'owner': 999999}},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Customer.objects.filter(status='가망').exists())
+        self.assertEqual(self._patch({'ids': [self.customers[0].id], 'changes': {}}).status_code, 400)
@@ -0,0 +1,57 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import Customer, User
+
+
+# ==============================================================================
+# 📞 재통화 대기열 (GET /api/customers/callbacks/)
+# ==============================================================================
+NOW = datetime.datetime(2026, 3, 2, 10, 30)
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class CallbackQueueTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.other = User.objects.create_user(username='agent2', password='pw', role='AGENT')
+        schedule = [
+            ('지남', self.agent, '재통', NOW.replace(hour=9, minute=0)),
+            ('이번 시간', self.agent, '가망', NOW.replace(minute=45)),
+            ('오후', self.agent, '재통', NOW.replace(hour=14, minute=20)),
+            ('저녁', self.agent, '재통', NOW.replace(hour=20, minute=30)),
+            ('내일', self.agent, '재통', NOW + datetime.timedelta(days=1)),
+            ('종결', self.agent, '실패', NOW.replace(hour=14)),
+            ('남의 고객', self.other, '재통', NOW.replace(hour=14)),
+        ]
+        self.ids = {}
+        for i, (name, owner, status, at) in enumerate(schedule):
+            self.ids[name] = Customer.objects.create(
+                name=name, phone=f'0105555000{i}', owner=owner, status=status, callback_schedule=at).id
+
+    def _get(self, query='', user=None):
+        token = Token.objects.get_or_create(user=user or self.agent)[0]
+        return self.client.get(f'/api/customers/callbacks/{query}', HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_counts_per_bucket(self, now):
+        body = self._get().json()
+        self.assertEqual({k: v for k, v in body['counts'].items() if v}, {'overdue': 1, 'now': 1, '14': 1, 'later': 2})
+        self.assertNotIn('10', body['counts'])  # 이미 지난 시간대는 구간으로 만들지 않음
+        self.assertEqual(body['total'], 5)
+        self.assertEqual([row['name'] for row in body['results']], ['지남', '이번 시간', '오후', '저녁', '내일'])
+
+    def test_bucket_and_paging(self, now):
+        later = self._get('?bucket=later&page=2&page_size=1').json()
+        self.assertEqual((later['total'], [row['id'] for row in later['results']]), (2, [self.ids['내일']]))
+        self.assertEqual(self._get('?bucket=14').json()['results'][0]['callback_schedule'], '2026-03-02 14:20')
+        self.assertEqual(self._get('?bucket=nope').status_code, 400)
+        self.assertEqual(self._get('?page=x').status_code, 400)
+
+    def test_admin_sees_all_or_one_owner(self, now):
+        self.assertEqual(self._get(user=self.admin).json()['total'], 6)
+        only_other = self._get(f'?owner={self.other.id}', user=self.admin).json()
+        self.assertEqual([row['id'] for row in only_other['results']], [self.ids['남의 고객']])
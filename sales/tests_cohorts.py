@@ -0,0 +1,63 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .cohorts import build_cohorts
+from .models import Customer, User
+
+
+# ==============================================================================
+# 🧮 유입 코호트 (업로드 월 × 플랫폼 → 경과 기간별 누적 설치율)
+# ==============================================================================
+class CohortTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        leads = [
+            # (플랫폼, 업로드일, 설치일, 상태)
+            ('당근', '2025-01-10', '2025-01-20', '설치완료'),  # 당월 설치
+            ('당근', '2025-01-15', '2025-03-05', '설치완료'),  # 2개월 뒤 설치
+            ('당근', '2025-01-20', None, '재통'),
+            ('당근', '2025-01-25', None, '접수취소'),
+            ('토스', '2025-02-03', '2025-02-10', '설치완료'),
+            ('토스', '2024-12-01', '2024-12-02', '설치완료'),  # 기간 밖
+        ]
+        for i, (platform, upload, installed, status) in enumerate(leads):
+            Customer.objects.create(
+                name=f'코호트{i}', phone=f'0107777000{i}', platform=platform, status=status, owner=self.agent,
+                upload_date=datetime.date.fromisoformat(upload),
+                installed_date=datetime.date.fromisoformat(installed) if installed else None,
+                agent_policy=50, support_amt=10, ad_cost=3000,
+            )
+        self.options = {'start_date': datetime.date(2025, 1, 1), 'end_date': datetime.date(2025, 2, 28), 'max_age': 3}
+
+    def test_monthly_cohorts_by_platform(self):
+        result = build_cohorts('month', 'platform', **self.options)
+        self.assertEqual(result['ages'], [0, 1, 2, 3])
+        jan, feb = result['cohorts']
+        self.assertEqual((jan['cohort'], jan['group'], jan['leads'], jan['installed'], jan['canceled']),
+                         ('2025-01', '당근', 4, 2, 1))
+        self.assertEqual(jan['installed_rate'], [25.0, 25.0, 50.0, 50.0])
+        self.assertEqual((jan['installed_revenue'], jan['ad_cost']), (2 * 40 * 10000, 4 * 3000))
+        self.assertEqual((feb['cohort'], feb['group'], feb['installed_rate']), ('2025-02', '토스', [100.0] * 4))
+
+    def test_weekly_cohorts_by_owner(self):
+        result = build_cohorts('week', 'owner', **self.options)
+        self.assertEqual({c['group'] for c in result['cohorts']}, {'agent1'})
+        self.assertEqual(result['cohorts'][0]['cohort'], '2025-01-06')  # 월요일 시작
+        self.assertEqual(sum(c['leads'] for c in result['cohorts']), 5)
+
+    def test_endpoint_is_admin_only_and_cached(self):
+        url = '/api/stats/cohorts/?period=month&start_date=2025-01-01&end_date=2025-02-28&max_age=3'
+        agent_token = Token.objects.create(user=self.agent)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f'Token {agent_token.key}').status_code, 403)
+
+        auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.admin).key}'}
+        first = self.client.get(url, **auth).json()
+        second = self.client.get(url, **auth).json()
+        self.assertEqual((first['cached'], second['cached']), (False, True))
+        self.assertEqual(first['cohorts'], second['cohorts'])
+        self.assertEqual(self.client.get(url.replace('month', 'year'), **auth).status_code, 400)
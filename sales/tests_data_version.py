@@ -0,0 +1,53 @@
+import json
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from .data_version import VERSION_NAME, current_version
+from .middleware import DataVersionMiddleware
+from .models import Customer, DataVersion, User
+
+
+# ==============================================================================
+# 🔢 고객 데이터 버전 (저장 시그널은 요청당 한 번)
+# ==============================================================================
+class DataVersionTests(TransactionTestCase):
+    # TestCase 는 테스트 전체를 트랜잭션으로 감싸 bump_version() 의 '이 커밋에서 이미 올림' 표시가 계속 남으므로 실제 커밋으로 확인
+    def setUp(self):
+        DataVersion.objects.get_or_create(name=VERSION_NAME)  # 테이블 비우기로 마이그레이션이 만든 행도 지워짐
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+
+    def test_saves_in_one_request_bump_once(self):
+        def view(request):
+            for i in range(3):  # 트랜잭션 없이 따로 저장
+                Customer.objects.create(name=f'고객{i}', phone=f'0101111000{i}', owner=self.agent)
+            return HttpResponse()
+
+        before = current_version()
+        with CaptureQueriesContext(connection) as ctx:
+            DataVersionMiddleware(view)(RequestFactory().get('/'))
+        bumps = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "sales_dataversion"')]
+        self.assertEqual(len(bumps), 1)
+        self.assertEqual(current_version(), before + 1)
+
+    def test_request_without_changes_does_not_bump(self):
+        before = current_version()
+        DataVersionMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+        self.assertEqual(current_version(), before)
+
+    def test_save_outside_request_bumps_immediately(self):
+        before = current_version()
+        Customer.objects.create(name='명령', phone='01022223333', owner=self.agent)
+        self.assertEqual(current_version(), before + 1)
+
+    def test_patch_request_invalidates(self):
+        customer = Customer.objects.create(name='수정', phone='01033334444', owner=self.agent)
+        token = Token.objects.create(user=self.agent)
+        before = current_version()
+        response = self.client.patch(f'/api/customers/{customer.id}/', json.dumps({'name': '수정됨'}),
+                                     content_type='application/json', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(current_version(), before + 1)
@@ -0,0 +1,56 @@
+import csv
+import io
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import Customer, User
+
+
+# ==============================================================================
+# 📤 고객 / 정산 / 통계 내보내기 (CSV 스트리밍, XLSX)
+# ==============================================================================
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        other = User.objects.create_user(username='agent2', password='pw', role='AGENT')
+        Customer.objects.create(name='설치 고객', phone='01044440001', platform='당근', status='설치완료', owner=self.agent)
+        Customer.objects.create(name='진행 고객', phone='01044440002', platform='토스', status='재통', owner=self.agent)
+        Customer.objects.create(name='남의 고객', phone='01044440003', platform='당근', status='재통', owner=other)
+
+    def _get(self, url, user=None):
+        token = Token.objects.get_or_create(user=user or self.admin)[0]
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def _csv(self, response):
+        self.assertTrue(response.streaming)
+        text = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(text.startswith('\ufeff'))  # 엑셀 한글 깨짐 방지
+        return list(csv.reader(io.StringIO(text[1:])))
+
+    def test_customer_csv_streams_filtered_rows(self):
+        response = self._get('/api/customers/export/?platform=당근')
+        self.assertIn("filename*=UTF-8''customers_", response['Content-Disposition'])
+        rows = self._csv(response)
+        self.assertEqual(rows[0][:3], ['ID', '고객명', '전화번호'])
+        self.assertEqual([row[1] for row in rows[1:]], ['남의 고객', '설치 고객'])  # id 역순
+
+    def test_agent_export_is_scoped_to_own_customers(self):
+        rows = self._csv(self._get('/api/customers/export/', user=self.agent))
+        self.assertEqual({row[1] for row in rows[1:]}, {'설치 고객', '진행 고객'})
+
+    def test_settlement_xlsx_has_target_statuses_only(self):
+        from openpyxl import load_workbook
+
+        response = self._get('/api/customers/export_settlements/?file_format=xlsx')
+        self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)['정산']
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:2], ('ID', '고객명'))
+        self.assertEqual([row[1] for row in rows[1:]], ['설치 고객'])
+
+    def test_stats_export(self):
+        rows = self._csv(self._get('/api/stats/export/'))
+        self.assertEqual(rows[0][:3], ['상담사', '플랫폼', 'DB'])
+        self.assertIn('agent1', {row[0] for row in rows[1:]})
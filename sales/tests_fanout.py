@@ -0,0 +1,74 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from .fanout import run_fanout
+from .models import Notice, PushDelivery, TodoReceipt, TodoTask, User
+from .push import PushResult
+from .todo_inbox import create_receipts
+
+
+class FakePushClient:
+    """failing 에 든 토큰만 실패로 돌려주는 가짜 클라이언트"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def send_multicast(self, tokens, title, body, data=None):
+        self.calls.append((list(tokens), title, data))
+        return [PushResult(False, 'UNREGISTERED') if token in self.failing else PushResult(True) for token in tokens]
+
+
+# ==============================================================================
+# 📣 업무지시 / 공지 푸시 팬아웃
+# ==============================================================================
+class PushFanoutTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.agents = [
+            User.objects.create_user(username=f'agent{i}', password='pw', role='AGENT', fcm_token=token)
+            for i, token in enumerate(['token-0', 'token-1', ''])
+        ]
+
+    def _statuses(self, kind, object_id):
+        return dict(PushDelivery.objects.filter(kind=kind, object_id=object_id).values_list('recipient_id', 'status'))
+
+    def test_global_todo_is_sent_once_per_recipient(self):
+        task = TodoTask.objects.create(sender=self.admin, content='전체 공지 확인', is_global=True)
+        create_receipts(task)
+        client = FakePushClient(failing={'token-1'})
+
+        self.assertEqual(run_fanout('todo', task.id, client), 1)
+        self.assertEqual(client.calls[0][0], ['token-0', 'token-1'])  # 한 번의 multicast
+        a0, a1, a2 = (a.id for a in self.agents)
+        self.assertEqual(self._statuses('todo', task.id), {a0: 'SENT', a1: 'FAILED', a2: 'NO_TOKEN'})
+        delivered = TodoReceipt.objects.filter(task=task, delivered_at__isnull=False)
+        self.assertEqual(list(delivered.values_list('user_id', flat=True)), [a0])
+
+        self.assertEqual(run_fanout('todo', task.id, client), 0)  # 이미 처리된 수신자는 다시 보내지 않음
+        self.assertEqual(len(client.calls), 1)
+
+    def test_only_important_notices_are_pushed(self):
+        client = FakePushClient()
+        plain = Notice.objects.create(title='일반', content='내용', writer=self.admin)
+        important = Notice.objects.create(title='중요', content='내용', writer=self.admin, is_important=True)
+        self.assertEqual(run_fanout('notice', plain.id, client), 0)
+        self.assertEqual(run_fanout('notice', important.id, client), 2)
+        self.assertEqual(client.calls[0][2], {'type': 'notice', 'id': important.id})
+
+    @override_settings(PUSH_FANOUT_SYNC=True)
+    def test_fanout_starts_after_commit(self):
+        client = FakePushClient()
+        token = Token.objects.create(user=self.admin)
+        with mock.patch('sales.push._client', client):
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post('/api/todos/', json.dumps({'content': '확인', 'assigned_to': self.agents[0].id}),
+                                            content_type='application/json', HTTP_AUTHORIZATION=f'Token {token.key}')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(client.calls, [])  # 커밋 전에는 발송하지 않음
+            for callback in callbacks:
+                callback()
+        self.assertEqual(client.calls[0][0], ['token-0'])
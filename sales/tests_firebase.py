@@ -0,0 +1,39 @@
+import json
+import os
+from unittest import mock
+
+import firebase_admin
+from django.test import SimpleTestCase
+
+from . import firebase
+
+
+# ==============================================================================
+# 🔥 Firebase 지연 초기화 (성공했을 때만 완료 표시)
+# ==============================================================================
+@mock.patch.dict(os.environ, {'FIREBASE_CONFIG': json.dumps({'type': 'service_account'})})
+@mock.patch.object(firebase_admin.credentials, 'Certificate', return_value=object())
+@mock.patch.object(firebase_admin, '_apps', {})
+class FirebaseInitTests(SimpleTestCase):
+    def setUp(self):
+        firebase._app, firebase._initialized, firebase._retry_at = None, False, 0.0
+        self.addCleanup(setattr, firebase, '_initialized', False)
+        self.addCleanup(setattr, firebase, '_app', None)
+
+    def test_transient_failure_is_retried(self, certificate):
+        app = object()
+        with mock.patch.object(firebase_admin, 'initialize_app', side_effect=[OSError('네트워크'), app]) as initialize:
+            self.assertIsNone(firebase.get_firebase_app())
+            self.assertIsNone(firebase.get_firebase_app())  # 재시도 대기 중에는 다시 부르지 않음
+            self.assertEqual(initialize.call_count, 1)
+
+            firebase._retry_at = 0.0  # 대기 시간이 지난 것으로
+            self.assertIs(firebase.get_firebase_app(), app)
+            self.assertIs(firebase.get_firebase_app(), app)
+        self.assertEqual(initialize.call_count, 2)
+
+    def test_missing_credentials_is_not_final(self, certificate):
+        with mock.patch.dict(os.environ, {'FIREBASE_CONFIG': ''}), \
+                mock.patch.object(firebase.settings, 'FIREBASE_CREDENTIALS_PATH', '/nonexistent/firebase.json'):
+            self.assertIsNone(firebase.get_firebase_app())
+        self.assertFalse(firebase._initialized)
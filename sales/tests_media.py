@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from .models import MediaBlob, PolicyImage, User
+from .storage import file_digest, hashed_name, media_storage
+
+
+# ==============================================================================
+# 🗂️ 내용 해시 미디어 저장소 (참조 수는 커밋 때만)
+# ==============================================================================
+class MediaTestMixin:
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _refcount(self, name):
+        return MediaBlob.objects.filter(name=name).values_list('refcount', flat=True).first()
+
+
+class MediaRefcountTests(MediaTestMixin, TestCase):
+    def _upload(self, content=b'policy-v1', name='policy.png'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return PolicyImage.objects.create(platform='KT', image=SimpleUploadedFile(name, content))
+
+    def test_same_content_is_stored_once(self):
+        first, second = self._upload(), self._upload(name='copy.png')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(self._refcount(first.image.name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self._refcount(second.image.name), 1)
+        self.assertTrue(media_storage.exists(second.image.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PolicyImage.objects.get(id=second.id).delete()
+        self.assertIsNone(self._refcount(second.image.name))
+        self.assertFalse(media_storage.exists(second.image.name))
+
+    def test_replacing_image_releases_old_file(self):
+        image = self._upload()
+        old_name = image.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image = PolicyImage.objects.get(id=image.id)
+            image.image = SimpleUploadedFile('policy.png', b'policy-v2')
+            image.save()
+        self.assertNotEqual(image.image.name, old_name)
+        self.assertIsNone(self._refcount(old_name))
+        self.assertFalse(media_storage.exists(old_name))
+        self.assertEqual(self._refcount(image.image.name), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.platform = 'SK'
+            image.save()  # 이미지가 그대로면 참조도 그대로
+        self.assertEqual(self._refcount(image.image.name), 1)
+
+
+class MediaRollbackTests(MediaTestMixin, TransactionTestCase):
+    def test_failed_create_takes_no_reference(self):
+        kept = PolicyImage.objects.create(platform='KT', image=SimpleUploadedFile('policy.png', b'policy-v1'))
+        with self.assertRaises(IntegrityError):  # 파일은 저장됐지만 행 INSERT 가 실패
+            PolicyImage.objects.create(platform=None, image=SimpleUploadedFile('again.png', b'policy-v1'))
+        self.assertEqual(self._refcount(kept.image.name), 1)
+
+    def test_dedupe_media_sweeps_unreferenced_blobs(self):
+        kept = PolicyImage.objects.create(platform='KT', image=SimpleUploadedFile('policy.png', b'policy-v1'))
+        orphan = hashed_name(file_digest(ContentFile(b'rolled-back')), 'lost.png')
+        media_storage.write_blob(orphan, ContentFile(b'rolled-back'))
+        for name in (kept.image.name, orphan):
+            os.utime(media_storage.path(name), (0, 0))  # 유예 시간이 지난 파일
+
+        call_command('dedupe_media', stdout=StringIO())
+        self.assertFalse(media_storage.exists(orphan))
+        self.assertTrue(media_storage.exists(kept.image.name))
+
+
+# ==============================================================================
+# 🖼️ 미디어 서빙 (서명 URL / Range / 조건부 요청 / 프론트 서버 위임)
+# ==============================================================================
+class MediaServingTests(MediaTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.image = PolicyImage.objects.create(platform='KT', image=SimpleUploadedFile('policy.png', b'0123456789'))
+        self.url = self.image.image.url  # /media/blobs/..?sig=...
+        self.path = self.url.split('?')[0]
+
+    def test_signed_url_or_login_is_required(self):
+        self.assertEqual(self.client.get(self.path).status_code, 403)
+        self.assertEqual(self.client.get(f'{self.path}?sig=forged').status_code, 403)
+
+        response = self.client.get(self.url)
+        self.assertEqual((response.status_code, b''.join(response.streaming_content)), (200, b'0123456789'))
+        self.assertEqual(response['Cache-Control'], 'private, max-age=31536000, immutable')
+        self.assertEqual(response['ETag'], f'"{os.path.splitext(os.path.basename(self.image.image.name))[0]}"')  # sha256
+
+        user = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        token = Token.objects.create(user=user)
+        self.assertEqual(self.client.get(self.path, HTTP_AUTHORIZATION=f'Token {token.key}').status_code, 200)
+
+    def test_range_and_conditional_requests(self):
+        partial = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual((partial['Content-Range'], partial['Content-Length']), ('bytes 2-5/10', '4'))
+        self.assertEqual(b''.join(partial.streaming_content), b'2345')
+        self.assertEqual(b''.join(self.client.get(self.url, HTTP_RANGE='bytes=-3').streaming_content), b'789')
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=20-').status_code, 416)
+
+        etag = self.client.head(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"other"')
+        self.assertEqual(stale.status_code, 200)  # 파일이 바뀌었으면 전체 전송
+
+    def test_front_server_offload_and_bad_paths(self):
+        with override_settings(MEDIA_ACCEL='nginx', MEDIA_ACCEL_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.image.image.name}')
+        self.assertEqual(response.content, b'')
+
+        user = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/media/blobs/none.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from .metrics import MetricsRegistry
+
+
+# ==============================================================================
+# 📈 메트릭 레지스트리 (워커별 스냅샷 합산) / /api/metrics
+# ==============================================================================
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, ignore_errors=True)
+        override = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN='secret')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _write_snapshot(self, pid, counters=(), histograms=()):
+        with open(os.path.join(self.metrics_dir, f'metrics_{pid}.json'), 'w') as f:
+            json.dump({'counters': list(counters), 'histograms': list(histograms)}, f)
+
+    def test_live_workers_are_summed_and_dead_ones_pruned(self):
+        registry = MetricsRegistry(flush_interval=0)
+        registry.inc('webhook_events_total', endpoint='sms_receive')
+        registry.observe('http_request_duration_seconds', 0.02, buckets=(0.01, 0.05), view='a', method='GET', status=200)
+
+        other = [['webhook_events_total', [['endpoint', 'sms_receive']], 2]]
+        self._write_snapshot(os.getppid(), counters=other)  # 살아 있는 다른 워커
+        self._write_snapshot(999999999, counters=other)     # 종료된 워커
+
+        text = registry.render(buckets=(0.01, 0.05))
+        self.assertIn('webhook_events_total{endpoint="sms_receive"} 3', text)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",status="200",view="a",le="0.01"} 0', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",status="200",view="a",le="0.05"} 1', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",status="200",view="a"} 1', text)
+        self.assertFalse(os.path.exists(os.path.join(self.metrics_dir, 'metrics_999999999.json')))
+
+    def test_endpoint_requires_token_and_records_requests(self):
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+        self.client.get('/api/customers/')  # 미들웨어가 URL 이름별로 기록
+
+        response = self.client.get('/api/metrics', headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('view="customer-list"', response.content.decode())
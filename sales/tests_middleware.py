@@ -0,0 +1,49 @@
+import contextlib
+import io
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from .models import Customer, User
+
+
+# ==============================================================================
+# 🔍 요청별 SQL 계측 (X-DB-Queries / Server-Timing)
+# ==============================================================================
+class SQLInstrumentationTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=self.agent).key}'}
+        Customer.objects.create(name='고객', phone='01012345678', owner=self.agent)
+
+    def test_sync_request_counts_queries(self):
+        response = self.client.get('/api/customers/callbacks/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_budget_overrun_is_logged_with_slowest_queries(self):
+        output = io.StringIO()
+        budgets = {'default': {'queries': 50}, 'customer-callbacks': {'queries': 1}}
+        with override_settings(SQL_BUDGETS=budgets), contextlib.redirect_stdout(output):
+            self.client.get('/api/customers/callbacks/', headers=self.headers)
+        self.assertIn('[SQL 예산 초과] GET /api/customers/callbacks/ (customer-callbacks)', output.getvalue())
+        self.assertIn('⏱', output.getvalue())
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):  # 기본 예산 안
+            self.client.get('/api/customers/callbacks/', headers=self.headers)
+        self.assertNotIn('SQL 예산 초과', output.getvalue())
+
+    async def test_asgi_request_counts_queries_from_worker_threads(self):
+        # ASGI 에서는 동기 DRF 뷰와 ORM 이 sync_to_async 스레드에서 실행됨
+        response = await self.async_client.get('/api/customers/callbacks/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.assertNotIn('"0 queries"', response['Server-Timing'])
+
+    async def test_async_view_counts_queries(self):
+        response = await self.async_client.post(
+            '/api/async/sms/test_connection/', {}, content_type='application/json', headers=self.headers,
+        )
+        self.assertGreater(int(response['X-DB-Queries']), 0)  # 토큰 인증 조회
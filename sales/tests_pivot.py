@@ -0,0 +1,74 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import AdChannel, Customer, User
+from .pivot import PivotError, build_pivot, normalize_request
+
+
+# ==============================================================================
+# 🧩 피벗 집계 (차원 × 지표 GROUP BY 한 번)
+# ==============================================================================
+class PivotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.a1 = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.a2 = User.objects.create_user(username='agent2', password='pw', role='AGENT')
+        AdChannel.objects.create(name='당근', cost=20000)
+        AdChannel.objects.create(name='토스', cost=5000)
+        leads = [
+            # (상담사, 플랫폼, 업로드일, 상태)
+            (self.a1, '당근', '2026-01-05', '설치완료'),
+            (self.a1, '당근', '2026-01-07', '실패'),        # 광고비 제외 상태
+            (self.a1, '토스', '2026-02-02', '접수완료'),
+            (self.a2, '당근', '2026-01-20', '재통'),
+        ]
+        for i, (owner, platform, upload, status) in enumerate(leads):
+            Customer.objects.create(name=f'피벗{i}', phone=f'0108888000{i}', owner=owner, platform=platform, status=status,
+                                    upload_date=datetime.date.fromisoformat(upload), agent_policy=40, support_amt=5)
+
+    def _pivot(self, **params):
+        return build_pivot(**normalize_request(params))
+
+    def test_owner_by_month(self):
+        result = self._pivot(dimensions='owner,upload_month', measures='db,accepted,installed,installed_revenue,ad_spend')
+        self.assertEqual(result['rows'], [
+            {'owner': self.a1.id, 'upload_month': '2026-01', 'db': 2, 'accepted': 1, 'installed': 1,
+             'installed_revenue': 350000, 'ad_spend': 20000},
+            {'owner': self.a1.id, 'upload_month': '2026-02', 'db': 1, 'accepted': 1, 'installed': 0,
+             'installed_revenue': 0, 'ad_spend': 5000},
+            {'owner': self.a2.id, 'upload_month': '2026-01', 'db': 1, 'accepted': 0, 'installed': 0,
+             'installed_revenue': 0, 'ad_spend': 20000},
+        ])
+        self.assertFalse(result['truncated'])
+
+    def test_week_dimension_filters_and_totals(self):
+        weeks = self._pivot(dimensions='upload_week', measures='db', platform='당근')['rows']
+        self.assertEqual(weeks, [{'upload_week': '2026-01-05', 'db': 2}, {'upload_week': '2026-01-19', 'db': 1}])  # 월요일
+        total = self._pivot(measures='db,net_profit', start_date='2026-01-01', end_date='2026-01-31', owner=str(self.a1.id))
+        self.assertEqual(total['rows'], [{'db': 2, 'net_profit': 350000 - 20000}])
+
+    def test_invalid_requests(self):
+        for params in ({'dimensions': 'owner,nope'}, {'measures': 'revenue'}, {'dimensions': 'owner,owner'},
+                       {'dimensions': 'owner,platform,client,status'}, {'owner': 'kim'},
+                       {'date_field': 'created_at'}, {'start_date': '2026/01/01'}):
+            with self.assertRaises(PivotError):
+                normalize_request(params)
+
+    def test_endpoint_labels_owners_outside_cache(self):
+        auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.admin).key}'}
+        url = '/api/stats/pivot/?dimensions=owner&measures=db'
+        first = self.client.get(url, **auth).json()
+        self.assertEqual([(r['owner_name'], r['db']) for r in first['rows']], [('agent1', 3), ('agent2', 1)])
+
+        User.objects.filter(id=self.a1.id).update(username='agent1-renamed')  # 데이터 버전은 그대로
+        second = self.client.get(url, **auth).json()
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['rows'][0]['owner_name'], 'agent1-renamed')
+
+        self.assertEqual(self.client.get('/api/stats/pivot/?dimensions=nope', **auth).status_code, 400)
+        agent_auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.a1).key}'}
+        self.assertEqual(self.client.get(url, **agent_auth).status_code, 403)
@@ -0,0 +1,75 @@
+import datetime
+
+from django.test import TestCase, override_settings
+
+from .models import CallbackReminder, Customer, User
+from .push import PushResult
+from .reminders import send_due_callback_reminders
+
+
+class FlakyPushClient:
+    """outcomes 에 넣어둔 순서대로 성공/실패를 돌려주는 가짜 클라이언트"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.sent = []
+
+    def send_each(self, messages):
+        messages = list(messages)
+        self.sent.append(messages)
+        ok = self.outcomes.pop(0) if self.outcomes else True
+        return [PushResult(True) if ok else PushResult(False, 'UNAVAILABLE') for _ in messages]
+
+
+# ==============================================================================
+# ⏰ 재통화 알림 (상담사별 묶음 발송 + 실패 건 재시도)
+# ==============================================================================
+@override_settings(CALLBACK_REMINDER_MAX_ATTEMPTS=3)
+class CallbackReminderTests(TestCase):
+    def setUp(self):
+        self.now = datetime.datetime(2026, 3, 2, 9, 0)
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT', fcm_token='token-1')
+        self.customers = [
+            Customer.objects.create(name=f'재통화{i}', phone=f'0101234000{i}', owner=self.agent,
+                                    callback_schedule=self.now + datetime.timedelta(minutes=3 + i))
+            for i in range(2)
+        ]
+
+    def _run(self, client, minutes=0):
+        return send_due_callback_reminders(now=self.now + datetime.timedelta(minutes=minutes), lead_minutes=10, client=client)
+
+    def test_one_message_per_agent_and_no_duplicates(self):
+        client = FlakyPushClient()
+        self.assertEqual(self._run(client), (1, 0, 2))
+        self.assertEqual(len(client.sent[0]), 1)  # 고객 2명이 한 메시지로
+        self.assertEqual(self._run(client), (0, 0, 0))  # 이미 보낸 건은 다시 보내지 않음
+        self.assertEqual(set(CallbackReminder.objects.values_list('status', 'attempts')), {('SENT', 1)})
+
+    def test_failed_reminder_is_retried_on_next_run(self):
+        client = FlakyPushClient(False, True)
+        self.assertEqual(self._run(client), (0, 1, 2))
+        self.assertEqual(set(CallbackReminder.objects.values_list('status', flat=True)), {'FAILED'})
+
+        self.assertEqual(self._run(client, minutes=1), (1, 0, 2))
+        self.assertEqual(set(CallbackReminder.objects.values_list('status', 'attempts', 'error')), {('SENT', 2, '')})
+        self.assertEqual(CallbackReminder.objects.count(), 2)
+
+    def test_retries_stop_at_attempt_limit(self):
+        client = FlakyPushClient(False, False, False, True)
+        for minute in range(4):
+            self._run(client, minutes=minute % 3)
+        self.assertEqual(len(client.sent), 3)
+        self.assertEqual(set(CallbackReminder.objects.values_list('status', 'attempts')), {('FAILED', 3)})
+
+    def test_rescheduled_callback_gets_new_reminder(self):
+        client = FlakyPushClient(False)
+        self._run(client)
+        customer = self.customers[0]
+        Customer.objects.filter(id=customer.id).update(callback_schedule=self.now + datetime.timedelta(minutes=8))
+        Customer.objects.filter(id=self.customers[1].id).update(callback_schedule=None)
+
+        self.assertEqual(self._run(client), (1, 0, 1))
+        self.assertEqual(
+            list(CallbackReminder.objects.filter(customer=customer).order_by('scheduled_for').values_list('status', 'attempts')),
+            [('FAILED', 1), ('SENT', 1)],
+        )
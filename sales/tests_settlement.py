@@ -0,0 +1,71 @@
+import datetime
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import Customer, SettlementBatch, User
+from .settlement import run_settlement_batch
+
+
+def settlement_csv(*rows, header='전화번호,정책,거래처,정산일,비고'):
+    text = '\n'.join([header, *rows])
+    return SimpleUploadedFile('settlement.csv', text.encode('utf-8-sig'), content_type='text/csv')
+
+
+# ==============================================================================
+# 💰 정산 파일 일괄 반영 / 대사
+# ==============================================================================
+class SettlementBatchTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.installed = Customer.objects.create(name='설치', phone='01011112222', status='설치완료', agent_policy=30)
+        self.other = Customer.objects.create(name='불일치', phone='01033334444', status='접수완료', agent_policy=20)
+        self.not_target = Customer.objects.create(name='대상아님', phone='01055556666', status='부재')
+
+    def test_applies_matched_rows_and_reports_mismatches(self):
+        upload = settlement_csv(
+            '010-1111-2222,30,KT,2026-10-01,첫 정산',
+            '01033334444,25,,,',
+            '01055556666,10,,,',   # 정산 대상 상태가 아님
+            '01099998888,10,,,',   # 없는 번호
+        )
+        batch = run_settlement_batch(upload, user=self.admin)
+
+        summary = batch.report['summary']
+        self.assertEqual((summary['rows'], summary['matched'], summary['unmatched'], summary['mismatches']), (4, 2, 2, 1))
+        self.assertEqual(batch.report['mismatches'][0]['customer_id'], self.other.id)
+
+        self.installed.refresh_from_db()
+        self.assertEqual(self.installed.settlement_status, '정산완료')
+        self.assertEqual(self.installed.settlement_complete_date, datetime.date(2026, 10, 1))
+        self.assertEqual((self.installed.policy_amt, self.installed.client, self.installed.settlement_memo), (30, 'KT', '첫 정산'))
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.settlement_complete_date, datetime.date.today())  # 정산일이 없으면 오늘
+        self.assertEqual(Customer.objects.get(id=self.not_target.id).settlement_status, '미정산')
+
+    def test_settling_touches_updated_at(self):
+        long_ago = datetime.datetime.now() - datetime.timedelta(days=500)
+        Customer.objects.filter(id=self.installed.id).update(updated_at=long_ago)
+
+        run_settlement_batch(settlement_csv('01011112222,30,,,'))
+
+        self.installed.refresh_from_db()
+        self.assertGreater(self.installed.updated_at, datetime.datetime.now() - datetime.timedelta(minutes=1))
+
+    def test_dry_run_changes_nothing(self):
+        batch = run_settlement_batch(settlement_csv('01011112222,30,,,'), dry_run=True)
+
+        self.assertTrue(batch.dry_run)
+        self.assertEqual(batch.matched_count, 1)
+        self.installed.refresh_from_db()
+        self.assertEqual(self.installed.settlement_status, '미정산')
+
+    def test_missing_columns_is_400(self):
+        token = Token.objects.create(user=self.admin)
+        response = self.client.post(
+            '/api/settlements/batch/', {'file': settlement_csv('01011112222', header='전화번호')},
+            HTTP_AUTHORIZATION=f'Token {token.key}',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SettlementBatch.objects.exists())
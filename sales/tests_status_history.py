@@ -0,0 +1,73 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import Customer, StatusTransition, User
+from .status_history import conversion_funnel, record_transitions, update_status
+
+
+# ==============================================================================
+# 🧭 상태 변경 이력 / 전환 퍼널
+# ==============================================================================
+class ConversionFunnelTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.start = datetime.datetime(2026, 3, 2, 9, 0)
+
+    def _journey(self, platform, steps):
+        """steps: [(상태, 시작 후 경과 시간), ...] 순서대로 상태 이력을 남긴 고객"""
+        customer = Customer.objects.create(name='퍼널', phone=f'0105555{Customer.objects.count():04d}', platform=platform)
+        previous = None
+        for status, hours in steps:
+            record_transitions([(customer.id, previous, status)], at=self.start + datetime.timedelta(hours=hours))
+            previous = status
+        return customer
+
+    def test_funnel_by_platform(self):
+        self._journey('당근', [('미통건', 0), ('가망', 1), ('접수완료', 3)])                   # 2시간
+        self._journey('당근', [('미통건', 0), ('가망', 1), ('부재', 2), ('가망', 5), ('접수완료', 7)])  # 첫 진입 기준 6시간
+        self._journey('당근', [('미통건', 0), ('가망', 2)])                                   # 미전환
+        self._journey('토스', [('가망', 0), ('접수완료', 10)])                                 # 10시간
+        self._journey('토스', [('미통건', 0), ('부재', 1)])                                   # 가망 진입 없음
+
+        result = conversion_funnel('가망', '접수완료')
+        self.assertEqual(result['total'], {
+            'platform': '전체', 'entered': 4, 'converted': 3, 'conversion_rate': 75.0,
+            'avg_hours': 6.0, 'median_hours': 6.0,
+        })
+        self.assertEqual(result['platforms'], [
+            {'platform': '당근', 'entered': 3, 'converted': 2, 'conversion_rate': 66.7, 'avg_hours': 4.0, 'median_hours': 4.0},
+            {'platform': '토스', 'entered': 1, 'converted': 1, 'conversion_rate': 100.0, 'avg_hours': 10.0, 'median_hours': 10.0},
+        ])
+
+    def test_period_and_platform_filters(self):
+        self._journey('당근', [('가망', 0), ('접수완료', 1)])
+        self._journey('당근', [('가망', 48), ('접수완료', 50)])
+        self._journey('토스', [('가망', 0), ('접수완료', 4)])
+
+        day = conversion_funnel('가망', '접수완료', start_date='2026-03-02', end_date='2026-03-02', platform='당근')
+        self.assertEqual((day['total']['entered'], day['total']['avg_hours']), (1, 1.0))
+        self.assertEqual([p['platform'] for p in day['platforms']], ['당근'])
+
+    def test_unknown_status_and_api(self):
+        self.assertEqual(conversion_funnel('가망', '없는상태')['total'], None)
+
+        self._journey('당근', [('가망', 0), ('접수완료', 1)])
+        token = Token.objects.create(user=self.admin)
+        response = self.client.get('/api/stats/funnel/?from=가망&to=접수완료&platform=ALL',
+                                   HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.json()['total']['converted'], 1)
+        bad = self.client.get('/api/stats/funnel/?start_date=3월', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(bad.status_code, 400)
+
+
+class StatusHistoryTests(TestCase):
+    def test_update_status_records_changed_rows_only(self):
+        same = Customer.objects.create(name='같음', phone='01000000001', status='가망')
+        other = Customer.objects.create(name='다름', phone='01000000002', status='부재')
+        update_status(Customer.objects.filter(id__in=[same.id, other.id]), '가망')
+
+        history = StatusTransition.objects.filter(customer_id__in=[same.id, other.id])
+        self.assertEqual(list(history.values_list('customer_id', 'from_status__name', 'to_status__name')),
+                         [(other.id, '부재', '가망')])
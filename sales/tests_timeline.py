@@ -0,0 +1,55 @@
+import datetime
+from urllib.parse import parse_qs, urlparse
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import CallRecord, ConsultationLog, Customer, SMSLog, User
+from .timeline import customer_timeline
+
+
+# ==============================================================================
+# 🕒 고객 타임라인 (소스별 keyset 조회 + 병합, 커서 페이지)
+# ==============================================================================
+class CustomerTimelineTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.customer = Customer.objects.create(name='타임라인', phone='01066660000', owner=self.agent)
+        base = datetime.datetime(2026, 3, 2, 9, 0)
+        # 같은 시각의 기록이 여러 소스/같은 소스에 겹치도록
+        self.expected = []
+        for minute, kind in [(0, 'log'), (5, 'sms'), (5, 'log'), (5, 'call'), (5, 'sms'), (9, 'call'), (12, 'log')]:
+            at = base + datetime.timedelta(minutes=minute)
+            if kind == 'log':
+                obj = ConsultationLog.objects.create(customer=self.customer, writer=self.agent, content=f'상담 {minute}')
+            elif kind == 'sms':
+                obj = SMSLog.objects.create(customer=self.customer, agent=self.agent, content=f'문자 {minute}', direction='IN', status='RECEIVED')
+            else:
+                obj = CallRecord.objects.create(customer=self.customer, agent=self.agent, file_link=f'https://example.com/{minute}.m4a')
+            type(obj).objects.filter(id=obj.id).update(created_at=at)
+            self.expected.append(((at, ['log', 'sms', 'call'].index(kind), obj.id), kind, obj.id))
+        self.expected.sort(reverse=True)
+        ConsultationLog.objects.create(customer=Customer.objects.create(name='다른', phone='01066669999'), writer=self.agent, content='남의 기록')
+
+    def test_pages_cover_every_record_once_in_order(self):
+        seen, cursor = [], None
+        while True:
+            items, cursor = customer_timeline(self.customer.id, cursor, page_size=2)
+            seen.extend((item['type'], item['id']) for item in items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [(kind, pk) for _, kind, pk in self.expected])
+
+    def test_endpoint_returns_next_link_and_rejects_bad_cursor(self):
+        token = Token.objects.create(user=self.agent)
+        auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+        first = self.client.get(f'/api/customers/{self.customer.id}/timeline/?page_size=4', **auth).json()
+        self.assertEqual([item['type'] for item in first['results']], [kind for _, kind, _ in self.expected[:4]])
+
+        cursor = parse_qs(urlparse(first['next']).query)['cursor'][0]
+        second = self.client.get(f'/api/customers/{self.customer.id}/timeline/?page_size=4&cursor={cursor}', **auth).json()
+        self.assertEqual([item['id'] for item in second['results']], [pk for _, _, pk in self.expected[4:]])
+        self.assertIsNone(second['next'])
+
+        bad = self.client.get(f'/api/customers/{self.customer.id}/timeline/?cursor=garbage', **auth)
+        self.assertEqual(bad.status_code, 400)
@@ -0,0 +1,74 @@
+import json
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from .models import TodoReceipt, TodoTask, User
+from .todo_inbox import recount_unread, unread_count
+
+
+# ==============================================================================
+# 📥 업무지시 받은함 (수신자별 읽음/완료 + 안읽음 카운터)
+# ==============================================================================
+class TodoInboxTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role='ADMIN')
+        self.admin2 = User.objects.create_user(username='admin2', password='pw', role='ADMIN')
+        self.agent1 = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.agent2 = User.objects.create_user(username='agent2', password='pw', role='AGENT')
+
+    def _auth(self, user):
+        return {'HTTP_AUTHORIZATION': f'Token {Token.objects.get_or_create(user=user)[0].key}'}
+
+    def _send(self, **fields):
+        response = self.client.post('/api/todos/', json.dumps({'content': '확인 부탁드립니다', **fields}),
+                                    content_type='application/json', **self._auth(self.admin))
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def test_global_task_reaches_every_agent(self):
+        task_id = self._send(is_global=True)
+        self.assertEqual(set(TodoReceipt.objects.filter(task_id=task_id).values_list('user_id', flat=True)),
+                         {self.agent1.id, self.agent2.id})
+        self.assertEqual((unread_count(self.agent1.id), unread_count(self.agent2.id)), (1, 1))
+
+        inbox = self.client.get('/api/todos/inbox/?state=unread', **self._auth(self.agent1)).json()
+        self.assertEqual([item['task_id'] for item in inbox['results']], [task_id])
+
+    def test_read_and_complete_are_per_recipient(self):
+        task_id = self._send(is_global=True)
+        read = self.client.post(f'/api/todos/{task_id}/read/', **self._auth(self.agent1)).json()
+        again = self.client.post(f'/api/todos/{task_id}/read/', **self._auth(self.agent1)).json()
+        self.assertEqual((read, again), ({'read': True, 'unread': 0}, {'read': False, 'unread': 0}))
+
+        done = self.client.post(f'/api/todos/{task_id}/complete/', **self._auth(self.agent2)).json()
+        self.assertEqual(done, {'completed': True, 'unread': 0})
+        completed = TodoReceipt.objects.filter(task_id=task_id, completed_at__isnull=False)
+        self.assertEqual(list(completed.values_list('user_id', flat=True)), [self.agent2.id])
+
+    def test_reassignment_removes_previous_recipient(self):
+        task_id = self._send(assigned_to=self.agent1.id)
+        response = self.client.patch(f'/api/todos/{task_id}/', json.dumps({'assigned_to': self.agent2.id}),
+                                     content_type='application/json', **self._auth(self.admin))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(list(TodoReceipt.objects.filter(task_id=task_id).values_list('user_id', flat=True)), [self.agent2.id])
+        self.assertEqual((unread_count(self.agent1.id), unread_count(self.agent2.id)), (0, 1))
+        self.assertEqual(recount_unread(), 0)  # 카운터가 받은함과 일치
+
+        inbox = self.client.get('/api/todos/inbox/', **self._auth(self.agent1)).json()
+        self.assertEqual(inbox['results'], [])
+
+    def test_delete_releases_unread(self):
+        task_id = self._send(assigned_to=self.agent1.id)
+        self.client.delete(f'/api/todos/{task_id}/', **self._auth(self.admin))
+        self.assertEqual(unread_count(self.agent1.id), 0)
+
+    def test_admin_sees_tasks_from_other_admins(self):
+        other = TodoTask.objects.create(sender=self.admin2, assigned_to=self.agent2, content='다른 관리자 지시')
+        mine = self._send(assigned_to=self.agent1.id)
+
+        admin_view = self.client.get('/api/todos/assigned/', **self._auth(self.admin)).json()
+        self.assertEqual({t['id'] for t in admin_view}, {other.id, mine})
+        agent_view = self.client.get('/api/todos/assigned/', **self._auth(self.agent1)).json()
+        self.assertEqual([t['id'] for t in agent_view], [mine])
@@ -0,0 +1,71 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import inbound_sms
+from .inbound_sms import drain_inbound_queue, enqueue_inbound_sms
+from .models import Customer, InboundSMSEvent, SMSLog, SMSStatusEvent, User
+from .sms_status import drain_status_queue, enqueue_status_report
+from .tests import inbound_webhook, status_webhook
+from .webhook_queue import claim_batch
+
+
+# ==============================================================================
+# 📦 웹훅 대기열 (멈춘 묶음 회수 / 실패 재시도)
+# ==============================================================================
+@override_settings(INBOUND_SMS_AUTO_DRAIN=False, WEBHOOK_QUEUE={'PROCESSING_TIMEOUT': 300, 'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 60})
+class WebhookQueueTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent1', password='pw', role='AGENT')
+        self.customer = Customer.objects.create(name='수신', phone='01011112222', owner=self.agent, status='재통')
+
+    def _age(self, model, **fields):
+        """시간이 흐른 것처럼 선점/처리 시각을 10분 전으로"""
+        ago = timezone.now() - datetime.timedelta(minutes=10)
+        model.objects.update(**{field: ago for field in fields})
+
+    def test_stale_processing_batch_is_reclaimed(self):
+        enqueue_inbound_sms(inbound_webhook('01011112222', 'm-1'))
+        claim_batch(InboundSMSEvent, 500)  # 선점한 consumer 가 처리 도중 죽은 상황
+
+        self.assertEqual(drain_inbound_queue()['saved'], 0)  # 아직 제한 시간 안
+        self._age(InboundSMSEvent, claimed_at=True)
+        self.assertEqual(drain_inbound_queue()['saved'], 1)
+
+        event = InboundSMSEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('DONE', 2))
+        self.assertEqual(SMSLog.objects.filter(customer=self.customer, direction='IN').count(), 1)
+
+    def test_failed_batch_is_retried_after_delay(self):
+        enqueue_inbound_sms(inbound_webhook('01011112222', 'm-2'))
+        with mock.patch.object(inbound_sms, 'record_sms', side_effect=RuntimeError('잠김')):
+            self.assertEqual(drain_inbound_queue()['failed'], 1)
+        self.assertEqual(drain_inbound_queue()['saved'], 0)  # 재시도 대기 중
+
+        self._age(InboundSMSEvent, processed_at=True)
+        self.assertEqual(drain_inbound_queue()['saved'], 1)
+        self.assertEqual(InboundSMSEvent.objects.get().status, 'DONE')
+
+    def test_gives_up_after_max_attempts(self):
+        enqueue_inbound_sms(inbound_webhook('01011112222', 'm-3'))
+        with mock.patch.object(inbound_sms, 'record_sms', side_effect=RuntimeError('잠김')):
+            drain_inbound_queue()
+            self._age(InboundSMSEvent, processed_at=True)
+            drain_inbound_queue()
+        self._age(InboundSMSEvent, processed_at=True)
+        self.assertEqual(drain_inbound_queue(), {'saved': 0, 'ignored': 0, 'failed': 0})
+
+        event = InboundSMSEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('FAILED', 2))
+
+    def test_status_queue_reclaims_stale_batch(self):
+        SMSLog.objects.create(customer=self.customer, agent=self.agent, content='안내', direction='OUT',
+                              status='SUCCESS', gateway_message_id='out-1')
+        enqueue_status_report(status_webhook('out-1', 'sms:delivered'))
+        claim_batch(SMSStatusEvent, 1000)
+        self._age(SMSStatusEvent, claimed_at=True)
+
+        self.assertEqual(drain_status_queue()['updated'], 1)
+        self.assertEqual(SMSLog.objects.get(gateway_message_id='out-1').status, 'DELIVERED')
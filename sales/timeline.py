@@ -0,0 +1,103 @@
+import base64
+import heapq
+import json
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import CallRecord, ConsultationLog, SMSLog
+
+
+# ==============================================================================
+# 🕒 고객 타임라인 (상담기록 + 문자 + 통화 녹취를 시간순 한 줄로)
+# ==============================================================================
+# 소스마다 (customer, created_at, id) 인덱스 순서로 최신부터 page_size+1 건씩만 읽고,
+# heapq.merge 로 k-way 병합해 필요한 만큼만 꺼냅니다. (고객 이력 전체를 메모리에 올리지 않음)
+# 정렬 키 = (created_at, 소스 순번, id) 내림차순 → 커서도 이 세 값으로 만듭니다.
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+
+SOURCES = [
+    # (종류, 소스 순번, 모델, values() 컬럼)
+    ('log', 0, ConsultationLog, ('id', 'created_at', 'content', 'writer__username')),
+    ('sms', 1, SMSLog, ('id', 'created_at', 'content', 'direction', 'status', 'image')),
+    ('call', 2, CallRecord, ('id', 'created_at', 'file_link', 'duration', 'agent__username')),
+]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    created_at, rank, pk = key
+    raw = json.dumps([created_at.isoformat(), rank, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        created_at, rank, pk = json.loads(raw)
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(rank), int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor("잘못된 커서입니다.")
+
+
+def _older_than(key, rank):
+    """이 소스(rank)에서 정렬 키가 key 보다 뒤(과거)인 행"""
+    created_at, cursor_rank, pk = key
+    if rank < cursor_rank:
+        return Q(created_at__lte=created_at)
+    if rank > cursor_rank:
+        return Q(created_at__lt=created_at)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+
+def _stream(kind, rank, model, fields, customer_id, cursor, chunk):
+    """한 소스를 최신순으로 chunk 건씩 keyset 조회하며 (정렬 키, 종류, 행) 을 내보냅니다."""
+    base = model.objects.filter(customer_id=customer_id).order_by('-created_at', '-id').values(*fields)
+    after = cursor
+    while True:
+        queryset = base.filter(_older_than(after, rank)) if after else base
+        rows = list(queryset[:chunk])
+        for row in rows:
+            yield (row['created_at'], rank, row['id']), kind, row
+        if len(rows) < chunk:
+            return
+        after = (rows[-1]['created_at'], rank, rows[-1]['id'])
+
+
+def _to_item(kind, row, build_url):
+    item = {'type': kind, 'id': row['id'], 'created_at': row['created_at'].strftime("%Y-%m-%d %H:%M")}
+    if kind == 'log':
+        item.update(writer_name=row['writer__username'], content=row['content'])
+    elif kind == 'sms':
+        image = row['image']
+        item.update(
+            direction=row['direction'], sender='me' if row['direction'] == 'OUT' else 'other',
+            text=row['content'], status=row['status'],
+            image=build_url(SMSLog._meta.get_field('image').storage.url(image)) if image else None,
+        )
+    else:
+        item.update(agent_name=row['agent__username'], file_link=row['file_link'], duration=row['duration'])
+    return item
+
+
+def customer_timeline(customer_id, cursor=None, page_size=DEFAULT_PAGE_SIZE, build_url=lambda url: url):
+    """
+    최신순 타임라인 한 페이지
+    반환: (항목 리스트, 다음 페이지 커서 또는 None)
+    """
+    key = decode_cursor(cursor) if cursor else None
+    chunk = page_size + 1  # 소스 하나만으로 페이지가 차는 경우에도 다음 페이지 여부를 알 수 있게
+    streams = [_stream(*source, customer_id, key, chunk) for source in SOURCES]
+    merged = list(islice(heapq.merge(*streams, key=lambda entry: entry[0], reverse=True), page_size + 1))
+
+    next_cursor = encode_cursor(merged[page_size - 1][0]) if len(merged) > page_size else None
+    items = [_to_item(kind, row, build_url) for _, kind, row in merged[:page_size]]
+    return items, next_cursor
@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import User, TodoReceipt, TodoInboxCounter
+
+
+# ==============================================================================
+# 📥 업무지시 받은함 (수신자별 전달/읽음/완료 + 안읽음 카운터)
+# ==============================================================================
+# 안읽음 배지는 매번 세지 않고 TodoInboxCounter 한 행을 읽습니다.
+# 카운터는 수신(+1) / 읽음(-1) / 안읽은 채 삭제(-1) 시점에만 F() 로 증감합니다.
+
+
+def task_recipient_ids(task):
+    """전체 지시면 활성 상담사 전원, 아니면 담당자 한 명"""
+    if task.is_global:
+        return list(User.objects.filter(role='AGENT', is_active=True).values_list('id', flat=True))
+    return [task.assigned_to_id] if task.assigned_to_id else []
+
+
+def _adjust_unread(user_ids, delta):
+    if not user_ids:
+        return
+    TodoInboxCounter.objects.bulk_create(
+        [TodoInboxCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+    )
+    TodoInboxCounter.objects.filter(user_id__in=user_ids).update(unread=F('unread') + delta)
+
+
+def create_receipts(task):
+    """
+    업무지시의 수신자별 상태 행을 만들고 새로 받은 사람의 안읽음 카운터를 올립니다.
+    담당자 변경 후 다시 호출해도 이미 받은 사람은 건너뜁니다. 반환: 새 수신자 id 목록
+    """
+    existing = set(TodoReceipt.objects.filter(task=task).values_list('user_id', flat=True))
+    user_ids = [user_id for user_id in task_recipient_ids(task) if user_id not in existing]
+    with transaction.atomic():
+        TodoReceipt.objects.bulk_create(
+            [TodoReceipt(task=task, user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+        )
+        _adjust_unread(user_ids, 1)
+    return user_ids
+
+
+def sync_receipts(task):
+    """
+    담당자/전체 여부를 바꾼 뒤 호출 - 새 수신자에게 전달하고, 더 이상 수신자가 아닌 사람의 받은함 행은 지웁니다.
+    (안읽은 채 빠지는 사람은 카운터도 -1) 반환: (새 수신자 id 목록, 빠진 수신자 id 목록)
+    """
+    recipients = set(task_recipient_ids(task))
+    with transaction.atomic():
+        stale = TodoReceipt.objects.filter(task=task).exclude(user_id__in=recipients)
+        removed = list(stale.values_list('user_id', 'read_at'))
+        stale.delete()
+        _adjust_unread([user_id for user_id, read_at in removed if read_at is None], -1)
+        added = create_receipts(task)
+    return added, [user_id for user_id, _ in removed]
+
+
+def mark_delivered(task_id, user_ids):
+    TodoReceipt.objects.filter(task_id=task_id, user_id__in=user_ids, delivered_at__isnull=True).update(
+        delivered_at=timezone.now()
+    )
+
+
+def mark_read(task_id, user_id):
+    """처음 읽을 때만 카운터를 내립니다. 반환: 이번에 읽음 처리됐는지"""
+    now = timezone.now()
+    with transaction.atomic():
+        updated = TodoReceipt.objects.filter(task_id=task_id, user_id=user_id, read_at__isnull=True).update(
+            read_at=now, delivered_at=now
+        )
+        if updated:
+            _adjust_unread([user_id], -1)
+    return bool(updated)
+
+
+def set_completed(task, user_id, completed=True):
+    """
+    수신자 본인의 완료 여부를 바꿉니다. (완료하면 읽음도 함께 처리)
+    개인 지시는 기존 화면 호환을 위해 TodoTask.is_completed 도 맞춰 둡니다.
+    반환: 수신자 행이 있었는지
+    """
+    receipts = TodoReceipt.objects.filter(task_id=task.id, user_id=user_id)
+    with transaction.atomic():
+        if completed:
+            mark_read(task.id, user_id)
+        if not receipts.update(completed_at=timezone.now() if completed else None):
+            return False
+        if not task.is_global and task.is_completed != completed:
+            task.is_completed = completed
+            task.save(update_fields=['is_completed'])
+    return True
+
+
+def release_receipts(task_id):
+    """업무지시 삭제 전에 호출 - 안읽은 수신자의 카운터를 돌려놓습니다."""
+    unread = list(TodoReceipt.objects.filter(task_id=task_id, read_at__isnull=True).values_list('user_id', flat=True))
+    _adjust_unread(unread, -1)
+
+
+def unread_count(user_id):
+    return TodoInboxCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first() or 0
+
+
+def recount_unread(user_ids=None):
+    """카운터가 어긋났을 때 받은함 기준으로 다시 맞춥니다. 반환: 보정한 사용자 수"""
+    users = User.objects.all() if user_ids is None else User.objects.filter(id__in=user_ids)
+    actual = dict(users.annotate(
+        n=Count('todo_receipts', filter=Q(todo_receipts__read_at__isnull=True))
+    ).values_list('id', 'n'))
+    stored = dict(TodoInboxCounter.objects.filter(user_id__in=list(actual)).values_list('user_id', 'unread'))
+    fixed = 0
+    for user_id, n in actual.items():
+        if stored.get(user_id, 0) != n:
+            TodoInboxCounter.objects.update_or_create(user_id=user_id, defaults={'unread': n})
+            fixed += 1
+    return fixed
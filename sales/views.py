@@ -1,97 +1,120 @@
 import os
 import json
 import datetime
-import re
-import requests
+from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 from django.contrib.auth import authenticate
 from django.db.models import Sum, Count, Q, F, Case, When, IntegerField, Value, FloatField
 from django.db.models.functions import Coalesce, Cast
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseForbidden
 
 # DRF 관련 임포트
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
+from rest_framework.exceptions import APIException
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from rest_framework.parsers import MultiPartParser, FormParser
-from requests.auth import HTTPBasicAuth
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
 
 # 모델 및 시리얼라이저
 from .models import (
     Customer, User, ConsultationLog, Platform, 
     FailureReason, CustomStatus, SettlementStatus, SalesProduct, SMSLog,
-    AdChannel, Bank, Notice, PolicyImage, TodoTask, CancelReason, Client
+    AdChannel, Bank, Notice, PolicyImage, TodoTask, TodoReceipt, CancelReason, Client, SettlementBatch, CallRecord,
+    ArchivedCustomer,
 )
 from .serializers import (
-    CustomerSerializer, UserSerializer, PlatformSerializer, 
+    CustomerSerializer, CustomerBulkChangeSerializer, UserSerializer, PlatformSerializer, 
     ReasonSerializer, StatusSerializer, SettlementStatusSerializer, 
     SalesProductSerializer, LogSerializer,
-    AdChannelSerializer, BankSerializer, NoticeSerializer, PolicyImageSerializer, TodoTaskSerializer, CancelReasonSerializer, ClientSerializer
+    AdChannelSerializer, BankSerializer, NoticeSerializer, PolicyImageSerializer, TodoTaskSerializer, TodoReceiptSerializer, CancelReasonSerializer, ClientSerializer,
+    ArchivedCustomerSerializer, ArchivedCustomerDetailSerializer,
 )
 
 from .system_config import CONFIG_DATA
+from .metrics import registry as metrics
+from .sms_gateway import send_traccar_cloud_sms, send_gateway_sms, new_gateway_message_id
+from .ingest import (
+    clean_phone, upsert_customer, claim_dedupe_keys, sync_dedupe_key, register_lead,
+    get_idempotent_response, store_idempotent_response,
+)
+from .settlement import run_settlement_batch
+from .fanout import schedule_fanout
+from .inbound_sms import enqueue_inbound_sms
+from .sms_status import STATUS_EVENTS, enqueue_status_report
+from .data_version import bump_version, cached_result
+from .cohorts import build_cohorts, PERIODS as COHORT_PERIODS, GROUP_BY as COHORT_GROUP_BY
+from .pivot import build_pivot, label_owners, normalize_request as normalize_pivot_request, PivotError
+from .status_history import record_transitions, update_status, conversion_funnel, stage_durations
+from .activity import record_logs, record_sms, record_call, mark_sms_read
+from .timeline import customer_timeline, InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .todo_inbox import create_receipts, mark_read, set_completed, release_receipts, sync_receipts, unread_count
+from .exports import export_queryset, export_response, CUSTOMER_EXPORT_COLUMNS, SETTLEMENT_EXPORT_COLUMNS
+from .allocation import (
+    CLOSED_STATUSES, adjust_lead_loads, open_lead_counts, plan_distribution, apply_distribution,
+)
 
-# [유틸리티] 전화번호 정규화
-def clean_phone(phone):
-    if not phone: return ""
-    cleaned = re.sub(r'[^0-9]', '', str(phone))
-    if cleaned.startswith('82') and len(cleaned) > 10:
-        cleaned = '0' + cleaned[2:]
-    return cleaned
+# [유틸리티] 고객 목록 공통 필터 (?status=&platform=&owner=&client=&start_date=&end_date=)
+ACTIVITY_ORDERINGS = {'-last_contact_at', 'last_contact_at', '-last_sms_at', '-sms_unread_count', '-log_count'}
+CUSTOMER_FILTER_KEYS = {'status', 'platform', 'client', 'owner', 'start_date', 'end_date', 'has_unread', 'ordering'}
 
-# ==============================================================================
-# [핵심] 문자 발송 함수
-# ==============================================================================
-# views.py 수정
-# views.py 수정
-def send_traccar_cloud_sms(phone, sms_text, gateway_config):
-    url = gateway_config.get('url')
-    username = gateway_config.get('username')
-    password = gateway_config.get('password')
-
-    if not all([url, username, password]):
-        return False
-
-    # 📱 [중요] 전화번호를 +8210... 형식으로 변환
-    # 모든 특수문자 제거
-    raw_num = re.sub(r'[^0-9]', '', str(phone))
-    if raw_num.startswith('0'):
-        # 앞의 0을 제거하고 +82를 붙임 (01012345678 -> +821012345678)
-        formatted_phone = '+82' + raw_num[1:]
-    elif raw_num.startswith('82'):
-        formatted_phone = '+' + raw_num
-    else:
-        formatted_phone = '+82' + raw_num
 
-    payload = {
-        "textMessage": {
-            "text": sms_text
-        },
-        "phoneNumbers": [formatted_phone] # 👈 변환된 번호 사용
-    }
+class InvalidFilter(APIException):
+    """검색 조건 오류 → 400 {'message': ...}"""
+    status_code = 400
+    default_detail = {'message': '검색 조건이 올바르지 않습니다.'}
 
+
+def _filter_date(value, name):
     try:
-        response = requests.post(
-            url, 
-            json=payload, 
-            auth=HTTPBasicAuth(username, password), 
-            timeout=5
-        )
-        
-        if response.status_code in [200, 201, 202]:
-            print(f"✅ 발송 성공: {formatted_phone}")
-            return True
+        return datetime.date.fromisoformat(f"{value}-01" if len(value) == 7 else value)
+    except (TypeError, ValueError):
+        raise InvalidFilter({'message': f'{name} 는 YYYY-MM-DD (또는 YYYY-MM) 형식입니다.'})
+
+
+def validate_filter_payload(data):
+    """요청 본문으로 받은 filter(dict) 검증 - 허용된 키와 단일 값만"""
+    if not isinstance(data, dict):
+        raise InvalidFilter({'message': 'filter 는 객체여야 합니다.'})
+    unknown = sorted(set(data) - CUSTOMER_FILTER_KEYS)
+    if unknown:
+        raise InvalidFilter({'message': f'지원하지 않는 filter 항목: {unknown} (가능: {sorted(CUSTOMER_FILTER_KEYS)})'})
+    if any(not isinstance(value, (str, int, bool)) and value is not None for value in data.values()):
+        raise InvalidFilter({'message': 'filter 값은 문자열/숫자여야 합니다.'})
+    return {key: str(value) if isinstance(value, int) and not isinstance(value, bool) else value for key, value in data.items()}
+
+
+def filter_customers(queryset, params):
+    if params.get('status'): queryset = queryset.filter(status__in=str(params['status']).split(','))
+    if params.get('platform'): queryset = queryset.filter(platform=params['platform'])
+    if params.get('client'): queryset = queryset.filter(client=params['client'])
+    owner = params.get('owner')
+    if owner in ('none', 'unassigned'): queryset = queryset.filter(owner__isnull=True)
+    elif owner:
+        if not str(owner).isdigit():
+            raise InvalidFilter({'message': 'owner 는 상담사 ID 또는 none 입니다.'})
+        queryset = queryset.filter(owner_id=owner)
+
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    if start_date:
+        _filter_date(start_date, 'start_date')
+        if len(start_date) == 7:  # 월별 (YYYY-MM)
+            queryset = queryset.filter(upload_date__startswith=start_date)
         else:
-            # 400 에러 메시지를 로그에 더 자세히 출력
-            print(f"❌ 발송 실패: {response.status_code} - {response.text}")
-            return False
-    except Exception as e:
-        print(f"❌ 연결 오류: {e}")
-        return False
+            if end_date: _filter_date(end_date, 'end_date')
+            queryset = queryset.filter(upload_date__range=[start_date, end_date or start_date])
+
+    # 📊 활동 요약 필터/정렬 (Customer 의 비정규화 컬럼 + 인덱스 사용)
+    if params.get('has_unread') in ('1', 'true'): queryset = queryset.filter(sms_unread_count__gt=0)
+    if params.get('ordering') in ACTIVITY_ORDERINGS: queryset = queryset.order_by(params['ordering'], '-id')
+    return queryset
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -156,52 +179,34 @@ class SMSReceiveView(APIView):
     permission_classes = [AllowAny] 
 
     def post(self, request):
-        data = request.data
-        print(f"📥 웹훅 수신 데이터: {data}") # 디버깅용 로그
-
-        # 🟢 공식 문서 규격에 맞게 데이터 추출
-        if 'payload' in data:
-            # 웹훅 등록 방식으로 올 경우
-            payload = data.get('payload', {})
-            from_num = payload.get('phoneNumber')
-            msg_content = payload.get('message')
-        else:
-            # 그 외 일반적인 전송 방식일 경우 (예비용)
-            from_num = data.get('from') or data.get('sender')
-            msg_content = data.get('message') or data.get('text')
-
-        if not from_num or not msg_content:
+        # 발송 결과 웹훅을 같은 주소로 등록한 경우
+        if request.data.get('event') in STATUS_EVENTS:
+            return SMSStatusView().post(request)
+        metrics.inc('webhook_events_total', endpoint='sms_receive')
+        # ⚡ 원본만 대기열에 넣고 바로 응답 (고객 매칭/저장은 inbound_sms 에서 묶어서 처리)
+        if not enqueue_inbound_sms(request.data):
             return Response({"message": "데이터가 부족합니다."}, status=400)
+        return Response({"status": "queued"}, status=200)
 
-        # 전화번호 정규화 (+8210... -> 010...)
-        clean_num = clean_phone(from_num)
-        
-        # 번호 뒷 8자리가 일치하는 고객 찾기
-        customer = Customer.objects.filter(phone__contains=clean_num[-8:]).first()
-        
-        if customer:
-            # 🟢 수신된 메시지를 DB에 저장 (IN 방향)
-            SMSLog.objects.create(
-                customer=customer, 
-                agent=customer.owner, 
-                content=msg_content, 
-                direction='IN', 
-                status='RECEIVED'
-            )
-            # 고객 상태가 '부재'였다면 '재통'으로 자동 변경 (선택사항)
-            if customer.status == '부재':
-                customer.status = '재통'
-                customer.save()
-            
-            print(f"✅ {customer.name}님의 답장 저장 완료!")
-            return Response({"status": "success"}, status=200)
-        else:
-            print(f"❓ 등록되지 않은 번호의 문자: {clean_num}")
-            return Response({"status": "ignored", "message": "등록되지 않은 고객입니다."}, status=200)
+class SMSStatusView(APIView):
+    """게이트웨이 발송 결과 웹훅 (sms:sent / sms:delivered / sms:failed)"""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        metrics.inc('webhook_events_total', endpoint='sms_status')
+        # ⚡ 대기열에 넣고 바로 응답 (SMSLog 상태는 sms_status 에서 묶어서 갱신)
+        if not enqueue_status_report(request.data):
+            return Response({"message": "데이터가 부족합니다."}, status=400)
+        return Response({"status": "queued"}, status=200)
 
 class LeadCaptureView(APIView):
     permission_classes = [AllowAny] 
     def post(self, request):
+        metrics.inc('webhook_events_total', endpoint='lead_capture')
+        # 🧾 광고 플랫폼 재전송(같은 Idempotency-Key)이면 처음 응답을 그대로 반환
+        replay = get_idempotent_response(request, 'lead_capture')
+        if replay: return Response(replay[1], status=replay[0])
+
         phone = clean_phone(request.data.get('phone', ''))
         agent_id = request.data.get('agent_id')
         name = request.data.get('name', '신규문의')
@@ -210,23 +215,23 @@ class LeadCaptureView(APIView):
 
         if not phone: return Response({"message": "연락처 필수"}, status=400)
         
-        agent = None
-        if agent_id: 
-            agent = User.objects.filter(id=agent_id).first()
-        
-        customer, created = Customer.objects.get_or_create(
-            phone=phone,
-            defaults={'name': name, 'owner': agent, 'status': '미통건', 'platform': platform}
-        )
-
-        if custom_message:
-            log = SMSLog.objects.create(customer=customer, agent=agent, content=custom_message, direction='OUT', status='PENDING')
-            if send_traccar_cloud_sms(phone, custom_message):
-                log.status = 'SUCCESS'; log.save()
-            else:
-                log.status = 'FAIL'; log.save()
+        customer_id, sender_id, created = register_lead(phone, name=name, platform=platform, agent_id=agent_id)
+
+        if custom_message and sender_id:
+            log = SMSLog.objects.create(
+                customer_id=customer_id, agent_id=sender_id, content=custom_message, direction='OUT', status='PENDING',
+                gateway_message_id=new_gateway_message_id(),
+            )
+            record_sms([customer_id], 'OUT')
+            success, message_id = send_gateway_sms(phone, custom_message, request.data.get('gateway_config') or {}, log.gateway_message_id)
+            log.status = 'SUCCESS' if success else 'FAIL'
+            log.gateway_message_id = message_id or log.gateway_message_id
+            # 그 사이 발송 결과 웹훅이 SENT/DELIVERED 로 올려 두었으면 되돌리지 않음
+            SMSLog.objects.filter(pk=log.pk, status='PENDING').update(status=log.status, gateway_message_id=log.gateway_message_id)
         
-        return Response({"message": "고객 등록 완료", "customer_id": customer.id}, status=201)
+        data = {"message": "고객 등록 완료", "customer_id": customer_id, "created": created}
+        store_idempotent_response(request, 'lead_capture', 201, data)
+        return Response(data, status=201)
 
 # views.py 내의 send_manual_sms 함수 수정
 @api_view(['POST'])
@@ -262,15 +267,20 @@ def send_manual_sms(request):
         content=sms_text, 
         image=image_file,
         direction='OUT', 
-        status='PENDING'
+        status='PENDING',
+        gateway_message_id=new_gateway_message_id(),  # 발송 결과 웹훅이 이 ID 로 상태를 갱신
     )
+    record_sms([customer.id], 'OUT')
 
     # 🔴 [수정] 3번째 인자로 gateway_config를 전달합니다.
-    if send_traccar_cloud_sms(customer.phone, sms_text, gateway_config):
-        log.status = 'SUCCESS'; log.save()
+    success, message_id = send_gateway_sms(customer.phone, sms_text, gateway_config, log.gateway_message_id)
+    log.status = 'SUCCESS' if success else 'FAIL'
+    log.gateway_message_id = message_id or log.gateway_message_id
+    # 그 사이 발송 결과 웹훅이 SENT/DELIVERED 로 올려 두었으면 되돌리지 않음
+    SMSLog.objects.filter(pk=log.pk, status='PENDING').update(status=log.status, gateway_message_id=log.gateway_message_id)
+    if success:
         return Response({"message": "전송 성공", "log_id": log.id}, status=200)
     else:
-        log.status = 'FAIL'; log.save()
         return Response({"message": "발송 실패 (기기 연결 확인)", "log_id": log.id}, status=200)
 
 @api_view(['GET'])
@@ -278,6 +288,8 @@ def send_manual_sms(request):
 def get_sms_history(request, customer_id):
     customer = get_object_or_404(Customer, id=customer_id)
     logs = SMSLog.objects.filter(customer=customer).order_by('created_at')
+    if customer.owner_id in (None, request.user.id):
+        mark_sms_read(customer.id)  # 담당자(또는 미배정 고객)가 열면 안읽은 수 초기화
     
     data = []
     for l in logs:
@@ -301,6 +313,93 @@ def get_sms_history(request, customer_id):
 # 3. ⭐️ [업그레이드] 통계 및 데이터 분석 API (StatisticsView)
 # ==============================================================================
 
+class StatusFunnelView(APIView):
+    """
+    🧭 전환 퍼널 (관리자) ?from=가망&to=접수완료&start_date=&end_date=&platform=
+    from 상태에 들어온 고객 중 to 상태까지 간 비율 / 걸린 시간을 플랫폼별로 돌려줍니다.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'ADMIN':
+            return Response({'message': '관리자만 조회할 수 있습니다.'}, status=403)
+        params = request.query_params
+        platform = params.get('platform')
+        try:
+            return Response(conversion_funnel(
+                params.get('from', '가망'), params.get('to', '접수완료'),
+                params.get('start_date'), params.get('end_date'), None if platform in (None, '', 'ALL') else platform,
+            ))
+        except ValueError:
+            return Response({'message': '날짜 형식은 YYYY-MM-DD 입니다.'}, status=400)
+
+
+class StageDurationView(APIView):
+    """⏱️ 상태별 평균/최대 체류 시간 (관리자) ?start_date=&end_date=&platform="""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'ADMIN':
+            return Response({'message': '관리자만 조회할 수 있습니다.'}, status=403)
+        params = request.query_params
+        platform = params.get('platform')
+        try:
+            return Response(stage_durations(
+                params.get('start_date'), params.get('end_date'), None if platform in (None, '', 'ALL') else platform,
+            ))
+        except ValueError:
+            return Response({'message': '날짜 형식은 YYYY-MM-DD 입니다.'}, status=400)
+
+
+class CohortView(APIView):
+    """
+    🧮 유입 코호트 (관리자) ?period=week|month&group_by=platform|owner|none&start_date=&end_date=&max_age=
+    업로드 주/월별 리드가 경과 기간마다 얼마나 설치로 전환됐는지(누적 %)와 코호트별 합계를 돌려줍니다.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'ADMIN':
+            return Response({'message': '관리자만 조회할 수 있습니다.'}, status=403)
+        params = request.query_params
+        period = params.get('period', 'month')
+        group_by = params.get('group_by', 'platform')
+        if period not in COHORT_PERIODS or group_by not in COHORT_GROUP_BY:
+            return Response({'message': f'period 는 {COHORT_PERIODS}, group_by 는 {COHORT_GROUP_BY} 중 하나입니다.'}, status=400)
+        try:
+            start_date = datetime.date.fromisoformat(params['start_date']) if params.get('start_date') else None
+            end_date = datetime.date.fromisoformat(params['end_date']) if params.get('end_date') else None
+            max_age = min(int(params['max_age']), 104) if params.get('max_age') else None
+        except ValueError:
+            return Response({'message': '날짜는 YYYY-MM-DD, max_age 는 숫자입니다.'}, status=400)
+
+        options = {'period': period, 'group_by': group_by, 'start_date': start_date, 'end_date': end_date, 'max_age': max_age}
+        result, cached = cached_result('cohorts', options, lambda: build_cohorts(**options))
+        return Response({**result, 'cached': cached})
+
+
+class PivotView(APIView):
+    """
+    🧩 피벗 집계 (관리자) ?dimensions=owner,upload_month&measures=db,accepted,ad_spend&platform=당근,토스
+    &date_field=upload_date&start_date=&end_date=
+    허용된 차원/지표로 만든 GROUP BY 쿼리 하나의 결과를 데이터 버전 기준으로 캐시해 돌려줍니다.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'ADMIN':
+            return Response({'message': '관리자만 조회할 수 있습니다.'}, status=403)
+        try:
+            options = normalize_pivot_request(request.query_params)
+        except PivotError as e:
+            return Response({'message': str(e)}, status=400)
+
+        result, cached = cached_result('pivot', options, lambda: build_pivot(**options))
+        if 'owner' in options['dimensions']:
+            result = {**result, 'rows': label_owners(result['rows'])}
+        return Response({**options, **result, 'cached': cached})
+
+
 class StatisticsView(APIView):
     """
     📊 통합 통계 API (플랫폼별 광고비 단가 적용)
@@ -308,6 +407,9 @@ class StatisticsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        return Response(self.build_results(request))
+
+    def build_results(self, request):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         platform_filter = request.query_params.get('platform', 'ALL')
@@ -442,9 +544,71 @@ class StatisticsView(APIView):
         # 설치 매출 순으로 상담사 정렬
         final_results.sort(key=lambda x: x['installedRevenue'], reverse=True)
 
-        return Response(final_results)
+        return final_results
+
+STATS_EXPORT_COLUMNS = [
+    ('DB', 'db'), ('광고대상DB', 'adTargetDb'), ('접수', 'accepted'), ('설치', 'installed'), ('취소', 'canceled'),
+    ('접수매출', 'acceptedRevenue'), ('설치매출', 'installedRevenue'), ('광고비', 'adSpend'),
+    ('순수익', 'netProfit'), ('접수율', 'acceptRate'), ('취소율', 'cancelRate'), ('순이익율', 'netProfitMargin'),
+]
+
+class StatisticsExportView(StatisticsView):
+    """📤 통계 내보내기 (?file_format=csv|xlsx, 필터는 /api/stats/advanced/ 와 동일)"""
+    def get(self, request):
+        def rows():
+            for agent in self.build_results(request):
+                yield [agent['name'], '전체'] + [agent[key] for _, key in STATS_EXPORT_COLUMNS]
+                for pf in agent['platformDetails']:
+                    yield [agent['name'], pf['name']] + [pf[key] for _, key in STATS_EXPORT_COLUMNS]
+        header = ['상담사', '플랫폼'] + [title for title, _ in STATS_EXPORT_COLUMNS]
+        return export_response(request, 'stats', header, rows(), '통계')
+
+class SettlementBatchView(APIView):
+    """
+    💰 본사 정산 파일(CSV/XLSX) 일괄 반영
+    POST: file, settlement_status(기본 '정산완료'), dry_run(true 면 미리보기) → 대사 결과
+    GET: 최근 반영 이력
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get(self, request):
+        batches = SettlementBatch.objects.order_by('-created_at').values(
+            'id', 'file_name', 'dry_run', 'row_count', 'matched_count', 'mismatch_count', 'created_at', 'uploaded_by__username'
+        )[:50]
+        return Response(list(batches))
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'message': '정산 파일을 첨부해주세요.'}, status=400)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        settlement_status = request.data.get('settlement_status') or '정산완료'
+        try:
+            batch = run_settlement_batch(upload, user=request.user, settlement_status=settlement_status, dry_run=dry_run)
+        except ValueError as e:
+            return Response({'message': str(e)}, status=400)
+        return Response({
+            'message': '정산 미리보기 완료' if dry_run else f'{batch.matched_count}건 정산 반영 완료',
+            'batch_id': batch.id,
+            'report': batch.report,
+        }, status=201)
 
 # ... (나머지 ViewSet들은 기존과 동일하므로 생략 가능, 위 StatisticsView가 핵심) ...
+def metrics_view(request):
+    """
+    📈 Prometheus 텍스트 포맷 메트릭 (모든 gunicorn 워커 합산)
+    settings.METRICS_TOKEN 이 설정되어 있으면 `Authorization: Bearer <토큰>` 이 필요하고,
+    없으면 settings.METRICS_ALLOWED_IPS(기본: 127.0.0.1, ::1) 에서만 조회할 수 있습니다.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseForbidden('forbidden')
+    elif request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1']):
+        return HttpResponseForbidden('forbidden')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 class SystemConfigView(APIView):
     permission_classes = [AllowAny]
     def get(self, request):
@@ -463,20 +627,45 @@ class UserViewSet(viewsets.ModelViewSet):
         User.objects.create_user(username=username, password=password, role='AGENT')
         return Response({'message': '등록 완료'}, status=201)
 
+# 일괄 변경 로그에 남길 필드 이름
+BULK_FIELD_LABELS = {
+    'status': '상태', 'settlement_status': '정산상태', 'settlement_due_date': '정산예정일',
+    'settlement_complete_date': '정산완료일', 'settlement_memo': '정산메모', 'client': '거래처',
+    'callback_schedule': '재통화예정', 'owner_id': '담당자',
+}
+
 class CustomerViewSet(viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
     def get_queryset(self):
         user = self.request.user
-        if user.role == 'ADMIN': return Customer.objects.all().order_by('-upload_date', '-created_at')
-        return Customer.objects.filter(Q(owner=user) | Q(owner__isnull=True)).order_by('-upload_date', '-created_at')
+        if user.role == 'ADMIN': queryset = Customer.objects.all().order_by('-upload_date', '-created_at')
+        else: queryset = Customer.objects.filter(Q(owner=user) | Q(owner__isnull=True)).order_by('-upload_date', '-created_at')
+        # 목록/내보내기는 같은 검색 조건(?status=&platform=&owner=&client=&start_date=&end_date=)을 공유
+        if self.action in ('list', 'export', 'export_settlements'):
+            queryset = filter_customers(queryset, self.request.query_params)
+        return queryset
     def partial_update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return self.update(request, *args, **kwargs)
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            customer = serializer.save()
+            sync_dedupe_key(customer)  # 🔑 이후 웹훅 유입/수신 문자가 이 고객을 찾도록
+            record_transitions([(customer.id, None, customer.status)], self.request.user.id)
+    def perform_update(self, serializer):
+        # 🧭 상태가 바뀌면 같은 트랜잭션에 이력 추가
+        old_status = serializer.instance.status
+        with transaction.atomic():
+            customer = serializer.save()
+            sync_dedupe_key(customer)  # 🔑 번호가 바뀌었으면 키도 새 번호로
+            record_transitions([(customer.id, old_status, customer.status)], self.request.user.id)
     @action(detail=True, methods=['post'])
     def add_log(self, request, pk=None):
         customer = self.get_object()
-        ConsultationLog.objects.create(customer=customer, writer=request.user, content=request.data.get('content'))
+        with transaction.atomic():
+            ConsultationLog.objects.create(customer=customer, writer=request.user, content=request.data.get('content'))
+            record_logs([customer.id])
         return Response({'status': 'success'})
     @action(detail=True, methods=['post'])
     def assign(self, request, pk=None):
@@ -484,67 +673,289 @@ class CustomerViewSet(viewsets.ModelViewSet):
         target_user_id = request.data.get('user_id')
         if target_user_id: customer.owner = get_object_or_404(User, id=target_user_id)
         else: customer.owner = request.user
-        customer.status = '재통'
-        customer.save()
+        old_status, customer.status = customer.status, '재통'
+        with transaction.atomic():
+            customer.save(update_fields=['owner', 'status', 'updated_at'])
+            record_transitions([(customer.id, old_status, customer.status)], request.user.id)
         return Response({'message': '배정 완료'})
     @action(detail=False, methods=['post'])
     def allocate(self, request):
         ids = request.data.get('customer_ids', [])
         agent_id = request.data.get('agent_id')
-        if agent_id: agent = get_object_or_404(User, id=agent_id); Customer.objects.filter(id__in=ids).update(owner=agent, status='재통')
-        else: Customer.objects.filter(id__in=ids).update(owner=request.user, status='재통')
+        agent = get_object_or_404(User, id=agent_id) if agent_id else request.user
+        update_status(Customer.objects.filter(id__in=ids), '재통', request.user.id, owner=agent)
         return Response({'message': '일괄 배정 완료'})
 
+    @action(detail=False, methods=['post'])
+    def distribute(self, request):
+        """
+        ⚖️ 가중치 라운드로빈 일괄 분배
+        {"customer_ids": [...]} 또는 {"filter": {"status": "미통건", "platform": "당근", "owner": "none"}}
+        + {"agents": [{"id": 3, "weight": 2, "cap": 150}, ...]}
+        상담사별 현재 미결 건수를 반영해 분배하고, 상담사별 배정 건수를 돌려줍니다.
+        """
+        agents = request.data.get('agents') or []
+        try:
+            agents = [{'id': int(a['id']), 'weight': float(a.get('weight') or 1), 'cap': int(a['cap']) if a.get('cap') is not None else None} for a in agents]
+        except (KeyError, TypeError, ValueError):
+            return Response({'message': 'agents 형식이 올바르지 않습니다.'}, status=400)
+        if not agents:
+            return Response({'message': '분배할 상담사를 선택해주세요.'}, status=400)
+
+        agent_ids = [a['id'] for a in agents]
+        found = set(User.objects.filter(id__in=agent_ids).values_list('id', flat=True))
+        missing = [agent_id for agent_id in agent_ids if agent_id not in found]
+        if missing:
+            return Response({'message': f'존재하지 않는 상담사: {missing}'}, status=400)
+
+        queryset = self.get_queryset()
+        if request.data.get('customer_ids'):
+            customer_ids = request.data['customer_ids']
+            if not isinstance(customer_ids, list) or not all(str(i).isdigit() for i in customer_ids):
+                return Response({'message': 'customer_ids 는 고객 ID 목록이어야 합니다.'}, status=400)
+            queryset = queryset.filter(id__in=customer_ids)
+        elif request.data.get('filter'):
+            queryset = filter_customers(queryset, validate_filter_payload(request.data['filter']))
+        else:
+            return Response({'message': 'customer_ids 또는 filter 가 필요합니다.'}, status=400)
+        customer_ids = list(queryset.order_by('id').values_list('id', flat=True))
+
+        plan, leftover = plan_distribution(customer_ids, agents, open_lead_counts(agent_ids))
+        apply_distribution(plan, actor_id=request.user.id)
+
+        return Response({
+            'message': f'{len(customer_ids) - len(leftover)}건 분배 완료',
+            'total': len(customer_ids),
+            'assigned': {str(agent_id): len(ids) for agent_id, ids in plan.items()},
+            'unassigned': len(leftover),
+        })
+
+    @action(detail=False, methods=['get'])
+    def callbacks(self, request):
+        """
+        📞 재통화 대기열 (GET /api/customers/callbacks/?bucket=&page=&page_size=&owner=)
+        - 구간: overdue(지남) / now(이번 시간대) / 오늘 상담 시간대(time_options)별 / later(그 이후)
+        - (owner, callback_schedule) 인덱스 범위 조회 + 구간별 건수는 조건부 COUNT 한 번으로 집계
+        """
+        user = request.user
+        queryset = Customer.objects.filter(callback_schedule__isnull=False).exclude(status__in=CLOSED_STATUSES)
+        if user.role == 'ADMIN':
+            if request.query_params.get('owner'): queryset = queryset.filter(owner_id=request.query_params['owner'])
+        else:
+            queryset = queryset.filter(owner=user)
+
+        now = timezone.now()
+        hour_end = now.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+        today = datetime.datetime.combine(now.date(), datetime.time())
+        buckets = {
+            'overdue': Q(callback_schedule__lt=now),
+            'now': Q(callback_schedule__gte=now, callback_schedule__lt=hour_end),
+        }
+        slots = Q()
+        for hour in CONFIG_DATA['time_options']:
+            slot_start = today + datetime.timedelta(hours=hour)
+            if slot_start < hour_end:
+                continue
+            slot = Q(callback_schedule__gte=slot_start, callback_schedule__lt=slot_start + datetime.timedelta(hours=1))
+            buckets[f'{hour:02d}'] = slot
+            slots |= slot
+        buckets['later'] = Q(callback_schedule__gte=hour_end) & ~slots if slots else Q(callback_schedule__gte=hour_end)
+
+        counts = queryset.aggregate(**{key: Count('id', filter=q) for key, q in buckets.items()})
+
+        bucket = request.query_params.get('bucket')
+        if bucket:
+            if bucket not in buckets:
+                return Response({'message': f'알 수 없는 구간: {bucket}'}, status=400)
+            queryset = queryset.filter(buckets[bucket])
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 50)), 1), 200)
+        except ValueError:
+            return Response({'message': 'page/page_size 는 숫자여야 합니다.'}, status=400)
+
+        offset = (page - 1) * page_size
+        rows = queryset.order_by('callback_schedule', 'id').values(
+            'id', 'name', 'phone', 'platform', 'status', 'owner_id', 'callback_schedule', 'last_memo'
+        )[offset:offset + page_size]
+        results = []
+        for row in rows:
+            row['callback_schedule'] = row['callback_schedule'].strftime('%Y-%m-%d %H:%M')
+            results.append(row)
+
+        return Response({
+            'counts': counts,
+            'page': page,
+            'page_size': page_size,
+            'total': counts[bucket] if bucket else sum(counts.values()),  # 구간은 서로 겹치지 않음
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """📤 고객 목록 내보내기 (?file_format=csv|xlsx + 목록과 같은 필터)"""
+        # PK 역순 정렬: 정렬용 임시 테이블 없이 인덱스 순서대로 바로 스트리밍 시작
+        return export_queryset(request, 'customers', self.get_queryset().order_by('-id'), CUSTOMER_EXPORT_COLUMNS, '고객')
+
+    @action(detail=False, methods=['get'])
+    def export_settlements(self, request):
+        """📤 정산 대상 고객 내보내기 (?file_format=csv|xlsx + 목록과 같은 필터)"""
+        queryset = self.get_queryset().filter(status__in=CONFIG_DATA['settlement_target_statuses']).order_by('-id')
+        return export_queryset(request, 'settlements', queryset, SETTLEMENT_EXPORT_COLUMNS, '정산')
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_patch(self, request):
+        """
+        ✏️ 여러 고객 일괄 변경 (PATCH /api/customers/bulk/)
+        - {"items": [{"id": 1, "changes": {"status": "가망"}}, ...]}
+        - {"ids": [...], "changes": {...}} 또는 {"filter": {...}, "changes": {...}}
+        변경값은 한 번만 검증하고, 한 트랜잭션 안에서 UPDATE + 상담 로그 bulk_create 로 처리합니다.
+        """
+        items = request.data.get('items')
+        changes = request.data.get('changes')
+        validated_cache = {}
+
+        def validate(raw):
+            cache_key = json.dumps(raw, sort_keys=True, default=str)
+            if cache_key not in validated_cache:
+                serializer = CustomerBulkChangeSerializer(data=raw, partial=True)
+                serializer.is_valid(raise_exception=True)
+                validated_cache[cache_key] = {
+                    # owner 는 FK 객체 대신 id 로 다룸
+                    ('owner_id' if k == 'owner' else k): (v.id if k == 'owner' and v else v)
+                    for k, v in serializer.validated_data.items()
+                }
+            return validated_cache[cache_key]
+
+        queryset = self.get_queryset().order_by()
+        if items:
+            if not isinstance(items, list):
+                return Response({'message': 'items 는 목록이어야 합니다.'}, status=400)
+            targets = {}
+            for item in items:
+                if (not isinstance(item, dict) or not str(item.get('id', '')).isdigit()
+                        or not isinstance(item.get('changes'), dict)):
+                    return Response({'message': 'items 는 [{"id": 고객ID, "changes": {...}}] 형식이어야 합니다.'}, status=400)
+                targets[int(item['id'])] = validate(item['changes'])
+        elif isinstance(changes, dict):
+            validated = validate(changes)
+            if request.data.get('ids'):
+                ids = request.data['ids']
+                if not isinstance(ids, list) or not all(str(i).isdigit() for i in ids):
+                    return Response({'message': 'ids 는 고객 ID 목록이어야 합니다.'}, status=400)
+                queryset = queryset.filter(id__in=ids)
+            elif request.data.get('filter'):
+                queryset = filter_customers(queryset, validate_filter_payload(request.data['filter']))
+            else:
+                return Response({'message': 'ids 또는 filter 가 필요합니다.'}, status=400)
+            targets = None
+        else:
+            return Response({'message': 'items 또는 changes 가 필요합니다.'}, status=400)
+
+        fields = sorted({f for c in (targets.values() if targets is not None else [validated]) for f in c})
+        if not fields:
+            return Response({'message': '변경할 값이 없습니다.'}, status=400)
+
+        now = timezone.now()
+        with transaction.atomic():
+            if targets is None:
+                customers = {c.id: c for c in queryset.only('id', 'owner_id', 'status', *fields)}
+                targets = {customer_id: validated for customer_id in customers}
+            else:
+                customers = queryset.filter(id__in=list(targets)).only('id', 'owner_id', 'status', *fields).in_bulk()
+
+            logs, changed, status_changes, load_changes = [], [], [], []
+            for customer_id, customer in customers.items():
+                before = (customer.owner_id, customer.status)
+                diffs = []
+                for field, value in targets[customer_id].items():
+                    old = getattr(customer, field)
+                    if old != value:
+                        diffs.append(f"{BULK_FIELD_LABELS.get(field, field)}: {old if old not in (None, '') else '-'} → {value if value not in (None, '') else '-'}")
+                        setattr(customer, field, value)
+                        if field == 'status':
+                            status_changes.append((customer_id, old, value))
+                if diffs:
+                    customer.updated_at = now
+                    changed.append(customer)
+                    load_changes.append((*before, customer.owner_id, customer.status))
+                    logs.append(ConsultationLog(customer_id=customer_id, writer=request.user, content=f"[일괄변경] {', '.join(diffs)}"))
+
+            Customer.objects.bulk_update(changed, fields + ['updated_at'], batch_size=500)
+            ConsultationLog.objects.bulk_create(logs, batch_size=500)
+            record_logs([log.customer_id for log in logs], now)
+            record_transitions(status_changes, request.user.id, now)
+            adjust_lead_loads(load_changes)
+            if changed:
+                bump_version()
+
+        return Response({
+            'message': f'{len(changed)}건 변경 완료',
+            'updated': len(changed),
+            'ids': [c.id for c in changed],
+            'not_found': [i for i in targets if i not in customers],
+        })
+
     @action(detail=False, methods=['post'])
     def bulk_upload(self, request):
         data = request.data.get('customers', [])
         cnt = 0
+        created_customers = []
         
-        for item in data:
-            if not item.get('phone'): continue
+        with transaction.atomic():  # 고객 / 초기메모 / 상태 이력을 한 번에 커밋
+            for item in data:
+                if not item.get('phone'): continue
             
-            # 🟢 [수정됨] 프론트엔드에서 보낸 담당자(owner_id)와 상태(status) 받기
-            owner_id = item.get('owner_id')
-            status_val = item.get('status', '미통건') # 값이 없으면 '미통건' 기본값
-            last_memo = item.get('last_memo')         # 엑셀의 상담 내용
-
-            # 담당자 객체 찾기 (ID가 있을 경우)
-            owner_obj = None
-            if owner_id:
-                try:
-                    owner_obj = User.objects.get(id=owner_id)
-                except User.DoesNotExist:
-                    owner_obj = None
-
-            # 🟢 [수정됨] DB 생성 시 담당자와 상태값 적용
-            customer = Customer.objects.create(
-                phone=clean_phone(item['phone']), 
-                name=item.get('name', '미상'), 
-                upload_date=datetime.date.today(), 
-                status=status_val,        # 👈 탭에 맞는 상태 (접수완료/장기가망 등)
-                owner=owner_obj,          # 👈 탭에 맞는 담당자 (나)
-                platform=item.get('platform', '기타')
-            )
-
-            # 🟢 [수정됨] 상담 메모가 있다면 로그와 함께 저장
-            if last_memo:
-                customer.last_memo = last_memo
-                customer.save()
-                ConsultationLog.objects.create(
-                    customer=customer,
-                    writer=owner_obj if owner_obj else request.user, # 담당자 혹은 업로더
-                    content=f"[초기메모] {last_memo}"
+                # 🟢 [수정됨] 프론트엔드에서 보낸 담당자(owner_id)와 상태(status) 받기
+                owner_id = item.get('owner_id')
+                status_val = item.get('status', '미통건') # 값이 없으면 '미통건' 기본값
+                last_memo = item.get('last_memo')         # 엑셀의 상담 내용
+
+                # 담당자 객체 찾기 (ID가 있을 경우)
+                owner_obj = None
+                if owner_id:
+                    try:
+                        owner_obj = User.objects.get(id=owner_id)
+                    except User.DoesNotExist:
+                        owner_obj = None
+
+                # 🟢 [수정됨] DB 생성 시 담당자와 상태값 적용
+                customer = Customer.objects.create(
+                    phone=clean_phone(item['phone']), 
+                    name=item.get('name', '미상'), 
+                    upload_date=datetime.date.today(), 
+                    status=status_val,        # 👈 탭에 맞는 상태 (접수완료/장기가망 등)
+                    owner=owner_obj,          # 👈 탭에 맞는 담당자 (나)
+                    platform=item.get('platform', '기타')
                 )
 
-            cnt += 1
+                # 🟢 [수정됨] 상담 메모가 있다면 로그와 함께 저장
+                if last_memo:
+                    customer.last_memo = last_memo
+                    customer.save(update_fields=['last_memo', 'updated_at'])
+                    ConsultationLog.objects.create(
+                        customer=customer,
+                        writer=owner_obj if owner_obj else request.user, # 담당자 혹은 업로더
+                        content=f"[초기메모] {last_memo}"
+                    )
+                    record_logs([customer.id])
+
+                created_customers.append(customer)
+                cnt += 1
             
+            # 🔑 처음 들어온 번호는 중복 방지 키를 잡아둠 (이후 웹훅 유입이 이 고객에게 합쳐짐)
+            claim_dedupe_keys(created_customers)
+            record_transitions([(c.id, None, c.status) for c in created_customers], request.user.id)
         return Response({'message': f'{cnt}건 등록 완료', 'count': cnt})
 
     @action(detail=False, methods=['post'])
     def referral(self, request):
         data = request.data
         user = request.user
-        Customer.objects.create(name=data.get('name', '지인소개'), phone=clean_phone(data.get('phone')), platform=data.get('platform', '지인'), status='접수완료', owner=user, upload_date=datetime.date.today(), product_info=data.get('product_info', ''))
+        with transaction.atomic():  # 고객과 상태 이력을 함께 커밋
+            customer = Customer.objects.create(name=data.get('name', '지인소개'), phone=clean_phone(data.get('phone')), platform=data.get('platform', '지인'), status='접수완료', owner=user, upload_date=datetime.date.today(), product_info=data.get('product_info', ''))
+            claim_dedupe_keys([customer])
+            record_transitions([(customer.id, None, customer.status)], user.id)
         return Response({'message': '지인 접수 등록 완료'}, status=201)
         
     @action(detail=True, methods=['get'])
@@ -560,6 +971,23 @@ class CustomerViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """🕒 상담기록 + 문자(수신/발신) + 통화 녹취 통합 타임라인 (최신순, ?cursor=&page_size=)"""
+        customer = self.get_object()
+        try:
+            page_size = min(max(int(request.query_params.get('page_size', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            page_size = DEFAULT_PAGE_SIZE
+        try:
+            items, next_cursor = customer_timeline(
+                customer.id, request.query_params.get('cursor'), page_size, build_url=request.build_absolute_uri
+            )
+        except InvalidCursor as e:
+            return Response({'message': str(e)}, status=400)
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor) if next_cursor else None
+        return Response({'next': next_url, 'results': items})
+
     @action(detail=False, methods=['post'])
     def start_chat(self, request):
         """
@@ -579,7 +1007,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
             if not customer.owner:
                 # 담당자가 없다면 나에게 배정
                 customer.owner = request.user
-                customer.save()
+                customer.save(update_fields=['owner', 'updated_at'])
                 message = "미배정 DB를 나에게 배정하고 채팅방을 열었습니다."
             elif customer.owner == request.user:
                 message = "기존 상담중인 채팅방을 열었습니다."
@@ -592,21 +1020,25 @@ class CustomerViewSet(viewsets.ModelViewSet):
                 }, status=200)
         else:
             # 2-2. 없다면: 새로 생성하고 나에게 배정
-            customer = Customer.objects.create(
-                phone=phone,
-                name=request.data.get('name', f"신규_{phone[-4:]}"),
-                owner=request.user,
-                status='미통건',
-                platform='기타',
-                upload_date=datetime.date.today(),
-                last_memo="채팅 검색을 통해 새 방이 생성되었습니다."
-            )
-            # 로그 생성
-            ConsultationLog.objects.create(
-                customer=customer,
-                writer=request.user,
-                content="[시스템] 신규 번호 입력을 통해 채팅방 개설"
-            )
+            with transaction.atomic():  # 고객 / 상태 이력 / 개설 기록을 함께 커밋
+                customer = Customer.objects.create(
+                    phone=phone,
+                    name=request.data.get('name', f"신규_{phone[-4:]}"),
+                    owner=request.user,
+                    status='미통건',
+                    platform='기타',
+                    upload_date=datetime.date.today(),
+                    last_memo="채팅 검색을 통해 새 방이 생성되었습니다."
+                )
+                claim_dedupe_keys([customer])
+                record_transitions([(customer.id, None, customer.status)], request.user.id)
+                # 로그 생성
+                ConsultationLog.objects.create(
+                    customer=customer,
+                    writer=request.user,
+                    content="[시스템] 신규 번호 입력을 통해 채팅방 개설"
+                )
+                record_logs([customer.id])
             message = "새로운 채팅방이 생성되었습니다."
 
         serializer = self.get_serializer(customer)
@@ -618,7 +1050,9 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
 class NoticeViewSet(viewsets.ModelViewSet):
     queryset = Notice.objects.all().order_by('-is_important', '-created_at'); serializer_class = NoticeSerializer; permission_classes = [IsAuthenticated]
-    def perform_create(self, serializer): serializer.save(writer=self.request.user)
+    def perform_create(self, serializer):
+        notice = serializer.save(writer=self.request.user)
+        schedule_fanout('notice', notice.id)  # 📣 중요 공지는 전체 상담사에게 푸시
 
 class PolicyImageViewSet(viewsets.ModelViewSet):
     queryset = PolicyImage.objects.all()
@@ -669,13 +1103,25 @@ class FailureReasonViewSet(viewsets.ModelViewSet): queryset = FailureReason.obje
 class CustomStatusViewSet(viewsets.ModelViewSet): queryset = CustomStatus.objects.all(); serializer_class = StatusSerializer; permission_classes = [IsAuthenticated]
 class SettlementStatusViewSet(viewsets.ModelViewSet): queryset = SettlementStatus.objects.all(); serializer_class = SettlementStatusSerializer; permission_classes = [IsAuthenticated]
 class SalesProductViewSet(viewsets.ModelViewSet): queryset = SalesProduct.objects.all(); serializer_class = SalesProductSerializer; permission_classes = [IsAuthenticated]
-class ConsultationLogViewSet(viewsets.ModelViewSet): queryset = ConsultationLog.objects.all(); serializer_class = LogSerializer; permission_classes = [IsAuthenticated]
+class ConsultationLogViewSet(viewsets.ModelViewSet):
+    queryset = ConsultationLog.objects.all(); serializer_class = LogSerializer; permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            log = serializer.save()
+            record_logs([log.customer_id])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Customer.objects.filter(id=instance.customer_id, log_count__gt=0).update(log_count=F('log_count') - 1)
 class AdChannelViewSet(viewsets.ModelViewSet): queryset = AdChannel.objects.all(); serializer_class = AdChannelSerializer; permission_classes = [IsAuthenticated]
 class BankViewSet(viewsets.ModelViewSet): queryset = Bank.objects.all(); serializer_class = BankSerializer; permission_classes = [IsAuthenticated]
 
 class CallPopupView(APIView):
     permission_classes = [AllowAny] 
     def post(self, request):
+        metrics.inc('webhook_events_total', endpoint='call_popup')
         phone = clean_phone(request.data.get('phone')) 
         if not phone: return Response({'message': '전화번호가 없습니다.'}, status=400)
         customer = Customer.objects.filter(phone=phone).first()
@@ -686,32 +1132,144 @@ class CallPopupView(APIView):
 class CallRecordSaveView(APIView):
     permission_classes = [AllowAny]
     def post(self, request):
+        replay = get_idempotent_response(request, 'call_record')
+        if replay: return Response(replay[1], status=replay[0])
+
         phone = clean_phone(request.data.get('phone'))
         file_link = request.data.get('file_link') 
         if not phone or not file_link: return Response({'message': '데이터 부족'}, status=400)
-        customer = Customer.objects.filter(phone=phone).first()
-        if not customer: customer = Customer.objects.create(phone=phone, name=f"미등록({phone[-4:]})", status='미통건', owner=None, upload_date=datetime.date.today())
-        ConsultationLog.objects.create(customer=customer, writer=customer.owner, content=f"[자동저장] 통화 녹취 파일: {file_link}")
-        print(f"💾 [녹음 저장] {customer.name} - 링크 저장 완료")
-        return Response({'status': 'success', 'message': '녹음 파일 연결 완료'}, status=201)
+        customer_id, owner_id, created = upsert_customer(phone, name=f"미등록({phone[-4:]})", status='미통건', owner=None, upload_date=datetime.date.today())
+        try:
+            duration = int(request.data.get('duration')) if request.data.get('duration') not in (None, '') else None
+        except (TypeError, ValueError):
+            duration = None
+        with transaction.atomic():
+            CallRecord.objects.create(customer_id=customer_id, agent_id=owner_id, file_link=file_link[:500], duration=duration)
+            record_call(customer_id)
+        print(f"💾 [녹음 저장] 고객#{customer_id} - 링크 저장 완료")
+        data = {'status': 'success', 'message': '녹음 파일 연결 완료'}
+        store_idempotent_response(request, 'call_record', 201, data)
+        return Response(data, status=201)
+
+
+
+class TodoInboxPagination(CursorPagination):
+    ordering = '-id'
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 
+class ArchivePagination(CursorPagination):
+    ordering = '-id'
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ArchivedCustomerViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    🧊 보관 고객 조회 (읽기 전용) - /api/archive/customers/?phone=&name=&platform=&status=
+    상세는 원래 고객 ID 로 조회 (/api/archive/customers/<고객 ID>/)
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = ArchivePagination
+    lookup_field = 'customer_id'
+
+    def get_serializer_class(self):
+        return ArchivedCustomerDetailSerializer if self.action == 'retrieve' else ArchivedCustomerSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = ArchivedCustomer.objects.select_related('owner')
+        if user.role != 'ADMIN':
+            queryset = queryset.filter(Q(owner=user) | Q(owner__isnull=True))
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+        if params.get('phone'):
+            queryset = queryset.filter(phone=clean_phone(params['phone']))
+        if params.get('name'):
+            queryset = queryset.filter(name__icontains=params['name'])
+        for field in ('platform', 'status'):
+            if params.get(field) and params[field] != 'ALL':
+                queryset = queryset.filter(**{field: params[field]})
+        return queryset.defer('data', 'logs', 'sms', 'calls', 'history')  # 목록에는 큰 JSON 을 읽지 않음
+
 
 class TodoTaskViewSet(viewsets.ModelViewSet):
     queryset = TodoTask.objects.all()
     serializer_class = TodoTaskSerializer
 
     def perform_create(self, serializer):
-        serializer.save(sender=self.request.user)
+        with transaction.atomic():
+            task = serializer.save(sender=self.request.user)
+            create_receipts(task)  # 📥 수신자별 받은함 행 + 안읽음 카운터
+        schedule_fanout('todo', task.id)  # 📣 담당자(전체 지시면 모든 상담사)에게 푸시
+
+    def perform_update(self, serializer):
+        # 완료 체크는 수신자별로 기록 (전체 지시는 요청한 본인, 개인 지시는 담당자 기준)
+        completed = serializer.validated_data.pop('is_completed', None)
+        with transaction.atomic():
+            task = serializer.save()
+            sync_receipts(task)  # 담당자/전체 여부가 바뀌었으면 새 수신자에게 전달, 빠진 사람 받은함에서 제거
+            if completed is not None:
+                user_id = self.request.user.id if task.is_global else task.assigned_to_id
+                if not (user_id and set_completed(task, user_id, completed)) and not task.is_global:
+                    task.is_completed = completed
+                    task.save(update_fields=['is_completed'])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            release_receipts(instance.id)
+            instance.delete()
 
     # 관리자용: 내가 지시한 업무 목록 조회
     @action(detail=False, methods=['get'])
     def assigned(self, request):
-        # 내가 보낸 것 or 전체 공지
-        tasks = TodoTask.objects.all().order_by('-created_at')
+        # 관리자는 다른 관리자가 지시한 것까지 전부, 상담사는 내가 보낸 것 or 나에게 온 것 or 전체 공지
+        user = request.user
+        tasks = TodoTask.objects.select_related('sender', 'assigned_to').order_by('-created_at')
+        if user.role != 'ADMIN':
+            tasks = tasks.filter(Q(sender=user) | Q(assigned_to=user) | Q(is_global=True))
         serializer = self.get_serializer(tasks, many=True)
         return Response(serializer.data)
 
+    # 📥 내 받은 업무함 (?state=unread|open|completed, 커서 페이지)
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        receipts = TodoReceipt.objects.filter(user=request.user).select_related('task__sender')
+        state = request.query_params.get('state')
+        if state == 'unread': receipts = receipts.filter(read_at__isnull=True)
+        elif state == 'open': receipts = receipts.filter(completed_at__isnull=True)
+        elif state == 'completed': receipts = receipts.filter(completed_at__isnull=False)
+
+        paginator = TodoInboxPagination()
+        page = paginator.paginate_queryset(receipts, request, view=self)
+        undelivered = [r.id for r in page if r.delivered_at is None]
+        if undelivered:  # 푸시를 못 받았어도 목록에서 봤으면 전달된 것으로 기록
+            TodoReceipt.objects.filter(id__in=undelivered).update(delivered_at=timezone.now())
+        return paginator.get_paginated_response(TodoReceiptSerializer(page, many=True).data)
+
+    # 🔴 안읽음 배지 (카운터 한 행 조회)
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread(self, request):
+        return Response({'unread': unread_count(request.user.id)})
+
+    @action(detail=True, methods=['post'])
+    def read(self, request, pk=None):
+        changed = mark_read(pk, request.user.id)
+        return Response({'read': changed, 'unread': unread_count(request.user.id)})
+
+    # ✅ 내 몫 완료/취소 ({"completed": true|false}, 기본 true)
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        task = self.get_object()
+        completed = str(request.data.get('completed', 'true')).lower() not in ('false', '0')
+        if not set_completed(task, request.user.id, completed):
+            return Response({'message': '받은 업무가 아닙니다.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'completed': completed, 'unread': unread_count(request.user.id)})
+
 class CancelReasonViewSet(viewsets.ModelViewSet): 
     queryset = CancelReason.objects.all().order_by('-created_at')
     serializer_class = CancelReasonSerializer
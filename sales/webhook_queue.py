@@ -0,0 +1,61 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+# ==============================================================================
+# 📦 웹훅 대기열 공통 (InboundSMSEvent / SMSStatusEvent)
+# ==============================================================================
+# PENDING → (묶음 ID 로 선점) PROCESSING → DONE / IGNORED / FAILED
+# - consumer 가 처리 도중 죽어 PROCESSING 으로 남은 묶음은 PROCESSING_TIMEOUT 이 지나면 다시 PENDING 으로
+# - FAILED 는 RETRY_DELAY 가 지난 뒤 다시 PENDING 으로 (선점할 때마다 attempts +1, MAX_ATTEMPTS 까지)
+def _queue_settings():
+    return {'PROCESSING_TIMEOUT': 300, 'MAX_ATTEMPTS': 5, 'RETRY_DELAY': 60, **getattr(settings, 'WEBHOOK_QUEUE', {})}
+
+
+def claim_batch(model, batch_size):
+    """
+    대기 중인 이벤트를 id 순으로 batch_size 건 선점합니다. 여러 consumer 가 동시에 돌아도 묶음 ID 로 겹치지 않습니다.
+    반환: 묶음 ID (대기열이 비었으면 None)
+    """
+    ids = list(model.objects.filter(status='PENDING').order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return None
+    batch_id = uuid.uuid4()
+    model.objects.filter(id__in=ids, status='PENDING').update(
+        status='PROCESSING', batch_id=batch_id, claimed_at=timezone.now(), attempts=F('attempts') + 1,
+    )
+    return batch_id
+
+
+def fail_batch(model, batch_id, error):
+    """묶음 전체를 FAILED 로 (재시도 한도가 남았으면 recover_queue 가 다시 대기열로)"""
+    model.objects.filter(batch_id=batch_id).update(status='FAILED', processed_at=timezone.now(), error=str(error)[:1000])
+
+
+def recover_queue(model):
+    """
+    오래된 PROCESSING 묶음과 재시도할 FAILED 이벤트를 다시 PENDING 으로 돌립니다. (drain 시작 시 호출)
+    반환: {'reclaimed', 'retried', 'given_up'}
+    """
+    config = _queue_settings()
+    now = timezone.now()
+    max_attempts = config['MAX_ATTEMPTS']
+
+    # 선점 시각이 없는 PROCESSING 은 이 필드가 생기기 전에 멈춘 묶음
+    stale = model.objects.filter(
+        Q(claimed_at__lt=now - datetime.timedelta(seconds=config['PROCESSING_TIMEOUT'])) | Q(claimed_at__isnull=True),
+        status='PROCESSING',
+    )
+    given_up = stale.filter(attempts__gte=max_attempts).update(status='FAILED', processed_at=now, error='처리 시간 초과')
+    reclaimed = stale.filter(attempts__lt=max_attempts).update(status='PENDING', batch_id=None)
+    retried = model.objects.filter(
+        status='FAILED', attempts__lt=max_attempts,
+        processed_at__lt=now - datetime.timedelta(seconds=config['RETRY_DELAY']),
+    ).update(status='PENDING', batch_id=None)
+    if reclaimed or retried or given_up:
+        print(f"♻️ {model.__name__} 대기열 복구: 멈춘 묶음 {reclaimed}건 / 실패 재시도 {retried}건 / 포기 {given_up}건")
+    return {'reclaimed': reclaimed, 'retried': retried, 'given_up': given_up}